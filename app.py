@@ -5,8 +5,19 @@ Professional blue and yellow theme with side-by-side layout
 
 import streamlit as st
 import os
-from init_db import create_database, populate_faqs, get_all_faqs, get_faq_count
+import time
+import uuid
+from init_db import create_database, populate_faqs, get_all_faqs, get_answers, get_data_version
 from faq_matcher import FAQMatcher
+from index_store import default_index_dir
+from query_log import QueryLogger, default_log_path
+from conversation import ConversationEngine
+from render import DashboardRenderer, STYLE_HTML, LEFT_COLUMN_HTML, HEADER_HTML
+
+rerun_started = time.perf_counter()
+
+# Chat turns shown per page (older turns are paged, so reruns don't grow with the chat)
+HISTORY_PAGE_SIZE = 5
 
 # Page configuration
 st.set_page_config(
@@ -16,253 +27,8 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Custom CSS
-st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
-    
-    * {
-        font-family: 'Inter', sans-serif;
-    }
-    
-    .stApp {
-        background: #1E3A8A;
-    }
-    
-    .main .block-container {
-        padding: 0;
-        max-width: 100%;
-    }
-    
-    /* Left section */
-    .left-content {
-        background: linear-gradient(rgba(30, 58, 138, 0.85), rgba(30, 58, 138, 0.85)), 
-                    url('https://images.unsplash.com/photo-1441986300917-64674bd600d8?w=1200') center/cover;
-        min-height: 100vh;
-        padding: 3rem;
-        color: white;
-    }
-    
-    .left-content h1 {
-        font-size: 3rem;
-        font-weight: 700;
-        line-height: 1.2;
-        margin-bottom: 1.5rem;
-        color: white;
-    }
-    
-    .left-content p {
-        font-size: 1.1rem;
-        line-height: 1.6;
-        color: rgba(255, 255, 255, 0.9);
-        margin-bottom: 3rem;
-    }
-    
-    .info-block {
-        margin-bottom: 2rem;
-    }
-    
-    .info-block h3 {
-        font-size: 1.2rem;
-        font-weight: 600;
-        margin-bottom: 0.5rem;
-        color: white;
-    }
-    
-    .info-block p {
-        font-size: 0.95rem;
-        color: rgba(255, 255, 255, 0.8);
-        line-height: 1.5;
-        margin-bottom: 0;
-    }
-    
-    /* Right section */
-    .right-content {
-        background: #F8FAFC;
-        min-height: 100vh;
-        padding: 2.5rem;
-    }
-    
-    .right-content h2 {
-        font-size: 1.8rem;
-        font-weight: 700;
-        color: #1E3A8A;
-        margin-bottom: 0.5rem;
-    }
-    
-    .right-content .subheader {
-        font-size: 0.95rem;
-        color: #64748B;
-        margin-bottom: 2rem;
-    }
-    
-    /* Stats */
-    .stat-box {
-        background: white;
-        padding: 1.2rem;
-        border-radius: 12px;
-        text-align: center;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
-        margin-bottom: 1rem;
-        border: 1px solid #E2E8F0;
-    }
-    
-    .stat-number {
-        font-size: 2rem;
-        font-weight: 700;
-        color: #1E3A8A;
-    }
-    
-    .stat-label {
-        color: #64748B;
-        font-size: 0.85rem;
-        margin-top: 4px;
-        font-weight: 500;
-    }
-    
-    /* Chat */
-    .chat-container {
-        background: white;
-        border-radius: 12px;
-        padding: 1.5rem;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
-        margin-bottom: 1.5rem;
-        max-height: 450px;
-        overflow-y: auto;
-        border: 1px solid #E2E8F0;
-    }
-    
-    .user-message {
-        background: #FCD34D;
-        color: #1E3A8A;
-        padding: 12px 16px;
-        border-radius: 12px 12px 2px 12px;
-        margin: 10px 0;
-        max-width: 80%;
-        margin-left: auto;
-        font-size: 0.95rem;
-        font-weight: 500;
-    }
-    
-    .bot-answer {
-        background: #EFF6FF;
-        color: #1E293B;
-        padding: 16px;
-        border-radius: 12px;
-        margin: 10px 0;
-        border-left: 4px solid #1E3A8A;
-    }
-    
-    .bot-answer strong {
-        color: #1E3A8A;
-        display: block;
-        margin-bottom: 8px;
-        font-size: 1rem;
-        font-weight: 600;
-    }
-    
-    .bot-message {
-        background: #FEF3C7;
-        color: #92400E;
-        padding: 14px;
-        border-radius: 12px;
-        margin: 10px 0;
-        border-left: 4px solid #FCD34D;
-        font-size: 0.9rem;
-    }
-    
-    .info-box {
-        background: #DBEAFE;
-        padding: 14px 16px;
-        border-radius: 12px;
-        margin: 10px 0;
-        color: #1E40AF;
-        font-weight: 500;
-        border-left: 4px solid #3B82F6;
-        font-size: 0.9rem;
-    }
-    
-    .category-badge {
-        display: inline-block;
-        background: #1E3A8A;
-        color: white;
-        padding: 6px 14px;
-        border-radius: 20px;
-        font-size: 0.8rem;
-        font-weight: 600;
-        margin: 4px 4px 4px 0;
-    }
-    
-    .similarity-score {
-        background: #FCD34D;
-        color: #1E3A8A;
-        padding: 6px 14px;
-        border-radius: 20px;
-        display: inline-block;
-        margin-top: 8px;
-        font-size: 0.8rem;
-        font-weight: 600;
-    }
-    
-    /* Input */
-    .stTextInput > div > div > input {
-        border-radius: 10px;
-        border: 2px solid #CBD5E1;
-        padding: 12px 16px;
-        font-size: 0.95rem;
-        background: white;
-    }
-    
-    .stTextInput > div > div > input:focus {
-        border-color: #1E3A8A;
-        box-shadow: 0 0 0 3px rgba(30, 58, 138, 0.1);
-        outline: none;
-    }
-    
-    /* Button */
-    .stButton > button {
-        background: #FCD34D;
-        color: #1E3A8A;
-        border-radius: 10px;
-        padding: 12px 24px;
-        font-weight: 600;
-        border: none;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-        transition: all 0.2s ease;
-    }
-    
-    .stButton > button:hover {
-        background: #FBBF24;
-        transform: translateY(-1px);
-        box-shadow: 0 4px 8px rgba(0, 0, 0, 0.15);
-    }
-    
-    /* Scrollbar */
-    .chat-container::-webkit-scrollbar {
-        width: 6px;
-    }
-    
-    .chat-container::-webkit-scrollbar-track {
-        background: #F1F5F9;
-        border-radius: 10px;
-    }
-    
-    .chat-container::-webkit-scrollbar-thumb {
-        background: #CBD5E1;
-        border-radius: 10px;
-    }
-    
-    /* Hide Streamlit elements */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    .stDeployButton {visibility: hidden;}
-    
-    [data-testid="column"] {
-        padding: 0 !important;
-    }
-    </style>
-""", unsafe_allow_html=True)
+# Custom CSS (minified once in render.py)
+st.markdown(STYLE_HTML, unsafe_allow_html=True)
 
 # Initialize
 @st.cache_resource
@@ -270,83 +36,75 @@ def initialize_system():
     if not os.path.exists("faqs.db"):
         create_database()
         populate_faqs()
-    faqs = get_all_faqs()
-    matcher = FAQMatcher(faqs)
-    return matcher, faqs
+    # Answers stay in SQLite (or the memory-mapped index) until a FAQ is returned
+    # Every question is logged in the background (faqs.log.db) for analytics
+    matcher = FAQMatcher(
+        get_all_faqs(),
+        index_dir=default_index_dir(),
+        answer_loader=get_answers,
+        query_log=QueryLogger(default_log_path(), source="app"),
+    )
+    matcher.db_version = get_data_version()
+    return matcher
+
+@st.cache_resource
+def initialize_conversations():
+    # Shared by all browser sessions; each keeps only its id in st.session_state
+    return ConversationEngine(initialize_system())
+
+@st.cache_resource
+def initialize_renderer():
+    # Cached fragments are shared by all sessions and refreshed when the corpus changes
+    return DashboardRenderer(initialize_system())
+
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+    st.session_state.history_page = 0
 
-if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
+matcher = initialize_system()
+conversations = initialize_conversations()
+renderer = initialize_renderer()
+session_id = st.session_state.session_id
 
-matcher, faqs = initialize_system()
+# Apply FAQ edits made since the matcher was built (no rebuild or cache clear)
+data_version = get_data_version()
+if data_version != matcher.db_version:
+    matcher.sync(get_all_faqs())
+    matcher.db_version = data_version
 
 # Layout
 col1, col2 = st.columns([1, 1])
 
 # LEFT COLUMN
 with col1:
-    st.markdown("""
-    <div class="left-content">
-        <h1>You Have Questions,<br>We Have Answers</h1>
-        <p>Discover our premium clothing collection designed with care. Get instant answers to all your questions about sizing, shipping, returns, and more.</p>
-        
-        <div style="margin-top: 4rem;">
-            <div class="info-block">
-                <h3>📍 About Us</h3>
-                <p>Premium Fashion Boutique<br>Delivering quality since 2020<br>Worldwide shipping available</p>
-            </div>
-            
-            <div class="info-block">
-                <h3>📧 Contact</h3>
-                <p>Email: support@clothingbrand.com<br>Phone: +1 (555) 123-4567<br>Hours: Mon-Sun | 9:00 AM - 10:00 PM</p>
-            </div>
-            
-            <div class="info-block">
-                <h3>🌐 Follow Us</h3>
-                <p>Instagram | Facebook | Twitter<br>@fashionboutique</p>
-            </div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(LEFT_COLUMN_HTML, unsafe_allow_html=True)
 
 # RIGHT COLUMN
 with col2:
     st.markdown('<div class="right-content">', unsafe_allow_html=True)
-    st.markdown('<h2>FAQ Assistant</h2>', unsafe_allow_html=True)
-    st.markdown('<p class="subheader">Our team is ready to assist you with every detail, big or small.</p>', unsafe_allow_html=True)
-    
-    # Stats
-    s1, s2, s3 = st.columns(3)
-    with s1:
-        st.markdown(f'<div class="stat-box"><div class="stat-number">{get_faq_count()}</div><div class="stat-label">FAQs</div></div>', unsafe_allow_html=True)
-    with s2:
-        categories = matcher.get_all_categories()
-        st.markdown(f'<div class="stat-box"><div class="stat-number">{len(categories)}</div><div class="stat-label">Categories</div></div>', unsafe_allow_html=True)
-    with s3:
-        st.markdown(f'<div class="stat-box"><div class="stat-number">{len(st.session_state.chat_history)}</div><div class="stat-label">Asked</div></div>', unsafe_allow_html=True)
-    
-    # Chat
-    st.markdown('<div class="chat-container">', unsafe_allow_html=True)
-    
-    if st.session_state.chat_history:
-        for chat in st.session_state.chat_history:
-            st.markdown(f'<div class="user-message">❓ {chat["question"]}</div>', unsafe_allow_html=True)
-            
-            if chat['match']:
-                st.markdown(f'''
-                    <div class="bot-answer">
-                        <strong>📌 {chat['match']['question']}</strong>
-                        {chat['match']['answer']}
-                        <br><br>
-                        <span class="category-badge">{chat['match']['category']}</span>
-                        <span class="similarity-score">🎯 {chat['match']['similarity_score']}% Match</span>
-                    </div>
-                ''', unsafe_allow_html=True)
-            else:
-                st.markdown('<div class="bot-message">😕 I couldn\'t find a good match. Please try rephrasing or contact support@clothingbrand.com</div>', unsafe_allow_html=True)
-    else:
-        st.markdown('<div class="info-box">💡 <strong>Try asking:</strong> "What sizes do you offer?", "How long does shipping take?", "What is your return policy?"</div>', unsafe_allow_html=True)
-    
-    st.markdown('</div>', unsafe_allow_html=True)
+    st.markdown(HEADER_HTML, unsafe_allow_html=True)
+    
+    # Stats (FAQ and category counts are only recomputed when the corpus changes)
+    st.markdown(renderer.stats_html(conversations.asked(session_id)), unsafe_allow_html=True)
+    
+    # Chat (one page of turns, newest page first)
+    turns, pages = conversations.history(session_id, st.session_state.history_page, HISTORY_PAGE_SIZE)
+    
+    if pages > 1:
+        p1, p2, p3 = st.columns([1, 2, 1])
+        with p1:
+            if st.button("⬆️ Older", disabled=st.session_state.history_page >= pages - 1):
+                st.session_state.history_page += 1
+                st.rerun()
+        with p2:
+            st.caption(f"Page {pages - st.session_state.history_page} of {pages}")
+        with p3:
+            if st.button("⬇️ Newer", disabled=st.session_state.history_page == 0):
+                st.session_state.history_page -= 1
+                st.rerun()
+    
+    # The whole page of turns is one element; answer HTML is cached per FAQ
+    st.markdown(renderer.chat_html(turns), unsafe_allow_html=True)
     
     # Input
     i1, i2 = st.columns([4, 1])
@@ -356,18 +114,62 @@ with col2:
         ask_button = st.button("Ask 🚀", use_container_width=True)
     
     if ask_button and user_question:
-        match = matcher.find_best_match(user_question)
-        st.session_state.chat_history.append({'question': user_question, 'match': match})
+        # Follow-up questions are narrowed to the previous answer's category
+        conversations.ask(session_id, user_question)
+        st.session_state.history_page = 0
         st.rerun()
     
-    if st.session_state.chat_history:
+    if turns:
         if st.button("🗑️ Clear Chat"):
-            st.session_state.chat_history = []
+            conversations.clear(session_id)
+            st.session_state.history_page = 0
             st.rerun()
     
     # Categories
-    st.markdown('<br><p style="font-size: 0.9rem; font-weight: 600; color: #1E3A8A; margin-bottom: 0.5rem;">📂 Categories</p>', unsafe_allow_html=True)
-    for category in categories:
-        st.markdown(f'<span class="category-badge">{category}</span>', unsafe_allow_html=True)
+    st.markdown(renderer.categories_html(), unsafe_allow_html=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
+
+def toggle_metrics():
+    matcher.metrics.enabled = st.session_state.metrics_enabled
+
+# Optional matcher metrics panel. The metrics registry is process-wide, so the
+# checkbox is a global switch: it shows (and changes) the recording state of
+# every session, and only a click changes it
+with st.sidebar:
+    st.session_state.metrics_enabled = matcher.metrics.enabled
+    st.checkbox(
+        "📈 Matcher metrics (all sessions)",
+        key="metrics_enabled",
+        on_change=toggle_metrics,
+        help="Recording is shared by every session of this app; switching it here switches it for all of them.",
+    )
+    if matcher.metrics.enabled:
+        snapshot = matcher.metrics.snapshot(matcher.cache_stats())
+        counters = snapshot['counters']
+        st.metric("Questions", counters['queries'])
+        st.metric("Below threshold", counters['misses_below_threshold'])
+        results_cache = snapshot['caches']['results']
+        if results_cache:
+            st.metric("Result cache hit rate", f"{results_cache['hit_rate']:.0%}")
+        reruns = renderer.stats()['reruns_seconds']
+        st.metric("Mean rerun (server)", f"{reruns['mean'] * 1000:.1f} ms")
+        
+        st.markdown("**Stage timings**")
+        st.table([
+            {'stage': stage, 'calls': histogram['count'], 'mean ms': round(histogram['mean'] * 1000, 3)}
+            for stage, histogram in snapshot['stages_seconds'].items()
+        ])
+        
+        st.markdown("**Best similarity per question**")
+        cumulative = list(snapshot['similarity']['buckets'].items())[:-1]
+        st.bar_chart({
+            'score': [f"≤{bound}" for bound, _ in cumulative],
+            'questions': [count - (cumulative[i - 1][1] if i else 0) for i, (_, count) in enumerate(cumulative)],
+        }, x='score', y='questions')
+        
+        if st.button("Reset metrics"):
+            matcher.metrics.reset()
+            st.rerun()
+
+renderer.record_rerun(time.perf_counter() - rerun_started)
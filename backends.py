@@ -0,0 +1,699 @@
+"""
+Matching Backends
+Scoring engines used by FAQMatcher to rank FAQs against preprocessed questions
+
+Every backend exposes the same two methods:
+- build(): (re)compute the backend's structures from the matcher's TF-IDF model
+- search(processed_questions, top_k, partition=None): return one
+  (indices, scores) pair per question, ordered best first; with a category
+  partition (see FAQMatcher) only the FAQs in partition.rows are scored
+
+A backend that matches terms the matcher's vocabulary doesn't know (bm25,
+which also indexes answers) exposes them as query_vocabulary, so typo
+correction leaves them alone.
+
+Backends time their vectorize, score and select stages through
+matcher.metrics (see metrics.py); the hooks are no-ops while recording is off.
+"""
+
+import re
+import numpy as np
+
+# Same token pattern as scikit-learn's CountVectorizer/TfidfVectorizer default
+TERM_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+# Tolerance used when comparing accumulated float scores against upper bounds
+SCORE_EPSILON = 1e-9
+
+
+def top_k_positions(scores, top_k):
+    """
+    Positions of the top_k highest scores in a 1-D array
+
+    Ties are broken by the lower position (same as np.argmax), including ties
+    at the k-th place.
+
+    Args:
+        scores: 1-D array of scores
+        top_k: Number of positions to return
+
+    Returns:
+        Array of positions ordered by descending score
+    """
+    if top_k == 1:
+        return np.array([np.argmax(scores)])
+    if top_k >= len(scores):
+        best = np.arange(len(scores))
+    else:
+        kth_score = scores[np.argpartition(-scores, top_k - 1)[top_k - 1]]
+        above = np.flatnonzero(scores > kth_score)
+        ties = np.flatnonzero(scores == kth_score)[:top_k - len(above)]
+        best = np.concatenate((above, ties))
+    return best[np.lexsort((best, -scores[best]))]
+
+
+def vectorize(processed_question, vocabulary, idf):
+    """
+    TF-IDF vector of a preprocessed question, computed like TfidfVectorizer
+
+    Args:
+        processed_question: Preprocessed question
+        vocabulary: Dictionary term -> column
+        idf: Array of idf weights by column
+
+    Returns:
+        Tuple (sorted term columns, L2-normalized weights)
+    """
+    counts = {}
+    for token in TERM_PATTERN.findall(processed_question.lower()):
+        column = vocabulary.get(token)
+        if column is not None:
+            counts[column] = counts.get(column, 0) + 1
+    columns = np.fromiter(sorted(counts), dtype=np.int64, count=len(counts))
+    weights = np.array([counts[column] for column in columns.tolist()], dtype=np.float64)
+    weights *= idf[columns]
+    norm = np.sqrt(np.dot(weights, weights))
+    if norm > 0:
+        weights /= norm
+    return columns, weights
+
+
+def score_postings(postings, columns, weights):
+    """
+    Cosine similarity of a question vector with the FAQs of a term-major matrix
+
+    Each query term adds its posting list (one row of postings) into a dense
+    score array, in column order like a CSR matrix product.
+
+    Args:
+        postings: Term-major CSR matrix (terms x FAQs) of normalized TF-IDF weights
+        columns: Sorted term columns of the question vector
+        weights: Normalized question weights
+
+    Returns:
+        Dense array with one score per FAQ column of postings
+    """
+    indptr, doc_ids, faq_weights = postings.indptr, postings.indices, postings.data
+    scores = np.zeros(postings.shape[1])
+    for column, weight in zip(columns, weights):
+        start, end = indptr[column], indptr[column + 1]
+        scores[doc_ids[start:end]] += weight * faq_weights[start:end]
+    return scores
+
+
+def search_partition(matcher, processed_questions, top_k, partition):
+    """
+    Exact TF-IDF cosine search restricted to a category partition
+
+    Shared by the lexical backends: partitions are small, so scoring the
+    partition's own posting lists exhaustively is cheaper than any pruning.
+
+    Args:
+        matcher: FAQMatcher the partition belongs to
+        processed_questions: List of preprocessed questions
+        top_k: Number of results per question
+        partition: Category partition (rows and term-major postings)
+
+    Returns:
+        List of (indices, scores) tuples with FAQ positions of the full corpus
+    """
+    metrics = matcher.metrics
+    idf = np.asarray(matcher.idf, dtype=np.float64)
+    results = []
+    for processed in processed_questions:
+        started = metrics.start()
+        columns, weights = vectorize(processed, matcher.vocabulary, idf)
+        started = metrics.lap('vectorize', started)
+        scores = score_postings(partition.postings, columns, weights)
+        started = metrics.lap('score', started)
+        best = top_k_positions(scores, top_k)
+        results.append((partition.rows[best], scores[best]))
+        metrics.lap('select', started)
+    return results
+
+
+def top_k_rows(similarities, top_k):
+    """
+    Select the top_k columns of every row of a dense similarity matrix
+
+    Args:
+        similarities: 2-D array (questions x FAQs)
+        top_k: Number of results to keep per row
+
+    Returns:
+        List of (indices, scores) tuples ordered by descending score
+    """
+    top_k = max(1, min(top_k, similarities.shape[1]))
+    results = []
+    for row in similarities:
+        best = top_k_positions(row, top_k)
+        results.append((best, row[best]))
+    return results
+
+
+class CosineBackend:
+    """
+    Exhaustive cosine similarity against every FAQ
+
+    TF-IDF rows are L2-normalized, so one sparse matrix product gives the
+    cosine similarity of each question with each FAQ.
+    """
+
+    name = 'cosine'
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.build()
+
+    def build(self):
+        """Cache the transposed FAQ matrix used for the similarity product"""
+        self.faq_matrix_t = self.matcher.tfidf_matrix_t
+
+    def search(self, processed_questions, top_k, partition=None):
+        """Score all FAQs for each question and keep the top_k"""
+        if partition is not None:
+            return search_partition(self.matcher, processed_questions, top_k, partition)
+        metrics = self.matcher.metrics
+        started = metrics.start()
+        question_vectors = self.matcher.vectorizer.transform(processed_questions)
+        started = metrics.lap('vectorize', started)
+        similarities = (question_vectors @ self.faq_matrix_t).toarray()
+        started = metrics.lap('score', started)
+        results = top_k_rows(similarities, top_k)
+        metrics.lap('select', started)
+        return results
+
+
+class InvertedIndexBackend:
+    """
+    Term-at-a-time retrieval over a sparse inverted index with max-score pruning
+
+    Each term maps to a posting list of (faq_idx, tfidf weight). Only FAQs that
+    share at least one term with the question are scored. Terms are processed
+    in decreasing order of their maximum possible contribution; once the k-th
+    best score is above what the unprocessed terms could still add, no new
+    candidates can enter the top-k and the remaining posting lists are only
+    used to update existing candidates.
+
+    Rankings equal the cosine backend for all FAQs with a non-zero score.
+    """
+
+    name = 'inverted'
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.build()
+
+    def build(self):
+        """Build posting lists and per-term maximum weights"""
+        postings = self.matcher.tfidf_matrix_t
+        self.indptr = postings.indptr
+        self.doc_ids = postings.indices
+        self.weights = postings.data
+
+        # Upper bound of each term's weight across all FAQs
+        self.max_weight = np.zeros(postings.shape[0])
+        non_empty = np.diff(self.indptr) > 0
+        self.max_weight[non_empty] = np.maximum.reduceat(
+            self.weights, self.indptr[:-1][non_empty]
+        )
+
+    def search(self, processed_questions, top_k, partition=None):
+        """Retrieve the top_k FAQs for each question from the inverted index"""
+        if partition is not None:
+            return search_partition(self.matcher, processed_questions, top_k, partition)
+        metrics = self.matcher.metrics
+        started = metrics.start()
+        question_vectors = self.matcher.vectorizer.transform(processed_questions)
+        started = metrics.lap('vectorize', started)
+        top_k = max(1, top_k)
+        # Selection is interleaved with scoring (pruning), so both count as 'score'
+        results = [
+            self._search_one(
+                question_vectors.indices[question_vectors.indptr[row]:question_vectors.indptr[row + 1]],
+                question_vectors.data[question_vectors.indptr[row]:question_vectors.indptr[row + 1]],
+                top_k,
+            )
+            for row in range(question_vectors.shape[0])
+        ]
+        metrics.lap('score', started)
+        return results
+
+    def _search_one(self, terms, query_weights, top_k):
+        """
+        Max-score top-k retrieval for a single question
+
+        Args:
+            terms: Vocabulary column of each query term
+            query_weights: TF-IDF weight of each query term
+            top_k: Number of results to return
+
+        Returns:
+            Tuple (indices, scores) ordered best first
+        """
+        docs = np.empty(0, dtype=self.doc_ids.dtype)
+        scores = np.empty(0)
+        if len(terms) == 0 or not self.max_weight[terms].any():
+            return docs, scores
+
+        # Highest score each query term can still add to any FAQ
+        bounds = query_weights * self.max_weight[terms]
+        order = np.argsort(-bounds, kind='stable')
+        remaining = bounds.sum()
+        pruning = False
+
+        for position in order:
+            term = terms[position]
+            remaining -= bounds[position]
+            start, end = self.indptr[term], self.indptr[term + 1]
+            posting_docs = self.doc_ids[start:end]
+            posting_scores = self.weights[start:end] * query_weights[position]
+
+            if not pruning:
+                # Union: new FAQs can still enter the top-k
+                merged = np.concatenate((docs, posting_docs))
+                docs, inverse = np.unique(merged, return_inverse=True)
+                scores = np.bincount(
+                    inverse, weights=np.concatenate((scores, posting_scores)),
+                    minlength=len(docs)
+                )
+            elif len(docs):
+                # Candidate set is closed: only update existing candidates
+                found = np.searchsorted(posting_docs, docs)
+                in_range = found < len(posting_docs)
+                hit = np.zeros(len(docs), dtype=bool)
+                hit[in_range] = posting_docs[found[in_range]] == docs[in_range]
+                scores[hit] += posting_scores[found[hit]]
+
+            if len(docs) >= top_k:
+                kth_score = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+                if not pruning and kth_score > remaining + SCORE_EPSILON:
+                    pruning = True
+                if pruning:
+                    # Drop candidates that can no longer reach the top-k
+                    keep = scores + remaining >= kth_score - SCORE_EPSILON
+                    docs, scores = docs[keep], scores[keep]
+
+        # docs stay sorted, so the lowest position is also the lowest FAQ index
+        best = top_k_positions(scores, min(top_k, len(docs)))
+        return docs[best], scores[best]
+
+
+class SparseBackend:
+    """
+    Exhaustive cosine similarity in plain NumPy, without scikit-learn per query
+
+    Questions are vectorized directly against the matcher's term -> column dict
+    and idf weights, then scored by adding each query term's posting list
+    (a row of the precomputed, L2-normalized term-major matrix) into a dense
+    score array. Terms are visited in column order, the same order as the
+    sparse product in CosineBackend, so scores are identical.
+    """
+
+    name = 'sparse'
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.build()
+
+    def build(self):
+        """Cache the posting lists, vocabulary and idf weights"""
+        self.postings = self.matcher.tfidf_matrix_t
+        self.vocabulary = self.matcher.vocabulary
+        self.idf = np.asarray(self.matcher.idf, dtype=np.float64)
+
+    def vectorize(self, processed_question):
+        """TF-IDF vector of a preprocessed question as (columns, weights)"""
+        return vectorize(processed_question, self.vocabulary, self.idf)
+
+    def score(self, columns, weights):
+        """Cosine similarity of a question vector with every FAQ (dense array)"""
+        return score_postings(self.postings, columns, weights)
+
+    def search(self, processed_questions, top_k, partition=None):
+        """Score all FAQs for each question and keep the top_k"""
+        if partition is not None:
+            return search_partition(self.matcher, processed_questions, top_k, partition)
+        metrics = self.matcher.metrics
+        results = []
+        for processed in processed_questions:
+            started = metrics.start()
+            columns, weights = self.vectorize(processed)
+            started = metrics.lap('vectorize', started)
+            scores = self.score(columns, weights)
+            started = metrics.lap('score', started)
+            best = top_k_positions(scores, top_k)
+            results.append((best, scores[best]))
+            metrics.lap('select', started)
+        return results
+
+
+class SemanticBackend:
+    """
+    Dense LSA vectors with an IVF approximate nearest-neighbour index
+
+    Questions are projected into the LSA space fitted by semantic_index.py,
+    which relates terms that co-occur in FAQs ("refund", "money back") even
+    when a question shares no term with the FAQ. Only the nprobe IVF lists
+    closest to the question are scanned. Scores are cosine similarities
+    clipped to 0-1.
+
+    The model is loaded from the persisted semantic index when it matches the
+    corpus, and fitted otherwise; after FAQ edits the new TF-IDF rows are
+    folded into the existing LSA space.
+    """
+
+    name = 'semantic'
+
+    # IVF lists scanned per question (more: better recall, slower)
+    nprobe = 8
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.model = None
+        self.build()
+
+    def build(self):
+        """Load or fit the LSA model, or fold in the current TF-IDF rows"""
+        import semantic_index
+
+        if self.model is None:
+            self.model = semantic_index.load_or_fit(self.matcher)
+        else:
+            self.model.refresh(self.matcher)
+        self.vocabulary = self.matcher.vocabulary
+        self.idf = np.asarray(self.matcher.idf, dtype=np.float64)
+
+    def embed(self, processed_question):
+        """LSA vector of a preprocessed question"""
+        return self.model.embed(*vectorize(processed_question, self.vocabulary, self.idf))
+
+    def search(self, processed_questions, top_k, partition=None):
+        """Retrieve the top_k FAQs for each question from the IVF index"""
+        metrics = self.matcher.metrics
+        results = []
+        for processed in processed_questions:
+            started = metrics.start()
+            query = self.embed(processed)
+            started = metrics.lap('vectorize', started)
+            if partition is not None:
+                # Partitions are small: score them exactly
+                candidates = partition.rows
+                scores = self.model.score_rows(query, candidates)
+            else:
+                candidates, scores = self.model.search(query, self.nprobe)
+            started = metrics.lap('score', started)
+            best = top_k_positions(scores, top_k)
+            results.append((candidates[best], scores[best]))
+            metrics.lap('select', started)
+        return results
+
+
+class HybridBackend:
+    """
+    Weighted fusion of TF-IDF cosine and LSA similarity
+
+    score = (1 - semantic_weight) * tfidf + semantic_weight * semantic
+
+    TF-IDF scores are exact (as in SparseBackend); semantic scores are added
+    for the FAQs in the probed IVF lists, so exact lexical matches keep a high
+    score while paraphrases can still reach the threshold.
+    """
+
+    name = 'hybrid'
+
+    # Share of the semantic score in the fused score (0-1)
+    semantic_weight = 0.5
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.lexical = SparseBackend(matcher)
+        self.semantic = SemanticBackend(matcher)
+
+    def build(self):
+        """Rebuild both underlying backends"""
+        self.lexical.build()
+        self.semantic.build()
+
+    def search(self, processed_questions, top_k, partition=None):
+        """Score FAQs with both backends, fuse the scores and keep the top_k"""
+        metrics = self.matcher.metrics
+        weight = self.semantic_weight
+        model = self.semantic.model
+        results = []
+        for processed in processed_questions:
+            started = metrics.start()
+            columns, weights = self.lexical.vectorize(processed)
+            query = model.embed(columns, weights)
+            started = metrics.lap('vectorize', started)
+            if partition is not None:
+                rows = partition.rows
+                scores = (1 - weight) * score_postings(partition.postings, columns, weights)
+                scores += weight * model.score_rows(query, rows)
+            else:
+                rows = None
+                scores = (1 - weight) * self.lexical.score(columns, weights)
+                candidates, semantic_scores = model.search(query, self.semantic.nprobe)
+                scores[candidates] += weight * semantic_scores
+            started = metrics.lap('score', started)
+            best = top_k_positions(scores, top_k)
+            results.append((best if rows is None else rows[best], scores[best]))
+            metrics.lap('select', started)
+        return results
+
+
+class BM25FBackend:
+    """
+    BM25F over two fields: FAQ questions and FAQ answers
+
+    Questions worded like an answer ("XS to 3XL", "2-3 business days") match
+    through the answer field, which the TF-IDF backends never look at. Per
+    FAQ and term, the field term frequencies are length-normalized, boosted
+    and summed before the BM25 saturation:
+
+        tf = sum over fields of boost * count / (1 - b + b * length / mean length)
+        weight = idf * tf / (k1 + tf)
+
+    These weights don't depend on the question, so they are precomputed into
+    a term-major matrix and a question is scored by adding the posting lists
+    of its terms (as in SparseBackend). For 0-1 scores like the other
+    backends, scores are divided by what a FAQ question equal to the user's
+    question would score. Terms no FAQ contains count in that reference
+    with the highest idf, so they lower the score (clipped to 1).
+
+    Answers are preprocessed when the backend is built. After FAQ edits only
+    new or changed answers are preprocessed again.
+    """
+
+    name = 'bm25'
+
+    # BM25 term frequency saturation
+    k1 = 1.2
+    # Weight of a term occurrence per field
+    field_boosts = {'question': 3.0, 'answer': 0.5}
+    # Length normalization per field (0: none, 1: full)
+    length_normalization = {'question': 0.75, 'answer': 0.75}
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        # Answer terms (append-only) and the answer term counts of the last build
+        self.answer_terms = []
+        self._answer_vocabulary = {}
+        self._answers = None  # (FAQ ids, answer hashes, CSR counts over answer_terms)
+        self.build()
+
+    def build(self):
+        """Count answer terms and precompute the BM25F weights and posting lists"""
+        matcher = self.matcher
+        question_counts = matcher.term_counts
+        answer_counts = self._answer_counts()
+        n_faqs, n_terms = question_counts.shape
+
+        # Answer terms share the matcher's columns; answer-only terms follow them
+        extra_terms = [term for term in self.answer_terms if term not in matcher.vocabulary]
+        self.query_vocabulary = dict(matcher.vocabulary)
+        self.query_vocabulary.update((term, n_terms + i) for i, term in enumerate(extra_terms))
+        columns = np.array(
+            [self.query_vocabulary[term] for term in self.answer_terms], dtype=np.int64
+        )
+        from scipy.sparse import csr_matrix
+        answer_counts = csr_matrix(
+            (answer_counts.data, columns[answer_counts.indices], answer_counts.indptr),
+            shape=(n_faqs, n_terms + len(extra_terms)),
+        )
+        question_counts = csr_matrix(
+            (question_counts.data, question_counts.indices, question_counts.indptr),
+            shape=answer_counts.shape,
+        )
+
+        # Boosted, length-normalized term frequency summed over both fields
+        tf = (
+            self._normalized(question_counts, 'question')
+            + self._normalized(answer_counts, 'answer')
+        ).tocsr()
+        tf.sort_indices()
+        doc_freq = np.bincount(tf.indices, minlength=tf.shape[1])
+        idf = np.log(1 + (n_faqs - doc_freq + 0.5) / (doc_freq + 0.5))
+        tf.data = idf[tf.indices] * tf.data / (self.k1 + tf.data)
+
+        postings = tf.T.tocsr()
+        postings.sort_indices()
+        self.postings = postings
+        # Weight of one occurrence in an average-length question, per term
+        boost = self.field_boosts['question']
+        saturation = boost / (self.k1 + boost)
+        self.reference_weight = idf * saturation
+        self.unknown_weight = np.log(1 + (n_faqs + 0.5) / 0.5) * saturation
+        # Partition postings are sliced from the FAQ-major weights on first use
+        self.weights = tf
+        self._partition_postings = {}
+
+    def vectorize(self, processed_question):
+        """
+        Term columns and counts of a preprocessed question
+
+        Returns:
+            Tuple (sorted term columns, term counts as floats, number of
+            terms that no FAQ contains)
+        """
+        counts = {}
+        unknown = 0
+        for token in TERM_PATTERN.findall(processed_question.lower()):
+            column = self.query_vocabulary.get(token)
+            if column is None:
+                unknown += 1
+            else:
+                counts[column] = counts.get(column, 0) + 1
+        columns = np.fromiter(sorted(counts), dtype=np.int64, count=len(counts))
+        weights = np.array([counts[column] for column in columns.tolist()], dtype=np.float64)
+        return columns, weights, unknown
+
+    def search(self, processed_questions, top_k, partition=None):
+        """Score FAQs by BM25F for each question and keep the top_k"""
+        metrics = self.matcher.metrics
+        postings = self.postings if partition is None else self._postings_for(partition)
+        results = []
+        for processed in processed_questions:
+            started = metrics.start()
+            columns, weights, unknown = self.vectorize(processed)
+            started = metrics.lap('vectorize', started)
+            scores = score_postings(postings, columns, weights)
+            reference = np.dot(weights, self.reference_weight[columns]) + unknown * self.unknown_weight
+            if reference > 0:
+                scores /= reference
+                np.minimum(scores, 1.0, out=scores)
+            started = metrics.lap('score', started)
+            best = top_k_positions(scores, top_k)
+            results.append((best if partition is None else partition.rows[best], scores[best]))
+            metrics.lap('select', started)
+        return results
+
+    def _normalized(self, counts, field):
+        """Boosted, length-normalized term counts of one field (FAQ-major CSR)"""
+        lengths = np.asarray(counts.sum(axis=1), dtype=np.float64).ravel()
+        mean_length = lengths.mean() if len(lengths) and lengths.mean() > 0 else 1.0
+        b = self.length_normalization[field]
+        row_factors = self.field_boosts[field] / (1 - b + b * lengths / mean_length)
+        rows = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+        from scipy.sparse import csr_matrix
+        return csr_matrix(
+            (counts.data * row_factors[rows], counts.indices, counts.indptr),
+            shape=counts.shape,
+        )
+
+    def _postings_for(self, partition):
+        """Term-major weights of a category partition's FAQs (cached until the next build)"""
+        key = id(partition)
+        cached = self._partition_postings.get(key)
+        if cached is None or cached[0] is not partition:
+            postings = self.weights[partition.rows].T.tocsr()
+            postings.sort_indices()
+            cached = (partition, postings)
+            self._partition_postings[key] = cached
+        return cached[1]
+
+    def _answer_counts(self):
+        """
+        Term counts of the preprocessed answers (FAQ-major CSR over answer_terms)
+
+        Rows whose FAQ id and answer are unchanged since the last build are
+        reused; only the others are preprocessed.
+        """
+        faqs = self.matcher.faqs
+        ids = np.asarray(faqs.ids, dtype=np.int64)
+        answers = list(faqs.answers)
+        hashes = np.fromiter((hash(answer or '') for answer in answers), dtype=np.int64, count=len(answers))
+
+        # Position of each FAQ's unchanged row in the previous counts (-1: recount)
+        previous_rows = np.full(len(ids), -1, dtype=np.int64)
+        if self._answers is not None and len(self._answers[0]):
+            old_ids, old_hashes, _ = self._answers
+            order = np.argsort(old_ids, kind='stable')
+            found = order[np.minimum(np.searchsorted(old_ids, ids, sorter=order), len(order) - 1)]
+            same = (old_ids[found] == ids) & (old_hashes[found] == hashes)
+            previous_rows[same] = found[same]
+
+        data, indices, indptr = [], [], [0]
+        recount = np.flatnonzero(previous_rows < 0)
+        for position in recount:
+            counts = {}
+            for term in TERM_PATTERN.findall(self.matcher.preprocess_document(answers[position] or '')):
+                column = self._answer_vocabulary.get(term)
+                if column is None:
+                    column = self._answer_vocabulary[term] = len(self.answer_terms)
+                    self.answer_terms.append(term)
+                counts[column] = counts.get(column, 0) + 1
+            for column in sorted(counts):
+                indices.append(column)
+                data.append(counts[column])
+            indptr.append(len(indices))
+        shape = (len(recount), len(self.answer_terms))
+        from scipy.sparse import csr_matrix, vstack
+        new_counts = csr_matrix(
+            (np.array(data, dtype=np.float64), np.array(indices, dtype=np.int64), np.array(indptr)),
+            shape=shape,
+        )
+
+        if self._answers is not None and len(recount) < len(ids):
+            old_counts = self._answers[2]
+            old_counts = csr_matrix(
+                (old_counts.data, old_counts.indices, old_counts.indptr),
+                shape=(old_counts.shape[0], len(self.answer_terms)),
+            )
+            stacked = vstack((old_counts, new_counts), format='csr')
+            rows = previous_rows.copy()
+            rows[recount] = old_counts.shape[0] + np.arange(len(recount))
+            counts = stacked[rows]
+        else:
+            counts = new_counts
+        self._answers = (ids, hashes, counts)
+        return counts
+
+
+# Registry of selectable backends
+BACKENDS = {
+    CosineBackend.name: CosineBackend,
+    InvertedIndexBackend.name: InvertedIndexBackend,
+    SparseBackend.name: SparseBackend,
+    SemanticBackend.name: SemanticBackend,
+    HybridBackend.name: HybridBackend,
+    BM25FBackend.name: BM25FBackend,
+}
+
+
+def create_backend(name, matcher):
+    """
+    Create the scoring backend registered under name
+
+    Args:
+        name: Backend name (see BACKENDS)
+        matcher: FAQMatcher the backend scores for
+
+    Returns:
+        Backend instance
+    """
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    return backend_class(matcher)
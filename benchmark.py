@@ -0,0 +1,364 @@
+"""
+Matcher Benchmark Suite
+Reproducible latency, throughput and memory benchmarks for FAQMatcher
+
+Scenarios (run for every corpus size, each size in a fresh process):
+- cold_start:   import of faq_matcher + FAQMatcher.__init__ (fit), and a
+                second start that loads the persisted index
+- latency:      single-query find_best_match p50/p95/p99 (ms)
+- throughput:   find_best_matches batch queries per second
+- memory:       peak RSS of the process (MB) and size of the FAQ store (MB)
+
+Import profile mode (--import-profile) runs `python -X importtime` on a module
+and reports its slowest imports, and whether heavy dependencies (NLTK,
+scikit-learn, SciPy) were loaded at import time.
+
+Synthetic corpora of any size are generated deterministically from the seed
+FAQs in init_db.SEED_FAQS.
+
+Usage:
+    python benchmark.py --output results.json
+    python benchmark.py --sizes 40,1000 --compare results.json
+    python benchmark.py --import-profile faq_matcher
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_SIZES = (40, 1000, 10000, 100000)
+
+# Metrics where a lower value is better (all others: higher is better)
+LOWER_IS_BETTER = {
+    "import_s", "init_s", "index_load_s",
+    "latency_p50_ms", "latency_p95_ms", "latency_p99_ms",
+    "peak_rss_mb", "store_mb",
+}
+
+# Words mixed into synthetic questions so the vocabulary grows with the corpus
+PRODUCTS = [
+    "dress", "jacket", "jeans", "shirt", "t-shirt", "sweater", "hoodie", "skirt",
+    "coat", "blazer", "shorts", "leggings", "scarf", "hat", "sneakers", "boots",
+    "sandals", "belt", "bag", "socks", "pajamas", "swimsuit", "cardigan", "vest",
+]
+MODIFIERS = [
+    "summer", "winter", "linen", "cotton", "wool", "denim", "silk", "organic",
+    "kids", "maternity", "petite", "plus-size", "sale", "limited", "classic", "new",
+]
+# Dependencies that should load on first use, not at import time
+HEAVY_MODULES = ("nltk", "sklearn", "scipy")
+
+OFF_TOPIC = [
+    "What is the weather like today?",
+    "Who won the football game?",
+    "Tell me a joke",
+    "How do I cook pasta?",
+]
+
+
+def generate_corpus(size, seed=0):
+    """
+    Generate a synthetic FAQ corpus from the seed FAQs
+
+    Args:
+        size: Number of FAQs
+        seed: Random seed
+
+    Returns:
+        List of tuples (id, question, answer, category)
+    """
+    from init_db import SEED_FAQS
+
+    rng = random.Random(seed)
+    faqs = []
+    for i in range(size):
+        question, answer, category = SEED_FAQS[i % len(SEED_FAQS)]
+        if i >= len(SEED_FAQS):
+            product = f"{rng.choice(MODIFIERS)} {rng.choice(PRODUCTS)}"
+            line = f"line{rng.randrange(max(1, size // 50))}"
+            question = f"{question.rstrip('?')} for the {product} {line}?"
+            answer = f"{answer} This applies to our {product} {line} collection."
+        faqs.append((i + 1, question, answer, category))
+    return faqs
+
+
+def generate_queries(faqs, count, seed=1):
+    """
+    Generate user-like queries: paraphrased FAQ questions plus some off-topic ones
+
+    Args:
+        faqs: Corpus from generate_corpus()
+        count: Number of queries
+        seed: Random seed
+
+    Returns:
+        List of query strings
+    """
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        if i % 10 == 9:
+            queries.append(f"{rng.choice(OFF_TOPIC)} ({i})")
+            continue
+        words = rng.choice(faqs)[1].rstrip("?").split()
+        if len(words) > 3:
+            del words[rng.randrange(len(words))]
+        queries.append(" ".join(words).lower() + rng.choice(["?", "", " please", "!"]))
+    return queries
+
+
+def percentile(values, pct):
+    """Get the pct-th percentile of a list of numbers (nearest rank)"""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_size(size, backend="cosine", n_queries=1000, batch_size=1024):
+    """
+    Run all scenarios for one corpus size in the current process
+
+    Meant to be called in a fresh interpreter (see main) so import time and
+    peak RSS are not polluted by earlier sizes.
+
+    Returns:
+        Dictionary of metric name -> value
+    """
+    faqs = generate_corpus(size)
+    queries = generate_queries(faqs, n_queries)
+
+    # Cold start: import + fit
+    start = time.perf_counter()
+    from faq_matcher import FAQMatcher, text_preprocessor
+    import_s = time.perf_counter() - start
+
+    index_dir = tempfile.mkdtemp(prefix="faq-bench-")
+    try:
+        start = time.perf_counter()
+        FAQMatcher(faqs, backend=backend, index_dir=os.path.join(index_dir, "index"))
+        init_s = time.perf_counter() - start
+
+        # Warm start: load the persisted index
+        start = time.perf_counter()
+        matcher = FAQMatcher(faqs, backend=backend, index_dir=os.path.join(index_dir, "index"))
+        index_load_s = time.perf_counter() - start
+    finally:
+        shutil.rmtree(index_dir, ignore_errors=True)
+
+    # Single-query latency (queries are unique; start from empty query caches)
+    text_preprocessor.clear_cache()
+    if matcher.result_cache is not None:
+        matcher.result_cache.clear()
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        matcher.find_best_match(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    # Batch throughput
+    text_preprocessor.clear_cache()
+    if matcher.result_cache is not None:
+        matcher.result_cache.clear()
+    start = time.perf_counter()
+    matcher.find_best_matches(queries, batch_size=batch_size)
+    batch_s = time.perf_counter() - start
+
+    return {
+        "import_s": round(import_s, 4),
+        "init_s": round(init_s, 4),
+        "index_load_s": round(index_load_s, 4),
+        "latency_p50_ms": round(percentile(latencies, 50), 4),
+        "latency_p95_ms": round(percentile(latencies, 95), 4),
+        "latency_p99_ms": round(percentile(latencies, 99), 4),
+        "single_qps": round(len(queries) / (sum(latencies) / 1000), 1),
+        "batch_qps": round(len(queries) / batch_s, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "store_mb": round(matcher.faqs.nbytes / 1e6, 2),
+    }
+
+
+def import_profile(module="faq_matcher", top=15):
+    """
+    Profile the import of a module in a fresh interpreter (python -X importtime)
+
+    Args:
+        module: Module to import
+        top: Number of slowest imports to report
+
+    Returns:
+        Dictionary with total import time (ms), the slowest imports by
+        cumulative time (ms) and the heavy modules that were imported
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if completed.returncode != 0:
+        print(completed.stderr, file=sys.stderr)
+        raise RuntimeError(f"Importing {module} failed")
+
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    cumulative = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, total_us, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(total_us) / 1000
+    slowest = sorted(cumulative.items(), key=lambda item: -item[1])[:top]
+    return {
+        "module": module,
+        "total_ms": round(cumulative.get(module, 0.0), 2),
+        "slowest_ms": {name: round(ms, 2) for name, ms in slowest},
+        "heavy_imports": [name for name in HEAVY_MODULES if name in cumulative],
+    }
+
+
+def environment_info():
+    """Describe the machine and code version the results belong to"""
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    try:
+        info["commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        info["commit"] = None
+    return info
+
+
+def run_benchmarks(sizes, backend="cosine", n_queries=1000):
+    """
+    Run every size in its own subprocess
+
+    Returns:
+        Dictionary with 'environment', 'config' and 'results' (size -> metrics)
+    """
+    results = {}
+    for size in sizes:
+        print(f"⏱  Benchmarking {size} FAQs ({backend})...", file=sys.stderr)
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run-size", str(size),
+             "--backend", backend, "--queries", str(n_queries)],
+            capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            print(completed.stderr, file=sys.stderr)
+            raise RuntimeError(f"Benchmark for {size} FAQs failed")
+        results[str(size)] = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {
+        "environment": environment_info(),
+        "config": {"backend": backend, "queries": n_queries, "sizes": list(sizes)},
+        "results": results,
+    }
+
+
+def compare(baseline, current, tolerance=0.10):
+    """
+    Compare two benchmark reports
+
+    Args:
+        baseline: Earlier report (e.g. from the previous commit)
+        current: New report
+        tolerance: Relative change beyond which a metric counts as a regression
+
+    Returns:
+        Tuple (lines of a printable table, number of regressions)
+    """
+    lines = [f"{'size':>8}  {'metric':<16} {'baseline':>12} {'current':>12} {'change':>9}"]
+    regressions = 0
+    for size, metrics in current["results"].items():
+        old_metrics = baseline.get("results", {}).get(size)
+        if old_metrics is None:
+            continue
+        for metric, value in metrics.items():
+            old = old_metrics.get(metric)
+            if old in (None, 0):
+                continue
+            change = (value - old) / old
+            worse = change > tolerance if metric in LOWER_IS_BETTER else change < -tolerance
+            regressions += worse
+            flag = "  ✗ regression" if worse else ""
+            lines.append(f"{size:>8}  {metric:<16} {old:>12} {value:>12} {change:>+8.1%}{flag}")
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FAQMatcher benchmark suite")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated corpus sizes")
+    parser.add_argument("--backend", default="cosine", help="Scoring backend (see backends.py)")
+    parser.add_argument("--queries", type=int, default=1000, help="Queries per scenario")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Relative change that counts as a regression")
+    parser.add_argument("--import-profile", nargs="?", const="faq_matcher", metavar="MODULE",
+                        help="Profile the import of MODULE (default: faq_matcher) instead")
+    parser.add_argument("--run-size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.import_profile:
+        profile = import_profile(args.import_profile)
+        for name, ms in profile["slowest_ms"].items():
+            print(f"{ms:>10.2f} ms  {name}", file=sys.stderr)
+        if profile["heavy_imports"]:
+            print(f"✗ Imported at startup: {', '.join(profile['heavy_imports'])}", file=sys.stderr)
+        else:
+            print(f"✓ {args.import_profile} imports in {profile['total_ms']} ms "
+                  f"without {', '.join(HEAVY_MODULES)}", file=sys.stderr)
+        output = json.dumps(profile, indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(output + "\n")
+        else:
+            print(output)
+        return
+
+    if args.run_size is not None:
+        # Child process: run one size and print its metrics as JSON
+        print(json.dumps(run_size(args.run_size, args.backend, args.queries)))
+        return
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    report = run_benchmarks(sizes, args.backend, args.queries)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        print(f"✓ Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        lines, regressions = compare(baseline, report, args.tolerance)
+        print("\n".join(lines), file=sys.stderr)
+        if regressions:
+            print(f"✗ {regressions} regression(s) beyond {args.tolerance:.0%}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
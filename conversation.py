@@ -0,0 +1,140 @@
+"""
+Conversation Engine
+Multi-turn FAQ conversations with session state kept outside the UI
+
+Sessions live in a process-wide store (a query_cache.QueryCache keyed by
+session id) with a size cap and an idle TTL, and each session keeps only its
+most recent turns. Follow-up questions are matched with the previous answer's
+category as context: a vague follow-up like "how much does it cost?" after a
+shipping question prefers shipping FAQs, while a question that clearly fits
+another category still gets its own best match.
+
+Each question is counted once in the matcher's metrics and query log (with
+its overall best match); the lookup within the previous category is not
+recorded.
+"""
+
+import time
+from collections import deque, namedtuple
+from query_cache import QueryCache, MISSING
+
+# One question and its answer (match is a FAQMatcher result dictionary or None;
+# context is the category the question was narrowed to, if any)
+Turn = namedtuple("Turn", ["question", "match", "context", "timestamp"])
+
+
+class Conversation:
+    """Recent turns of one session"""
+
+    __slots__ = ("turns", "asked")
+
+    def __init__(self, max_turns):
+        self.turns = deque(maxlen=max_turns)
+        self.asked = 0
+
+    @property
+    def category(self):
+        """Category of the previous answer, or None"""
+        if self.turns and self.turns[-1].match:
+            return self.turns[-1].match['category']
+        return None
+
+
+class ConversationEngine:
+    """Answers questions per session, using the previous turn as context"""
+
+    def __init__(self, matcher, max_sessions=1000, session_ttl=1800, max_turns=50,
+                 threshold=0.3, follow_up_margin=0.25):
+        """
+        Args:
+            matcher: FAQMatcher answering the questions
+            max_sessions: Maximum number of stored sessions (least recently
+                          active ones are evicted first)
+            session_ttl: Seconds after a session's last question until it is
+                         dropped (None: sessions only leave through eviction)
+            max_turns: Turns kept per session (older ones are forgotten)
+            threshold: Minimum similarity of an answer
+            follow_up_margin: How much lower an answer from the previous turn's
+                              category may score than the overall best match
+                              and still be preferred
+        """
+        self.matcher = matcher
+        self.max_turns = max_turns
+        self.threshold = threshold
+        self.follow_up_margin = follow_up_margin
+        self.sessions = QueryCache(max_size=max_sessions, ttl=session_ttl)
+
+    def ask(self, session_id, question):
+        """
+        Answer a question within a session and record the turn
+
+        Args:
+            session_id: Identifier of the conversation (e.g. one per browser tab)
+            question: User's question
+
+        Returns:
+            The new Turn
+        """
+        conversation = self._conversation(session_id)
+        context = conversation.category
+        match = self.matcher.find_best_match(question, self.threshold)
+
+        # Follow-up: prefer the previous category unless another one is clearly better
+        if context is not None and (match is None or (match['category'] or '').lower() != context.lower()):
+            follow_up = self.matcher.find_best_match(question, self.threshold, category=context, record=False)
+            if follow_up is not None and (
+                match is None
+                or follow_up['similarity_score'] >= match['similarity_score'] - self.follow_up_margin * 100
+            ):
+                match = follow_up
+            else:
+                context = None
+        else:
+            context = None
+
+        turn = Turn(question, match, context, time.time())
+        conversation.turns.append(turn)
+        conversation.asked += 1
+        # Storing it again restarts the session's TTL
+        self.sessions.put(session_id, conversation)
+        return turn
+
+    def history(self, session_id, page=0, page_size=10):
+        """
+        Get one page of a session's turns
+
+        Args:
+            session_id: Identifier of the conversation
+            page: Page number, 0 being the most recent turns
+            page_size: Turns per page
+
+        Returns:
+            Tuple (turns of the page in chronological order, number of pages)
+        """
+        conversation = self._conversation(session_id)
+        turns = conversation.turns
+        pages = max(1, -(-len(turns) // page_size))
+        page = min(max(page, 0), pages - 1)
+        end = len(turns) - page * page_size
+        start = max(0, end - page_size)
+        return [turns[i] for i in range(start, end)], pages
+
+    def asked(self, session_id):
+        """Number of questions asked in a session (including forgotten turns)"""
+        return self._conversation(session_id).asked
+
+    def clear(self, session_id):
+        """Forget a session's turns"""
+        self.sessions.put(session_id, Conversation(self.max_turns))
+
+    def stats(self):
+        """Get session store counters"""
+        return self.sessions.stats()
+
+    def _conversation(self, session_id):
+        """Get a session's conversation, starting a new one if it is unknown or expired"""
+        conversation = self.sessions.get(session_id)
+        if conversation is MISSING:
+            conversation = Conversation(self.max_turns)
+            self.sessions.put(session_id, conversation)
+        return conversation
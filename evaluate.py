@@ -0,0 +1,345 @@
+"""
+Matcher Evaluation
+Measures matching accuracy, false matches and throughput of FAQMatcher
+backends on a labeled question set, and suggests a similarity threshold
+
+The labeled set is a JSONL file with one question per line:
+    {"question": "how long does shipping take", "faq_id": 4}
+    {"question": "who won the football game", "faq_id": null}
+faq_id is the id of the FAQ that should match; null marks an off-topic
+question that should not match anything.
+
+Questions are scored in batches across a process pool. The matcher index is
+built once in this process and memory-mapped by every worker (see
+index_store.py), so workers start in milliseconds. Each worker returns the
+top-k FAQ ids and scores of its batch; all metrics are derived from those:
+- top-1 / top-k accuracy on the labeled (in-scope) questions
+- per threshold: answered rate, accuracy, precision and false-match rate
+  (answered with a wrong FAQ, or answered an off-topic question)
+- recommended threshold: the lowest one whose false-match rate stays within
+  --max-false-match (answers the most questions under that bound)
+- queries per second across all workers
+
+Usage:
+    python evaluate.py labeled.jsonl --generate 100000
+    python evaluate.py labeled.jsonl --backends cosine,sparse,hybrid --top-k 5
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Thresholds swept by default: 0.00, 0.05, ..., 0.95
+DEFAULT_THRESHOLDS = tuple(round(step * 0.05, 2) for step in range(20))
+
+# Matcher of the current worker process and the barrier used to start all
+# workers before timing (see _init_worker)
+_worker_matcher = None
+_worker_barrier = None
+
+
+def generate_labeled_set(faqs, count, seed=1, off_topic_share=0.1):
+    """
+    Generate labeled questions: FAQ questions with a word dropped and the case
+    and punctuation changed, plus off-topic questions labeled None
+
+    Args:
+        faqs: List of tuples (id, question, answer, category)
+        count: Number of questions
+        seed: Random seed
+        off_topic_share: Fraction of off-topic questions
+
+    Yields:
+        Dictionaries {"question": ..., "faq_id": ...}
+    """
+    from benchmark import OFF_TOPIC
+
+    rng = random.Random(seed)
+    for i in range(count):
+        if rng.random() < off_topic_share:
+            yield {"question": f"{rng.choice(OFF_TOPIC)} ({i})", "faq_id": None}
+            continue
+        faq_id, question = rng.choice(faqs)[:2]
+        words = question.rstrip("?").split()
+        if len(words) > 3:
+            del words[rng.randrange(len(words))]
+        question = " ".join(words).lower() + rng.choice(["?", "", " please", "!"])
+        yield {"question": question, "faq_id": faq_id}
+
+
+def load_labeled_set(path, question_field="question", label_field="faq_id"):
+    """
+    Read a labeled JSONL file
+
+    Returns:
+        Tuple (list of questions, int64 array of FAQ ids with -1 for off-topic)
+    """
+    from faq_import import read_jsonl
+
+    questions, labels = [], []
+    for record in read_jsonl(path):
+        question = record.get(question_field)
+        if not isinstance(question, str) or not question.strip():
+            continue
+        label = record.get(label_field)
+        questions.append(question)
+        labels.append(-1 if label is None else int(label))
+    return questions, np.array(labels, dtype=np.int64)
+
+
+def _init_worker(index_dir, backend, barrier):
+    """Load the shared (memory-mapped) index once per worker process"""
+    global _worker_matcher, _worker_barrier
+    from faq_matcher import FAQMatcher
+    # No result cache: every question is scored, so throughput is honest
+    _worker_matcher = FAQMatcher(None, backend=backend, index_dir=index_dir, cache_size=0)
+    _worker_barrier = barrier
+
+
+def _warm_up(_):
+    """Load lazy resources (stopwords, WordNet), then wait until every worker got here"""
+    _worker_matcher.find_best_match("warm up")
+    _worker_barrier.wait()
+
+
+def _score_batch(questions, top_k):
+    """
+    Score a batch in a worker
+
+    Returns:
+        Tuple (int64 array of FAQ ids, float array of scores), both
+        len(questions) x top_k and padded with -1 / 0.0
+    """
+    ids = np.full((len(questions), top_k), -1, dtype=np.int64)
+    scores = np.zeros((len(questions), top_k))
+    # Unrounded similarities, so the threshold sweep isn't quantized
+    for row, (faq_ids, similarities) in enumerate(_worker_matcher.top_scores(questions, top_k)):
+        ids[row, :len(faq_ids)] = faq_ids
+        scores[row, :len(similarities)] = similarities
+    return ids, scores
+
+
+def score_questions(questions, index_dir, backend, top_k=5, batch_size=1024, workers=None):
+    """
+    Score questions with a process pool
+
+    Args:
+        questions: List of questions
+        index_dir: Persisted matcher index the workers load
+        backend: Scoring backend (see backends.BACKENDS)
+        top_k: Matches kept per question
+        batch_size: Questions per worker task
+        workers: Number of worker processes (default: CPU count)
+
+    Returns:
+        Tuple (ids, scores, seconds) with ids/scores as in _score_batch for
+        all questions, and the wall-clock scoring time (pool startup excluded)
+    """
+    workers = workers or os.cpu_count()
+    batches = [questions[start:start + batch_size] for start in range(0, len(questions), batch_size)]
+    barrier = multiprocessing.Barrier(workers)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(index_dir, backend, barrier)) as pool:
+        # One warm-up task per worker (the barrier keeps a worker from taking
+        # two), so all workers are ready before the clock starts
+        list(pool.map(_warm_up, range(workers)))
+        start = time.perf_counter()
+        results = list(pool.map(_score_batch, batches, [top_k] * len(batches)))
+        seconds = time.perf_counter() - start
+    if not results:
+        return np.empty((0, top_k), dtype=np.int64), np.empty((0, top_k)), seconds
+    ids, scores = zip(*results)
+    return np.concatenate(ids), np.concatenate(scores), seconds
+
+
+def evaluate_scores(ids, scores, labels, thresholds=DEFAULT_THRESHOLDS, max_false_match=0.05):
+    """
+    Accuracy and threshold metrics from top-k results
+
+    Args:
+        ids: FAQ ids (questions x k), best first, -1 for no match
+        scores: Similarity scores (0-1) aligned with ids
+        labels: Expected FAQ id per question (-1: should not match)
+        thresholds: Thresholds to evaluate
+        max_false_match: Highest acceptable false-match rate for the
+                         recommended threshold
+
+    Returns:
+        Dictionary with 'questions', 'labeled', 'top1_accuracy',
+        'topk_accuracy', 'thresholds' (list of per-threshold metrics) and
+        'recommended_threshold' (None if no threshold meets max_false_match)
+    """
+    labeled = labels >= 0
+    n_labeled = int(labeled.sum())
+    correct_top1 = (ids[:, 0] == labels) & labeled
+    correct_topk = (ids == labels[:, None]).any(axis=1) & labeled
+
+    # answered[t, q]: question q gets its top-1 match at threshold t
+    threshold_array = np.asarray(thresholds, dtype=np.float64)
+    answered = (ids[:, 0] >= 0)[None, :] & (scores[:, 0][None, :] >= threshold_array[:, None])
+    n_answered = answered.sum(axis=1)
+    n_correct = (answered & correct_top1[None, :]).sum(axis=1)
+    n_false = n_answered - n_correct
+
+    n_questions = max(len(labels), 1)
+    sweep = []
+    recommended = None
+    for threshold, answered_count, correct, false in zip(thresholds, n_answered, n_correct, n_false):
+        false_match_rate = false / n_questions
+        sweep.append({
+            "threshold": threshold,
+            "answered": round(answered_count / n_questions, 4),
+            "accuracy": round(correct / max(n_labeled, 1), 4),
+            "precision": round(correct / answered_count, 4) if answered_count else None,
+            "false_match_rate": round(false_match_rate, 4),
+        })
+        if recommended is None and false_match_rate <= max_false_match:
+            recommended = threshold
+    return {
+        "questions": len(labels),
+        "labeled": n_labeled,
+        "top1_accuracy": round(correct_top1.sum() / max(n_labeled, 1), 4),
+        "topk_accuracy": round(correct_topk.sum() / max(n_labeled, 1), 4),
+        "thresholds": sweep,
+        "recommended_threshold": recommended,
+    }
+
+
+def evaluate(questions, labels, backends=("cosine",), index_dir=None, top_k=5, batch_size=1024,
+             workers=None, thresholds=DEFAULT_THRESHOLDS, max_false_match=0.05):
+    """
+    Evaluate backends on a labeled question set against the FAQ database
+
+    Args:
+        questions: List of questions
+        labels: Expected FAQ id per question (-1: should not match)
+        backends: Backend names to evaluate
+        index_dir: Matcher index directory (default: a temporary one)
+        top_k: Matches kept per question (top-k accuracy)
+        batch_size: Questions per worker task
+        workers: Number of worker processes (default: CPU count)
+        thresholds: Thresholds to evaluate
+        max_false_match: False-match rate bound for the recommended threshold
+
+    Returns:
+        Dictionary backend -> metrics (see evaluate_scores) plus 'qps',
+        'seconds' and 'workers'
+    """
+    from init_db import get_all_faqs
+    from faq_matcher import FAQMatcher
+
+    faqs = get_all_faqs()
+    tmp_dir = None
+    if index_dir is None:
+        tmp_dir = tempfile.mkdtemp(prefix="faq-eval-")
+        index_dir = os.path.join(tmp_dir, "index")
+    workers = workers or os.cpu_count()
+    results = {}
+    try:
+        for backend in backends:
+            print(f"⏱  Evaluating {len(questions):,} questions ({backend}, {workers} workers)...",
+                  file=sys.stderr)
+            # Build (or validate) the index and any backend model once, here
+            FAQMatcher(faqs, backend=backend, index_dir=index_dir, cache_size=0)
+            ids, scores, seconds = score_questions(
+                questions, index_dir, backend, top_k, batch_size, workers
+            )
+            metrics = evaluate_scores(ids, scores, labels, thresholds, max_false_match)
+            metrics["qps"] = round(len(questions) / seconds, 1) if seconds else None
+            metrics["seconds"] = round(seconds, 2)
+            metrics["workers"] = workers
+            results[backend] = metrics
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    return results
+
+
+def print_summary(results, top_k):
+    """Print a per-backend summary table to stderr"""
+    print(f"{'backend':<10} {'top-1':>7} {f'top-{top_k}':>7} {'qps':>10} {'threshold':>10} "
+          f"{'answered':>9} {'false':>7}", file=sys.stderr)
+    for backend, metrics in results.items():
+        threshold = metrics["recommended_threshold"]
+        row = next((row for row in metrics["thresholds"] if row["threshold"] == threshold), None)
+        print(
+            f"{backend:<10} {metrics['top1_accuracy']:>7.1%} {metrics['topk_accuracy']:>7.1%} "
+            f"{metrics['qps']:>10,.0f} {threshold if threshold is not None else '-':>10} "
+            f"{row['answered'] if row else 0:>9.1%} {row['false_match_rate'] if row else 0:>7.1%}",
+            file=sys.stderr,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate FAQMatcher backends on labeled questions")
+    parser.add_argument("path", help="Labeled JSONL file ({\"question\": ..., \"faq_id\": ...} per line)")
+    parser.add_argument("--generate", type=int, metavar="N",
+                        help="Write N synthetic labeled questions from the FAQ database to path and exit")
+    parser.add_argument("--db", help="SQLite database file (default: init_db.DB_PATH)")
+    parser.add_argument("--backends", default="cosine", help="Comma-separated backends to evaluate")
+    parser.add_argument("--index-dir", help="Matcher index directory (default: a temporary one)")
+    parser.add_argument("--top-k", type=int, default=5, help="k for top-k accuracy")
+    parser.add_argument("--batch-size", type=int, default=1024, help="Questions per worker task")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-false-match", type=float, default=0.05,
+                        help="False-match rate bound for the recommended threshold")
+    parser.add_argument("--question-field", default="question")
+    parser.add_argument("--label-field", default="faq_id")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    import init_db
+    if args.db:
+        init_db.DB_PATH = args.db
+
+    if args.generate:
+        with open(args.path, "w", encoding="utf-8") as f:
+            for record in generate_labeled_set(init_db.get_all_faqs(), args.generate):
+                f.write(json.dumps(record) + "\n")
+        print(f"✓ Wrote {args.generate:,} labeled questions to {args.path}")
+        return
+
+    try:
+        questions, labels = load_labeled_set(args.path, args.question_field, args.label_field)
+    except (OSError, ValueError) as e:
+        print(f"✗ Could not read labeled set: {e}")
+        sys.exit(1)
+    if not questions:
+        print(f"✗ No labeled questions in {args.path}")
+        sys.exit(1)
+
+    from benchmark import environment_info
+
+    backends = [backend.strip() for backend in args.backends.split(",") if backend.strip()]
+    results = evaluate(
+        questions, labels, backends, args.index_dir, args.top_k, args.batch_size,
+        args.workers, max_false_match=args.max_false_match,
+    )
+    print_summary(results, args.top_k)
+    report = {
+        "environment": environment_info(),
+        "config": {
+            "labeled_set": args.path, "backends": backends, "top_k": args.top_k,
+            "batch_size": args.batch_size, "max_false_match": args.max_false_match,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        print(f"✓ Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
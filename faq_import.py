@@ -0,0 +1,163 @@
+"""
+Bulk FAQ Import
+Streams FAQ dumps from CSV or JSONL files into faqs.db
+
+Records are read with generators and inserted in chunked transactions by
+FAQRepository.import_faqs, so memory stays bounded for files of any size.
+Questions are deduplicated by normalized text (case, whitespace and trailing
+punctuation are ignored), both within the file and against stored FAQs.
+
+Usage:
+    python faq_import.py faqs.csv
+    python faq_import.py requests.jsonl --question-field title --answer-field body \
+        --default-category Requests
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+import init_db
+
+# Readers by file format
+FORMATS = ("csv", "jsonl")
+
+
+def read_csv(path):
+    """Yield the rows of a CSV file (with a header line) as dictionaries"""
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def read_jsonl(path):
+    """Yield the objects of a JSONL file, one per non-empty line"""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{line_number}: invalid JSON ({e.msg})") from None
+
+
+def read_records(path, file_format=None):
+    """
+    Yield the records of a CSV or JSONL file as dictionaries
+
+    Args:
+        path: Input file
+        file_format: 'csv' or 'jsonl' (default: guessed from the file extension)
+    """
+    if file_format is None:
+        extension = os.path.splitext(path)[1].lower()
+        file_format = "csv" if extension == ".csv" else "jsonl"
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format '{file_format}'. Choose from: {', '.join(FORMATS)}")
+    return read_csv(path) if file_format == "csv" else read_jsonl(path)
+
+
+def map_records(records, question_field="question", answer_field="answer",
+                category_field="category", default_category=None, skipped=None):
+    """
+    Map records to (question, answer, category) tuples
+
+    Records without a question or answer are skipped.
+
+    Args:
+        records: Iterable of dictionaries
+        question_field: Key of the question
+        answer_field: Key of the answer
+        category_field: Key of the category (missing values use default_category)
+        default_category: Category for records without one
+        skipped: Optional list; skipped records are counted in skipped[0]
+
+    Yields:
+        Tuples (question, answer, category)
+    """
+    for record in records:
+        question = str(record.get(question_field) or "").strip()
+        answer = str(record.get(answer_field) or "").strip()
+        if not question or not answer:
+            if skipped is not None:
+                skipped[0] += 1
+            continue
+        category = record.get(category_field) if category_field else None
+        yield question, answer, str(category).strip() if category else default_category
+
+
+def import_file(path, file_format=None, chunk_size=10000, skip_existing=True, progress=None,
+                **field_mapping):
+    """
+    Import a CSV or JSONL file into the FAQ database (init_db.DB_PATH)
+
+    Args:
+        path: Input file
+        file_format: 'csv' or 'jsonl' (default: guessed from the file extension)
+        chunk_size: Rows per transaction
+        skip_existing: Skip questions that are already in the database
+        progress: Optional callback called with the stats after every chunk
+        **field_mapping: Passed to map_records (question_field, answer_field,
+                         category_field, default_category)
+
+    Returns:
+        Import stats (see FAQRepository.import_faqs) plus 'skipped' records
+    """
+    skipped = [0]
+    rows = map_records(read_records(path, file_format), skipped=skipped, **field_mapping)
+    repository = init_db.get_repository()
+    repository.create_schema()
+    stats = repository.import_faqs(rows, chunk_size, skip_existing, progress)
+    stats["skipped"] = skipped[0]
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream FAQs from CSV/JSONL into faqs.db")
+    parser.add_argument("path", help="CSV (with header) or JSONL file")
+    parser.add_argument("--format", choices=FORMATS, help="Input format (default: from extension)")
+    parser.add_argument("--db", default=init_db.DB_PATH, help="SQLite database file")
+    parser.add_argument("--tenant", help="Import into this tenant's shard next to --db "
+                                         "(faqs.<tenant>.db, see sharded_matcher.py)")
+    parser.add_argument("--question-field", default="question")
+    parser.add_argument("--answer-field", default="answer")
+    parser.add_argument("--category-field", default="category")
+    parser.add_argument("--default-category", help="Category for records without one")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per transaction")
+    parser.add_argument("--keep-existing-duplicates", action="store_true",
+                        help="Only deduplicate within the file, not against stored FAQs")
+    args = parser.parse_args()
+
+    init_db.DB_PATH = args.db
+    if args.tenant:
+        from sharded_matcher import shard_db_path
+        try:
+            init_db.DB_PATH = shard_db_path(args.tenant, args.db)
+        except ValueError as e:
+            print(f"✗ Import failed: {e}")
+            sys.exit(1)
+
+    def report(stats):
+        print(f"\r   {stats['read']:,} rows read, {stats['inserted']:,} inserted "
+              f"({stats['rows_per_s']:,.0f} rows/s)", end="", file=sys.stderr)
+
+    print(f"Importing {args.path}...")
+    try:
+        stats = import_file(
+            args.path, args.format, args.chunk_size, not args.keep_existing_duplicates, report,
+            question_field=args.question_field, answer_field=args.answer_field,
+            category_field=args.category_field, default_category=args.default_category,
+        )
+    except (OSError, ValueError) as e:
+        print(f"\n✗ Import failed: {e}")
+        sys.exit(1)
+    print(file=sys.stderr)
+    print(f"✓ Imported {stats['inserted']:,} FAQs in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_s']:,.0f} rows/s)")
+    print(f"   Duplicates skipped: {stats['duplicates']:,}")
+    print(f"   Incomplete records skipped: {stats['skipped']:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,42 +4,180 @@ Uses NLTK for text preprocessing and cosine similarity for matching user questio
 Model: TF-IDF (Term Frequency-Inverse Document Frequency) + Cosine Similarity
 """
 
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import string
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
 import numpy as np
+from backends import create_backend
+from faq_store import FAQStore
+import index_store
+from metrics import matcher_metrics
+from query_cache import MISSING, QueryCache
+from preprocessing import TextPreprocessor
+from spelling import SpellingCorrector
 
-# Download required NLTK data
-def download_nltk_data():
-    """Download necessary NLTK resources"""
+# NLTK, scikit-learn and SciPy are imported on first use, not at import time,
+# so CLI tools and service workers start fast (scipy.sparse alone takes ~180 ms
+# and is only needed once a matcher is built). NLTK data is only downloaded
+# when a resource is first needed (or by download_nltk_data()).
+NLTK_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet',
+    'punkt_tab': 'tokenizers/punkt_tab',
+}
+
+_lemmatizer = None
+_lemmatizer_lock = threading.Lock()
+
+
+def ensure_nltk_resource(name):
+    """Download an NLTK resource if it is not installed"""
+    import nltk
     try:
-        nltk.data.find('tokenizers/punkt')
+        nltk.data.find(NLTK_RESOURCES[name])
     except LookupError:
-        nltk.download('punkt', quiet=True)
+        nltk.download(name, quiet=True)
+
+
+def download_nltk_data():
+    """Download necessary NLTK resources (optional setup step)"""
+    for name in NLTK_RESOURCES:
+        ensure_nltk_resource(name)
+
+
+def load_stop_words():
+    """Load NLTK's English stopwords"""
+    ensure_nltk_resource('stopwords')
+    from nltk.corpus import stopwords
+    return set(stopwords.words('english'))
+
+
+def get_lemmatizer():
+    """Get the shared WordNet lemmatizer, loading WordNet on first use"""
+    global _lemmatizer
+    if _lemmatizer is None:
+        with _lemmatizer_lock:
+            if _lemmatizer is None:
+                ensure_nltk_resource('wordnet')
+                from nltk.stem import WordNetLemmatizer
+                lemmatizer = WordNetLemmatizer()
+                # Load the WordNet corpus now, under the lock
+                lemmatizer.lemmatize('faq')
+                _lemmatizer = lemmatizer
+    return _lemmatizer
+
+
+def lemmatize(word):
+    """Lemmatize a token with WordNet"""
+    return get_lemmatizer().lemmatize(word)
+
+
+def __getattr__(name):
+    # Module attributes kept for compatibility, created on first access
+    if name == 'lemmatizer':
+        return get_lemmatizer()
+    if name == 'stop_words':
+        return text_preprocessor.drop_tokens - frozenset(string.punctuation)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Shared preprocessing pipeline (regex tokenizer, cached lemmas and queries).
+# Stopwords load on the first query; WordNet on the first lemma cache miss.
+# Pass tokenize=word_tokenize to use the exact NLTK tokenizer instead.
+text_preprocessor = TextPreprocessor(load_stop_words, lemmatize, metrics=matcher_metrics)
+
+class ReadWriteLock:
+    """
+    Lock taken shared by searches and exclusively by edits
     
-    try:
-        nltk.data.find('corpora/stopwords')
-    except LookupError:
-        nltk.download('stopwords', quiet=True)
+    `with lock:` takes it exclusively and is reentrant. acquire_shared() is
+    reentrant too, and also succeeds in the thread holding it exclusively.
+    Waiting writers block new readers, so edits are not starved by traffic.
+    """
     
-    try:
-        nltk.data.find('corpora/wordnet')
-    except LookupError:
-        nltk.download('wordnet', quiet=True)
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._writers_waiting = 0
+        self._local = threading.local()
     
-    try:
-        nltk.data.find('tokenizers/punkt_tab')
-    except LookupError:
-        nltk.download('punkt_tab', quiet=True)
+    def acquire(self):
+        """Take the lock exclusively (waits for readers to finish)"""
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._writer_depth += 1
+                return True
+            if getattr(self._local, 'depth', 0):
+                raise RuntimeError("Cannot take the lock exclusively while holding it shared")
+            self._writers_waiting += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writer = me
+            self._writer_depth = 1
+        return True
+    
+    def release(self):
+        with self._condition:
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._condition.notify_all()
+    
+    def acquire_shared(self):
+        """Take the lock shared with other readers"""
+        depth = getattr(self._local, 'depth', 0)
+        if not depth and self._writer != threading.get_ident():
+            with self._condition:
+                while self._writer is not None or self._writers_waiting:
+                    self._condition.wait()
+                self._readers += 1
+        self._local.depth = depth + 1
+    
+    def release_shared(self):
+        self._local.depth -= 1
+        if self._local.depth or self._writer == threading.get_ident():
+            return
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+    
+    def __enter__(self):
+        return self.acquire()
+    
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class CategoryPartition:
+    """FAQ rows of one category, with its own term-major TF-IDF sub-matrix"""
+    
+    def __init__(self, name, rows, matcher):
+        """
+        Args:
+            name: Category name as stored in the FAQs
+            rows: Sorted int64 array of the category's FAQ positions
+            matcher: FAQMatcher the rows belong to
+        """
+        self.name = name
+        self.rows = rows
+        self.matcher = matcher
+        self._postings = None
+    
+    @property
+    def postings(self):
+        """Posting lists (terms x category FAQs) of the category, built on first use"""
+        if self._postings is None:
+            self._postings = self.matcher.tfidf_matrix[self.rows].T.tocsr()
+        return self._postings
 
-# Initialize NLTK components
-download_nltk_data()
-lemmatizer = WordNetLemmatizer()
-stop_words = set(stopwords.words('english'))
 
 class FAQMatcher:
     """
@@ -48,109 +186,738 @@ class FAQMatcher:
     Model Explanation:
     - TF-IDF: Converts text to numerical vectors based on term importance
     - Cosine Similarity: Measures similarity between question vectors (0-1 scale)
+    
+    Scoring is delegated to a backend (see backends.py):
+    - 'cosine': Scores every FAQ with one sparse matrix product
+    - 'inverted': Scores only FAQs sharing terms with the question (max-score top-k)
+    - 'sparse': Same scores as 'cosine' in plain NumPy, without scikit-learn per query
+    - 'semantic': LSA vectors with an IVF nearest-neighbour index (see semantic_index.py)
+    - 'hybrid': Weighted fusion of the 'sparse' and 'semantic' scores
+    
+    FAQs can be added, updated and removed without refitting: the matcher keeps
+    raw term counts and document frequencies, updates them per edit, and
+    recomputes idf weights lazily before the next query.
+    
+    FAQs are partitioned by category (case-insensitive) on first use, so
+    matching within a category only scores that category's FAQs and listing
+    categories doesn't scan the corpus. Partitions are rebuilt after edits.
+    
+    Backend results are cached per preprocessed question (see query_cache.py),
+    so questions that only differ in case, punctuation or stopwords share one
+    entry. The cache is cleared whenever the corpus version changes.
+    
+    Query terms missing from the vocabulary are corrected against it first
+    (typos like "shiping" -> "shipping", see spelling.py).
+    
+    With a query_log (see query_log.py), every question is logged with its
+    match, score and latency; logging only queues the entry.
+    
+    FAQs are held in a compact faq_store.FAQStore (UTF-8 text buffers,
+    category codes, optionally lazily loaded answers); result dictionaries
+    are only built for the FAQs returned.
+    
+    Matching is thread-safe: searches hold a ReadWriteLock shared and edits
+    (add/update/remove/sync) hold it exclusively, so a search never sees a
+    vocabulary, idf weights or FAQ rows from different versions.
     """
     
-    def __init__(self, faqs):
+    def __init__(self, faqs, backend='cosine', index_dir=None, cache_size=10000, cache_ttl=None,
+                 metrics=matcher_metrics, answer_loader=None, typo_tolerance=True, query_log=None):
         """
         Initialize the FAQ matcher with a list of FAQs
         
         Args:
-            faqs: List of tuples (id, question, answer, category)
+            faqs: List of tuples (id, question, answer, category), or None to
+                  serve the FAQs stored in index_dir (memory-mapped, shared
+                  between processes that open the same index)
+            backend: Name of the scoring backend (see backends.BACKENDS)
+            index_dir: Optional persisted index directory (see index_store.py).
+                       A matching index is loaded instead of refitting the model;
+                       a missing or stale one is rebuilt and saved there.
+            cache_size: Maximum number of cached query results (0 disables the cache)
+            cache_ttl: Maximum age of cached results in seconds (None: no expiry)
+            metrics: metrics.MatcherMetrics recording stage timings and match
+                     counters (the process-wide registry by default; recording
+                     is off until metrics.enabled is set)
+            answer_loader: Optional callable mapping a list of FAQ ids to a
+                           dictionary {id: answer} (e.g. init_db.get_answers).
+                           Answers are then not kept in memory but fetched
+                           for the FAQs returned. Not used when the FAQs are
+                           served from a persisted index, whose answers are
+                           memory-mapped.
+            typo_tolerance: Correct unknown query terms to the closest
+                            vocabulary term (see spelling.SpellingCorrector)
+            query_log: Optional query_log.QueryLogger receiving every question
+                       answered by find_best_match(es)
         """
-        self.faqs = faqs
-        self.questions = [faq[1] for faq in faqs]  # Extract questions
-        self.answers = [faq[2] for faq in faqs]    # Extract answers
-        self.categories = [faq[3] for faq in faqs] # Extract categories
+        if faqs is None:
+            # Serve everything from the index, without a database
+            index = index_store.load_index(index_dir) if index_dir else None
+            if index is None:
+                raise FileNotFoundError(f"No FAQ index found in {index_dir}")
+            signature = index['signature']
+        else:
+            faqs = list(faqs)
+            
+            # Load the persisted TF-IDF model if it was built from these FAQs
+            index = None
+            signature = None
+            if index_dir:
+                signature = index_store.corpus_signature(faqs)
+                index = index_store.load_index(index_dir, signature)
+        
+        # FAQ columns: memory-mapped from the index, or packed from the list
+        if index is not None:
+            self.faqs = index['faqs']
+        else:
+            self.faqs = FAQStore.from_faqs(faqs, answer_loader)
+        
+        # Persisted index location and the signature of the indexed corpus
+        # (None once the FAQs were edited), used by backends that persist models
+        self.index_dir = index_dir
+        self.signature = signature
+        
+        # FAQ id -> row, built on the first edit
+        self._positions = None
+        
+        # Corpus version, incremented on every add/update/remove
+        self.version = 0
+        # Version of the source database the FAQs were synced from (set by the caller)
+        self.db_version = None
+        self._stale = False
+        self._lock = ReadWriteLock()
+        self._vectorizer_lock = threading.Lock()
+        self.metrics = metrics
+        self.query_log = query_log
+        # (version, {lowercased category: CategoryPartition}, sorted category names)
+        self._category_index = None
+        self.result_cache = QueryCache(cache_size, cache_ttl) if cache_size else None
+        # Typo correction index, updated with the vocabulary on the first query per version
+        self.spelling = SpellingCorrector() if typo_tolerance else None
+        self._spelling_version = None
+        
+        if index is not None:
+            # FAQ questions don't need preprocessing when the model is loaded
+            terms = index['vocabulary']
+            self.term_counts = index['term_counts']
+            self.tfidf_matrix = index['tfidf_matrix']
+            self._tfidf_matrix_t = index['tfidf_matrix_t']
+            idf = index['idf']
+        else:
+            # Preprocess all FAQ questions and count terms; TF-IDF weights
+            # are derived from the counts below
+            from sklearn.feature_extraction.text import CountVectorizer
+            counter = CountVectorizer()
+            self.term_counts = counter.fit_transform(
+                self.preprocess_text(question) for question in self.questions
+            )
+            terms = counter.get_feature_names_out().tolist()
+            self._tfidf_matrix_t = None
+            idf = None
+        
+        self.terms = terms
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        self.doc_freq = np.bincount(self.term_counts.indices, minlength=len(terms))
+        self._analyzer = None
+        self._vectorizer = None
         
-        # Preprocess all FAQ questions
-        self.processed_questions = [self.preprocess_text(q) for q in self.questions]
+        if idf is None:
+            self._reweight()
+            if index_dir:
+                self.save_index(index_dir)
+        else:
+            self.idf = idf
         
-        # Initialize TF-IDF vectorizer
-        self.vectorizer = TfidfVectorizer()
-        self.tfidf_matrix = self.vectorizer.fit_transform(self.processed_questions)
+        # Initialize scoring backend
+        self.backend = create_backend(backend, self)
+    
+    @property
+    def questions(self):
+        """FAQ questions (sequence aligned with the TF-IDF rows)"""
+        return self.faqs.questions
+    
+    @property
+    def answers(self):
+        """FAQ answers (fetched through the answer loader if they aren't stored)"""
+        return self.faqs.answers
+    
+    @property
+    def categories(self):
+        """FAQ categories (decoded from the store's category codes)"""
+        return self.faqs.categories
     
     def preprocess_text(self, text):
         """
         Preprocess text using NLTK
         Steps: Lowercase -> Tokenize -> Remove punctuation -> Remove stopwords -> Lemmatize
         
+        Repeated texts are served from the pipeline's query cache
+        (see preprocessing.TextPreprocessor).
+        
         Args:
             text: Input text string
             
         Returns:
             Preprocessed text string
         """
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Tokenize
-        tokens = word_tokenize(text)
+        return text_preprocessor(text)
+    
+    def preprocess_document(self, text):
+        """
+        Preprocess FAQ text other than questions (e.g. answers for the bm25 backend)
         
-        # Remove punctuation and stopwords, then lemmatize
-        processed_tokens = [
-            lemmatizer.lemmatize(token) 
-            for token in tokens 
-            if token not in string.punctuation and token not in stop_words
-        ]
+        Bypasses the query cache, which is meant for user questions.
         
-        # Join tokens back into string
-        return ' '.join(processed_tokens)
+        Args:
+            text: Input text string
+            
+        Returns:
+            Preprocessed text string
+        """
+        return text_preprocessor.process_document(text)
     
-    def find_best_match(self, user_question, threshold=0.3):
+    def find_best_match(self, user_question, threshold=0.3, category=None, record=True):
         """
         Find the best matching FAQ for a user question using cosine similarity
         
         Args:
             user_question: User's input question
             threshold: Minimum similarity score (0-1) to consider a match
+            category: Only match FAQs of this category (case-insensitive)
+            record: Count the question in the match metrics and the query log
+                    (False for a second lookup of a question already recorded)
             
         Returns:
             Dictionary with matched FAQ details or None if no good match
         """
+        called = time.perf_counter() if record and self.query_log is not None else None
+        metrics = self.metrics
+        
         # Preprocess user question
+        started = metrics.start()
         processed_question = self.preprocess_text(user_question)
+        metrics.lap('preprocess', started)
+        
+        with self._reading(category):
+            # Score FAQs with the backend (or the result cache) and keep the best match
+            indices, scores = self._search([processed_question], 1, category)[0]
+            best_similarity = scores[0] if len(indices) else None
+            if record and metrics.enabled:
+                metrics.record_match(best_similarity, threshold)
+            
+            # Return matched FAQ details if the similarity meets the threshold
+            result = None
+            if best_similarity is not None and best_similarity >= threshold:
+                result = self._make_result(indices[0], best_similarity)
+        if called is not None:
+            self._log_query(user_question, result, best_similarity,
+                            (time.perf_counter() - called) * 1000, category)
+        return result
+    
+    def find_best_matches(self, questions, threshold=0.3, top_k=1, batch_size=1024, category=None):
+        """
+        Find the best matching FAQs for a batch of user questions
+        
+        The whole batch is vectorized at once and scored by the backend per
+        chunk of batch_size questions (one sparse matrix product per chunk
+        with the cosine backend).
+        
+        Args:
+            questions: List of user questions
+            threshold: Minimum similarity score (0-1) to consider a match
+            top_k: Maximum number of matches to return per question
+            batch_size: Number of questions scored per matrix product
+            category: Only match FAQs of this category (case-insensitive)
+            
+        Returns:
+            List with one entry per question, each a list of up to top_k match
+            dictionaries ordered best first (empty if nothing meets the threshold)
+        """
+        results = []
+        if not questions:
+            return results
+        
+        metrics = self.metrics
+        
+        for start in range(0, len(questions), batch_size):
+            called = time.perf_counter() if self.query_log is not None else None
+            chunk = questions[start:start + batch_size]
+            
+            # Preprocess the whole chunk and score it in one backend call
+            started = metrics.start()
+            processed = [self.preprocess_text(q) for q in chunk]
+            metrics.lap('preprocess', started)
+            # Edits wait between chunks, not for the whole batch
+            with self._reading(category):
+                searched = self._search(processed, top_k, category)
+                for indices, scores in searched:
+                    if metrics.enabled:
+                        metrics.record_match(scores[0] if len(indices) else None, threshold)
+                    results.append([
+                        self._make_result(idx, score)
+                        for idx, score in zip(indices, scores)
+                        if score >= threshold
+                    ])
+            
+            if called is not None:
+                # Every question of the chunk gets its share of the chunk's time
+                latency_ms = (time.perf_counter() - called) * 1000 / len(chunk)
+                for question, (indices, scores), matches in zip(chunk, searched, results[start:]):
+                    self._log_query(question, matches[0] if matches else None,
+                                    scores[0] if len(indices) else None, latency_ms, category)
         
-        # Convert to TF-IDF vector
-        question_vector = self.vectorizer.transform([processed_question])
+        return results
+    
+    def top_scores(self, questions, top_k=1, category=None):
+        """
+        Get the unrounded similarities of the top_k FAQs per question
+        
+        No threshold is applied and nothing is recorded in the metrics or the
+        query log (e.g. for offline evaluation, see evaluate.py).
+        
+        Args:
+            questions: List of user questions
+            top_k: Number of FAQs per question
+            category: Only score FAQs of this category (case-insensitive)
+            
+        Returns:
+            List with one (FAQ id array, similarity array) tuple per question,
+            best first, with similarities on the 0-1 scale
+        """
+        processed = [self.preprocess_text(q) for q in questions]
+        with self._reading(category):
+            ids = np.asarray(self.faqs.ids, dtype=np.int64)
+            return [
+                (ids[np.asarray(indices, dtype=np.int64)], np.asarray(scores, dtype=np.float64))
+                for indices, scores in self._search(processed, top_k, category)
+            ]
+    
+    def _log_query(self, question, result, score, latency_ms, category):
+        """Queue a question with its top match on the query log"""
+        self.query_log.log(
+            question,
+            result['id'] if result else None,
+            None if score is None else round(float(score), 4),
+            round(latency_ms, 3),
+            category,
+        )
+    
+    @contextmanager
+    def _reading(self, category=None):
+        """
+        Hold the lock shared, with weights, typo index and (for a category
+        search) partitions up to date for the current version
+        """
+        while True:
+            # Derived state is rebuilt under the exclusive lock, before reading
+            self._refresh()
+            self._update_spelling()
+            if category is not None:
+                self._categories()
+            self._lock.acquire_shared()
+            index = self._category_index
+            if not self._stale and (self.spelling is None or self._spelling_version == self.version) and (
+                category is None or (index is not None and index[0] == self.version)
+            ):
+                break
+            # An edit got in before the lock was taken
+            self._lock.release_shared()
+        try:
+            yield
+        finally:
+            self._lock.release_shared()
+    
+    def _search(self, processed_questions, top_k, category=None):
+        """
+        Backend search with the result cache in front (call within _reading)
         
-        # Calculate cosine similarity with all FAQ questions
-        similarities = cosine_similarity(question_vector, self.tfidf_matrix)[0]
+        Args:
+            processed_questions: List of preprocessed questions
+            top_k: Number of results per question
+            category: Optional category to restrict the search to
+            
+        Returns:
+            List of (indices, scores) tuples, one per question
+        """
+        partition = None
+        if category is not None:
+            partition = self._partitions().get(category.lower())
+            if partition is None:
+                # Unknown category: nothing to match
+                empty = (np.empty(0, dtype=np.int64), np.empty(0))
+                return [empty] * len(processed_questions)
+        if self.result_cache is None:
+            return self.backend.search(self._correct(processed_questions), top_k, partition)
         
-        # Find the best match
-        best_match_idx = np.argmax(similarities)
-        best_similarity = similarities[best_match_idx]
+        # Results depend on the corpus version and the partition searched
+        scope = (self.version, partition.name.lower() if partition else None)
+        results = [None] * len(processed_questions)
+        misses = {}
+        for i, processed in enumerate(processed_questions):
+            cached = self.result_cache.get((scope, top_k, processed))
+            if cached is MISSING:
+                misses.setdefault(processed, []).append(i)
+            else:
+                results[i] = cached
         
-        # Check if similarity meets threshold
-        if best_similarity < threshold:
-            return None
+        if misses:
+            # Score each distinct uncached question once
+            unique = list(misses)
+            scored = self.backend.search(self._correct(unique), top_k, partition)
+            for processed, result in zip(unique, scored):
+                self.result_cache.put((scope, top_k, processed), result)
+                for i in misses[processed]:
+                    results[i] = result
+        return results
+    
+    def _correct(self, processed_questions):
+        """
+        Replace unknown terms of preprocessed questions by their spelling corrections
         
-        # Return matched FAQ details
+        Args:
+            processed_questions: List of preprocessed questions
+            
+        Returns:
+            List of corrected questions (the input list if typo tolerance is off)
+        """
+        spelling = self.spelling
+        if spelling is None:
+            return processed_questions
+        metrics = self.metrics
+        started = metrics.start()
+        # Backends matching more than the questions (bm25) know more terms
+        vocabulary = getattr(self.backend, 'query_vocabulary', self.vocabulary)
+        corrected = [spelling.correct(processed, vocabulary) for processed in processed_questions]
+        metrics.lap('correct', started)
+        return corrected
+    
+    def _update_spelling(self):
+        """Add terms of the current version to the typo correction index"""
+        if self.spelling is not None and self._spelling_version != self.version:
+            with self._lock:
+                if self._spelling_version != self.version:
+                    # Indexes only terms added since the last update
+                    self.spelling.update(self.terms, self.doc_freq)
+                    self._spelling_version = self.version
+    
+    def cache_stats(self):
+        """
+        Get hit/miss counters of the matcher's caches
+        
+        Returns:
+            Dictionary with 'results' (query result cache), 'preprocessing'
+            (lemma and query caches of the preprocessing pipeline) and
+            'spelling' (typo correction cache)
+        """
+        return {
+            'results': self.result_cache.stats() if self.result_cache else None,
+            'preprocessing': text_preprocessor.cache_info(),
+            'spelling': self.spelling.cache_info() if self.spelling else None,
+        }
+    
+    def _make_result(self, idx, similarity):
+        """Build the result dictionary for the FAQ at position idx"""
+        faq_id, question, answer, category = self.faqs[idx]
         return {
-            'question': self.questions[best_match_idx],
-            'answer': self.answers[best_match_idx],
-            'category': self.categories[best_match_idx],
-            'similarity_score': round(best_similarity * 100, 2)  # Convert to percentage
+            'id': faq_id,
+            'question': question,
+            'answer': answer,
+            'category': category,
+            'similarity_score': round(float(similarity) * 100, 2)  # Convert to percentage
         }
     
+    def save_index(self, index_dir):
+        """
+        Persist the fitted TF-IDF model so it can be loaded without refitting
+        
+        Args:
+            index_dir: Index directory (see index_store.default_index_dir)
+        """
+        with self._lock:
+            self._refresh()
+            index_store.save_index(
+                index_dir,
+                self.terms,
+                self.idf,
+                self.tfidf_matrix,
+                self.term_counts,
+                self.faqs,
+                index_store.corpus_signature(self.faqs),
+            )
+    
+    @property
+    def vectorizer(self):
+        """Query vectorizer for the current vocabulary and idf weights (created on first use)"""
+        with self._vectorizer_lock:
+            if self._vectorizer is None:
+                from sklearn.feature_extraction.text import TfidfVectorizer
+                vectorizer = TfidfVectorizer(vocabulary=self.vocabulary)
+                vectorizer.idf_ = np.asarray(self.idf)
+                self._vectorizer = vectorizer
+            return self._vectorizer
+    
+    @property
+    def tfidf_matrix_t(self):
+        """Term-major copy of the TF-IDF matrix (posting lists), used by the backends"""
+        if self._tfidf_matrix_t is None:
+            matrix_t = self.tfidf_matrix.T.tocsr()
+            matrix_t.sort_indices()
+            self._tfidf_matrix_t = matrix_t
+        return self._tfidf_matrix_t
+    
+    def add_faq(self, faq_id, question, answer, category):
+        """
+        Add a FAQ without refitting the model
+        
+        Args:
+            faq_id: Database id of the FAQ
+            question: FAQ question
+            answer: FAQ answer
+            category: FAQ category
+        """
+        with self._lock:
+            self._ensure_mutable()
+            if faq_id in self._positions:
+                raise ValueError(f"FAQ {faq_id} already exists")
+            
+            row = self._count_row(question)
+            from scipy.sparse import vstack
+            self.term_counts = vstack([self._widen(self.term_counts), row], format='csr')
+            self.doc_freq[row.indices] += 1
+            
+            self._positions[faq_id] = len(self.faqs)
+            self.faqs.append(faq_id, question, answer, category)
+            self._mark_changed()
+    
+    def update_faq(self, faq_id, question, answer, category):
+        """
+        Replace a FAQ's question, answer and category without refitting the model
+        
+        Args:
+            faq_id: Database id of the FAQ
+            question: New question
+            answer: New answer
+            category: New category
+        """
+        with self._lock:
+            self._ensure_mutable()
+            idx = self._position(faq_id)
+            
+            # Only a changed question touches the term counts
+            if question != self.faqs.question(idx):
+                row = self._count_row(question)
+                counts = self._widen(self.term_counts)
+                self.doc_freq[counts[idx].indices] -= 1
+                from scipy.sparse import vstack
+                self.term_counts = vstack([counts[:idx], row, counts[idx + 1:]], format='csr')
+                self.doc_freq[row.indices] += 1
+            
+            self.faqs.replace(idx, faq_id, question, answer, category)
+            self._mark_changed()
+    
+    def remove_faq(self, faq_id):
+        """
+        Remove a FAQ without refitting the model
+        
+        Args:
+            faq_id: Database id of the FAQ
+        """
+        with self._lock:
+            self._ensure_mutable()
+            idx = self._position(faq_id)
+            
+            self.doc_freq[self.term_counts[idx].indices] -= 1
+            keep = np.ones(self.term_counts.shape[0], dtype=bool)
+            keep[idx] = False
+            self.term_counts = self.term_counts[keep]
+            
+            self.faqs.delete(idx)
+            self._positions = {faq_id: i for i, faq_id in enumerate(self.faqs.ids)}
+            self._mark_changed()
+    
+    def sync(self, faqs):
+        """
+        Bring the matcher in line with a fresh list of FAQs using incremental edits
+        
+        Answers loaded through an answer_loader are always read fresh, so
+        answer-only changes don't count as updates.
+        
+        Args:
+            faqs: List of tuples (id, question, answer, category), e.g. from get_all_faqs()
+            
+        Returns:
+            Tuple (added, updated, removed) with the number of FAQs changed
+        """
+        with self._lock:
+            # Compare rows in place, then edit (positions stay valid until removals)
+            current = {int(faq_id): idx for idx, faq_id in enumerate(self.faqs.ids)}
+            added, changed = [], []
+            for faq in faqs:
+                idx = current.pop(faq[0], None)
+                if idx is None:
+                    added.append(faq)
+                elif not self.faqs.equals(idx, faq):
+                    changed.append(faq)
+            for faq in changed:
+                self.update_faq(*faq)
+            for faq in added:
+                self.add_faq(*faq)
+            for faq_id in current:
+                self.remove_faq(faq_id)
+            return len(added), len(changed), len(current)
+    
+    def _ensure_mutable(self):
+        """Build the FAQ id -> row map before the first edit"""
+        if self._positions is None:
+            self._positions = {int(faq_id): idx for idx, faq_id in enumerate(self.faqs.ids)}
+    
+    def _position(self, faq_id):
+        """Get the row of a FAQ id, raising KeyError for unknown ids"""
+        try:
+            return self._positions[faq_id]
+        except KeyError:
+            raise KeyError(f"FAQ {faq_id} not found")
+    
+    def _count_row(self, question):
+        """
+        Preprocess a question and count its terms, extending the vocabulary
+        with terms that weren't seen before
+        
+        Returns:
+            1 x n_terms CSR row of term counts
+        """
+        processed = self.preprocess_text(question)
+        if self._analyzer is None:
+            from sklearn.feature_extraction.text import CountVectorizer
+            self._analyzer = CountVectorizer().build_analyzer()
+        counts = Counter(self._analyzer(processed))
+        for term in counts:
+            if term not in self.vocabulary:
+                self.vocabulary[term] = len(self.terms)
+                self.terms.append(term)
+        if len(self.doc_freq) < len(self.terms):
+            self.doc_freq = np.concatenate(
+                (self.doc_freq, np.zeros(len(self.terms) - len(self.doc_freq), dtype=self.doc_freq.dtype))
+            )
+        
+        columns = sorted(self.vocabulary[term] for term in counts)
+        from scipy.sparse import csr_matrix
+        row = csr_matrix(
+            ([counts[self.terms[col]] for col in columns], columns, [0, len(columns)]),
+            shape=(1, len(self.terms)),
+            dtype=self.term_counts.dtype,
+        )
+        return row
+    
+    def _widen(self, matrix):
+        """Give a CSR matrix one column per vocabulary term (new terms have no entries)"""
+        if matrix.shape[1] == len(self.terms):
+            return matrix
+        from scipy.sparse import csr_matrix
+        return csr_matrix(
+            (matrix.data, matrix.indices, matrix.indptr),
+            shape=(matrix.shape[0], len(self.terms)),
+            copy=False,
+        )
+    
+    def _mark_changed(self):
+        """Record a corpus change; weights are recomputed before the next query"""
+        self.version += 1
+        self._stale = True
+        self.signature = None
+        if self.result_cache is not None:
+            self.result_cache.clear()
+    
+    def _refresh(self):
+        """Recompute idf and TF-IDF weights if FAQs changed since the last query"""
+        if not self._stale:
+            return
+        with self._lock:
+            if self._stale:
+                self.faqs.compact()
+                self.term_counts = self._widen(self.term_counts)
+                self._reweight()
+                self.backend.build()
+                self._stale = False
+    
+    def _reweight(self):
+        """
+        Derive the TF-IDF matrix from the term counts
+        
+        Same weighting as TfidfVectorizer's defaults:
+        idf = ln((1 + n) / (1 + df)) + 1, rows L2-normalized
+        """
+        n_faqs = self.term_counts.shape[0]
+        idf = np.log((1 + n_faqs) / (1 + self.doc_freq)) + 1
+        counts = self.term_counts
+        counts.sort_indices()
+        from scipy.sparse import csr_matrix
+        weighted = csr_matrix(
+            (counts.data * idf[counts.indices], counts.indices, counts.indptr),
+            shape=counts.shape,
+        )
+        from sklearn.preprocessing import normalize
+        self.tfidf_matrix = normalize(weighted, copy=False)
+        self._tfidf_matrix_t = None
+        self.idf = idf
+        self._vectorizer = None
+    
+    def _partitions(self):
+        """Get the category partitions, rebuilt when the corpus version changed"""
+        return self._categories()[1]
+    
+    def _categories(self):
+        """Get the category index (version, partitions, names) for the current version"""
+        index = self._category_index
+        if index is not None and index[0] == self.version:
+            return index
+        with self._lock:
+            self._refresh()
+            index = self._category_index
+            if index is not None and index[0] == self.version:
+                return index
+            # Group rows by category code, then merge codes whose names only
+            # differ in case (named after the spelling that occurs first)
+            codes = np.asarray(self.faqs.category_codes)
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(self.faqs.category_names) + 1))
+            groups = {}
+            for code, name in enumerate(self.faqs.category_names):
+                rows = order[bounds[code]:bounds[code + 1]]
+                if name and len(rows):
+                    groups.setdefault(name.lower(), []).append((rows[0], name, rows))
+            partitions = {}
+            for key, group in groups.items():
+                group.sort(key=lambda item: item[0])
+                rows = np.sort(np.concatenate([item[2] for item in group])).astype(np.int64)
+                partitions[key] = CategoryPartition(group[0][1], rows, self)
+            names = sorted(partition.name for partition in partitions.values())
+            index = (self.version, partitions, names)
+            self._category_index = index
+            return index
+    
     def get_all_categories(self):
-        """Get unique categories from FAQs"""
-        return list(set(self.categories))
+        """Get the sorted list of unique categories (precomputed; don't modify it)"""
+        return self._categories()[2]
     
     def search_by_category(self, category):
         """
         Get all FAQs in a specific category
         
         Args:
-            category: Category name
+            category: Category name (case-insensitive)
             
         Returns:
             List of FAQs in that category
         """
-        return [
-            {'question': q, 'answer': a, 'category': c}
-            for q, a, c in zip(self.questions, self.answers, self.categories)
-            if c.lower() == category.lower()
-        ]
+        with self._reading(category):
+            partition = self._partitions().get(category.lower())
+            if partition is None:
+                return []
+            return [
+                {'question': question, 'answer': answer, 'category': category}
+                for _, question, answer, category in self.faqs.take(partition.rows)
+            ]
 
 def test_matcher():
     """Test function to demonstrate the FAQ matcher"""
@@ -0,0 +1,374 @@
+"""
+FAQ Repository
+Single read/write path to the FAQ database over a thread-safe connection pool
+
+- Connections are opened once and reused (WAL mode, shareable across threads),
+  so SQLite's per-connection statement cache keeps prepared statements alive
+- FAQ count and category list are cached and invalidated on writes, including
+  writes from other processes (detected through the data version)
+"""
+
+import hashlib
+import itertools
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# SQL statements (kept constant so the per-connection statement cache reuses them)
+CREATE_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS faqs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        question TEXT NOT NULL,
+        answer TEXT NOT NULL,
+        category TEXT
+    )
+'''
+SELECT_ALL_SQL = "SELECT id, question, answer, category FROM faqs"
+SELECT_BY_ID_SQL = "SELECT question, answer FROM faqs WHERE id = ?"
+# Answers are fetched for ANSWER_BATCH ids per statement (short batches are
+# padded with NULL so there is a single statement to cache)
+ANSWER_BATCH = 100
+SELECT_ANSWERS_SQL = f"SELECT id, answer FROM faqs WHERE id IN ({', '.join('?' * ANSWER_BATCH)})"
+COUNT_SQL = "SELECT COUNT(*) FROM faqs"
+CATEGORIES_SQL = "SELECT DISTINCT category FROM faqs WHERE category IS NOT NULL ORDER BY category"
+INSERT_SQL = "INSERT INTO faqs (question, answer, category) VALUES (?, ?, ?)"
+UPDATE_SQL = "UPDATE faqs SET question = ?, answer = ?, category = ? WHERE id = ?"
+DELETE_SQL = "DELETE FROM faqs WHERE id = ?"
+DATA_VERSION_SQL = "PRAGMA user_version"
+
+# Bulk import: each chunk is staged in a temp table and deduplicated in SQL
+# against the keys (hashed normalized questions) seen so far, which also live
+# in a temp table, so memory stays bounded for inputs of any size
+IMPORT_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=FILE",
+)
+CREATE_IMPORT_KEYS_SQL = "CREATE TEMP TABLE import_keys (key BLOB PRIMARY KEY) WITHOUT ROWID"
+CREATE_IMPORT_STAGE_SQL = '''
+    CREATE TEMP TABLE import_stage (
+        key BLOB NOT NULL,
+        question TEXT NOT NULL,
+        answer TEXT NOT NULL,
+        category TEXT
+    )
+'''
+STAGE_SQL = "INSERT INTO import_stage (key, question, answer, category) VALUES (?, ?, ?, ?)"
+INSERT_KEY_SQL = "INSERT OR IGNORE INTO import_keys (key) VALUES (?)"
+IMPORT_STAGED_SQL = '''
+    INSERT INTO faqs (question, answer, category)
+    SELECT question, answer, category FROM import_stage
+    WHERE rowid IN (SELECT MIN(rowid) FROM import_stage GROUP BY key)
+      AND key NOT IN (SELECT key FROM import_keys)
+    ORDER BY rowid
+'''
+RECORD_STAGED_KEYS_SQL = "INSERT OR IGNORE INTO import_keys (key) SELECT key FROM import_stage"
+CLEAR_STAGE_SQL = "DELETE FROM import_stage"
+
+
+def question_key(question):
+    """
+    Deduplication key of a question: hash of its normalized form
+
+    Questions that only differ in case, whitespace or trailing punctuation
+    get the same key.
+    """
+    normalized = " ".join(question.lower().split()).rstrip("?!. ")
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of SQLite connections shared between threads
+
+    Connections are created lazily up to size; a thread borrows one for the
+    duration of a `with pool.connection()` block, so no connection is ever
+    used by two threads at once.
+    """
+
+    def __init__(self, db_path, size=4):
+        """
+        Args:
+            db_path: SQLite database file
+            size: Maximum number of open connections
+        """
+        self.db_path = db_path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        """Open and configure a new connection"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection; commits on success and rolls back on error
+
+        Blocks while all connections are in use.
+        """
+        conn = None
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._create()
+        while conn is None:
+            # Recheck now and then: after close() returned connections don't come back
+            try:
+                conn = self._idle.get(timeout=0.1)
+            except queue.Empty:
+                conn = self._create()
+
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            with self._lock:
+                closed = self._closed
+                if not closed:
+                    self._idle.put(conn)
+            if closed:
+                conn.close()
+                with self._lock:
+                    self._created -= 1
+
+    def _create(self):
+        """Open a connection if the pool isn't full (or is closed), else None"""
+        with self._lock:
+            if self._created >= self.size and not self._closed:
+                return None
+            self._created += 1
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def close(self):
+        """
+        Close all idle connections
+
+        Connections borrowed at that time are closed when they are returned,
+        as are connections opened afterwards.
+        """
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+
+class FAQRepository:
+    """Reads and writes FAQs through a ConnectionPool with a cached stats view"""
+
+    def __init__(self, db_path, pool_size=4, version_check_interval=1.0):
+        """
+        Args:
+            db_path: SQLite database file
+            pool_size: Maximum number of pooled connections
+            version_check_interval: Seconds the cached data version (and the
+                                    count/categories view) is trusted before it
+                                    is re-read to pick up other processes' writes
+        """
+        self.db_path = db_path
+        self.pool = ConnectionPool(db_path, pool_size)
+        self.version_check_interval = version_check_interval
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+    # Schema
+
+    def create_schema(self):
+        """Create the faqs table if it doesn't exist"""
+        with self.pool.connection() as conn:
+            conn.execute(CREATE_TABLE_SQL)
+
+    # Reads
+
+    def get_all_faqs(self):
+        """Get all FAQs as tuples (id, question, answer, category)"""
+        with self.pool.connection() as conn:
+            return conn.execute(SELECT_ALL_SQL).fetchall()
+
+    def get_faq(self, faq_id):
+        """Get (question, answer) of a FAQ, or None"""
+        with self.pool.connection() as conn:
+            return conn.execute(SELECT_BY_ID_SQL, (faq_id,)).fetchone()
+
+    def get_answers(self, faq_ids):
+        """Get the answers of many FAQs as a dictionary {id: answer} (unknown ids are left out)"""
+        faq_ids = list(faq_ids)
+        answers = {}
+        with self.pool.connection() as conn:
+            for start in range(0, len(faq_ids), ANSWER_BATCH):
+                batch = faq_ids[start:start + ANSWER_BATCH]
+                batch += [None] * (ANSWER_BATCH - len(batch))
+                answers.update(conn.execute(SELECT_ANSWERS_SQL, batch))
+        return answers
+
+    def get_data_version(self):
+        """Get the data version (bumped by every write), re-read at most every check interval"""
+        return self._cached("data_version", lambda conn: conn.execute(DATA_VERSION_SQL).fetchone()[0])
+
+    def get_count(self):
+        """Get the number of FAQs (cached until the data version changes)"""
+        return self._cached_view("count", lambda conn: conn.execute(COUNT_SQL).fetchone()[0])
+
+    def get_categories(self):
+        """Get the sorted list of categories (cached until the data version changes)"""
+        return list(self._cached_view(
+            "categories", lambda conn: [row[0] for row in conn.execute(CATEGORIES_SQL)]
+        ))
+
+    # Writes
+
+    def add_faq(self, question, answer, category):
+        """Insert a FAQ and return its id"""
+        with self.pool.connection() as conn:
+            faq_id = conn.execute(INSERT_SQL, (question, answer, category)).lastrowid
+            self._bump_data_version(conn)
+        self.invalidate()
+        return faq_id
+
+    def add_faqs(self, faqs):
+        """Insert many (question, answer, category) tuples in one transaction"""
+        with self.pool.connection() as conn:
+            conn.executemany(INSERT_SQL, faqs)
+            self._bump_data_version(conn)
+        self.invalidate()
+
+    def update_faq(self, faq_id, question, answer, category):
+        """Replace a FAQ; returns True if it existed"""
+        with self.pool.connection() as conn:
+            updated = conn.execute(UPDATE_SQL, (question, answer, category, faq_id)).rowcount > 0
+            if updated:
+                self._bump_data_version(conn)
+        self.invalidate()
+        return updated
+
+    def delete_faq(self, faq_id):
+        """Delete a FAQ; returns True if it existed"""
+        with self.pool.connection() as conn:
+            deleted = conn.execute(DELETE_SQL, (faq_id,)).rowcount > 0
+            if deleted:
+                self._bump_data_version(conn)
+        self.invalidate()
+        return deleted
+
+    def import_faqs(self, faqs, chunk_size=10000, skip_existing=True, progress=None):
+        """
+        Stream (question, answer, category) tuples into the database
+
+        Rows are inserted in one transaction per chunk on a dedicated
+        connection with bulk-load pragmas (synchronous=OFF, large page cache).
+        Questions are deduplicated by normalized text within the input and,
+        with skip_existing, against the FAQs already stored, so re-running an
+        interrupted import is safe.
+
+        Args:
+            faqs: Iterable (e.g. a generator) of (question, answer, category)
+            chunk_size: Rows per transaction
+            skip_existing: Also skip questions that are already in the database
+            progress: Optional callback called with the stats after every chunk
+
+        Returns:
+            Dictionary with rows 'read', 'inserted', 'duplicates', 'seconds'
+            and 'rows_per_s'
+        """
+        stats = {"read": 0, "inserted": 0, "duplicates": 0, "seconds": 0.0, "rows_per_s": 0.0}
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for pragma in IMPORT_PRAGMAS:
+                conn.execute(pragma)
+            conn.execute(CREATE_TABLE_SQL)
+            conn.execute(CREATE_IMPORT_KEYS_SQL)
+            conn.execute(CREATE_IMPORT_STAGE_SQL)
+            if skip_existing:
+                conn.executemany(INSERT_KEY_SQL, (
+                    (question_key(question),) for _, question, _, _ in conn.execute(SELECT_ALL_SQL)
+                ))
+            conn.commit()
+
+            # Rate is measured over the streamed rows only
+            start = time.perf_counter()
+            rows = iter(faqs)
+            while True:
+                chunk = [
+                    (question_key(question), question, answer, category)
+                    for question, answer, category in itertools.islice(rows, chunk_size)
+                ]
+                if not chunk:
+                    break
+                with conn:
+                    conn.executemany(STAGE_SQL, chunk)
+                    inserted = conn.execute(IMPORT_STAGED_SQL).rowcount
+                    conn.execute(RECORD_STAGED_KEYS_SQL)
+                    conn.execute(CLEAR_STAGE_SQL)
+                    if inserted:
+                        self._bump_data_version(conn)
+                stats["read"] += len(chunk)
+                stats["inserted"] += inserted
+                stats["duplicates"] += len(chunk) - inserted
+                stats["seconds"] = time.perf_counter() - start
+                stats["rows_per_s"] = stats["read"] / stats["seconds"]
+                if progress is not None:
+                    progress(stats)
+        finally:
+            conn.close()
+            self.invalidate()
+        return stats
+
+    # Cache
+
+    def invalidate(self):
+        """Drop the cached data version, count and categories"""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _cached(self, key, query):
+        """Run query on a pooled connection unless a fresh cached value exists"""
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is not None and now - entry[1] < self.version_check_interval:
+            return entry[0]
+        with self.pool.connection() as conn:
+            value = query(conn)
+        with self._cache_lock:
+            self._cache[key] = (value, now)
+        return value
+
+    def _cached_view(self, key, query):
+        """Serve a cached derived value as long as the data version is unchanged"""
+        version = self.get_data_version()
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        with self.pool.connection() as conn:
+            value = query(conn)
+        with self._cache_lock:
+            self._cache[key] = (version, value)
+        return value
+
+    @staticmethod
+    def _bump_data_version(conn):
+        """Increment the data version inside the caller's transaction"""
+        version = conn.execute(DATA_VERSION_SQL).fetchone()[0]
+        conn.execute(f"PRAGMA user_version = {version + 1}")
@@ -0,0 +1,650 @@
+"""
+FAQ Matching Service
+Standalone asyncio HTTP/JSON API around a shared FAQMatcher (no Streamlit needed)
+
+Endpoints:
+- GET  /health       Service status, FAQ count, corpus version and cache counters
+- GET  /categories   List of FAQ categories
+- POST /match        {"question": "...", "threshold": 0.3} -> {"match": {...} | null}
+- POST /match/batch  {"questions": [...], "threshold": 0.3, "top_k": 1} -> {"results": [[...], ...]}
+
+Both /match endpoints accept an optional "category" to match only FAQs of
+that category (e.g. questions asked on a category-specific page).
+
+Metrics (see metrics.py; recording starts with --metrics or POST /debug/metrics):
+- GET  /metrics          Prometheus text (?format=json for a JSON snapshot)
+- POST /debug/metrics    {"enabled": true, "reset": false} switches recording
+- POST /debug/profiler   {"enabled": true, "interval": 0.005} switches the sampling profiler
+- GET  /debug/profile    Sampled stacks in collapsed-stack (flame graph) format
+
+With --query-log every question is logged with its match, score and
+latency to a SQLite file (see query_log.py; default faqs.log.db).
+
+In multi-process mode every worker keeps its own metrics; the "pid" in the
+responses tells which worker answered.
+
+Scoring runs in a thread pool so the event loop stays responsive. Concurrent
+/match requests are micro-batched: requests arriving within a few milliseconds
+of each other are coalesced into one find_best_matches() call.
+
+Run with: python faq_service.py --port 8000
+
+Multi-process mode (python faq_service.py --processes 4) pre-forks worker
+processes that share one listening socket. The parent builds the persisted
+index (see index_store.py) and every worker opens it read-only with memory
+mapping, so the TF-IDF matrix, posting lists and FAQ texts exist once in
+the page cache instead of once per worker. When the FAQ data version changes
+(or the parent receives SIGHUP) the parent rebuilds the index and sends
+SIGHUP to the workers, which swap in the new index without dropping requests.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http import HTTPStatus
+from urllib.parse import parse_qsl
+
+from metrics import matcher_metrics
+from query_log import QueryLogger, default_log_path
+
+# Largest accepted request body (bytes)
+MAX_BODY_SIZE = 1024 * 1024
+
+
+class TextResponse:
+    """Plain-text response payload (handlers return dicts for JSON otherwise)"""
+
+    def __init__(self, text, content_type="text/plain; charset=utf-8"):
+        self.text = text
+        self.content_type = content_type
+
+
+class HTTPError(Exception):
+    """Error that is returned to the client as a JSON response"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-question requests into batched matcher calls
+
+    The first request of a batch starts a timer of max_wait seconds; the batch
+    is scored when the timer fires or max_batch requests are waiting, whichever
+    comes first.
+    """
+
+    def __init__(self, matcher, executor, max_batch=64, max_wait=0.002):
+        """
+        Args:
+            matcher: Shared FAQMatcher
+            executor: Executor that runs the scoring calls
+            max_batch: Maximum number of questions per batch
+            max_wait: Maximum time (seconds) a request waits for others to join
+        """
+        self.matcher = matcher
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending = []
+        self._timer = None
+        # The event loop only keeps weak references to tasks
+        self._batches = set()
+
+    async def match(self, question, threshold=0.3, top_k=1, category=None):
+        """
+        Queue a question and wait for its result
+
+        Returns:
+            List of up to top_k match dictionaries (best first)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((question, threshold, top_k, category, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        """Score all pending questions, one matcher call per (threshold, top_k, category) group"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+
+        groups = {}
+        for question, threshold, top_k, category, future in pending:
+            groups.setdefault((threshold, top_k, category), []).append((question, future))
+        for (threshold, top_k, category), items in groups.items():
+            task = asyncio.ensure_future(self._run_batch(items, threshold, top_k, category))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, items, threshold, top_k, category=None):
+        """Run one batched matcher call in the executor and resolve the futures"""
+        loop = asyncio.get_running_loop()
+        questions = [question for question, _ in items]
+        try:
+            results = await loop.run_in_executor(
+                self.executor,
+                partial(self.matcher.find_best_matches, questions, threshold, top_k, category=category),
+            )
+        except Exception as error:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class FAQService:
+    """HTTP/1.1 JSON service exposing a FAQMatcher"""
+
+    def __init__(self, matcher, workers=4, max_batch=64, max_wait=0.002, sync_interval=None):
+        """
+        Args:
+            matcher: Shared FAQMatcher
+            workers: Number of scoring threads
+            max_batch: Maximum micro-batch size
+            max_wait: Maximum micro-batch wait (seconds)
+            sync_interval: Seconds between checks for FAQ edits in the database
+                           (None disables syncing)
+        """
+        self.matcher = matcher
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="faq-match")
+        self.batcher = MicroBatcher(matcher, self.executor, max_batch, max_wait)
+        self.sync_interval = sync_interval
+        self._server = None
+        self._sync_task = None
+        self._stopping = False
+        self.routes = {
+            ("GET", "/health"): self.handle_health,
+            ("GET", "/categories"): self.handle_categories,
+            ("POST", "/match"): self.handle_match,
+            ("POST", "/match/batch"): self.handle_match_batch,
+            ("GET", "/metrics"): self.handle_metrics,
+            ("POST", "/debug/metrics"): self.handle_debug_metrics,
+            ("POST", "/debug/profiler"): self.handle_debug_profiler,
+            ("GET", "/debug/profile"): self.handle_debug_profile,
+        }
+
+    def set_matcher(self, matcher):
+        """Swap in a new matcher; requests already being scored finish on the old one"""
+        matcher.query_log = self.matcher.query_log
+        self.matcher = matcher
+        self.batcher.matcher = matcher
+
+    def stop(self):
+        """Stop accepting connections; serve() returns after running scoring jobs finish"""
+        self._stopping = True
+        if self._server is not None:
+            self._server.close()
+
+    # Handlers
+
+    async def handle_health(self, body):
+        health = {
+            "status": "ok",
+            "pid": os.getpid(),
+            "faqs": len(self.matcher.faqs),
+            "version": self.matcher.version,
+            "caches": self.matcher.cache_stats(),
+        }
+        if self.matcher.query_log is not None:
+            health["query_log"] = self.matcher.query_log.stats()
+        return health
+
+    async def handle_categories(self, body):
+        return {"categories": self.matcher.get_all_categories()}
+
+    async def handle_match(self, body):
+        question = _require_string(body, "question")
+        threshold = _optional_number(body, "threshold", 0.3)
+        category = _optional_string(body, "category")
+        matches = await self.batcher.match(question, threshold, category=category)
+        return {"match": matches[0] if matches else None}
+
+    async def handle_match_batch(self, body):
+        questions = body.get("questions")
+        if not isinstance(questions, list) or not all(isinstance(q, str) for q in questions):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'questions' must be a list of strings")
+        threshold = _optional_number(body, "threshold", 0.3)
+        top_k = int(_optional_number(body, "top_k", 1))
+        if top_k < 1:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'top_k' must be at least 1")
+        category = _optional_string(body, "category")
+
+        # Already a batch: score it directly instead of going through the batcher
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(
+            self.executor,
+            partial(self.matcher.find_best_matches, questions, threshold, top_k, category=category),
+        )
+        return {"results": results}
+
+    async def handle_metrics(self, body):
+        metrics = self.matcher.metrics
+        cache_stats = self.matcher.cache_stats()
+        if body.get("format") == "json":
+            return {"pid": os.getpid(), **metrics.snapshot(cache_stats)}
+        return TextResponse(metrics.prometheus(cache_stats), "text/plain; version=0.0.4; charset=utf-8")
+
+    async def handle_debug_metrics(self, body):
+        metrics = self.matcher.metrics
+        enabled = body.get("enabled", metrics.enabled)
+        if not isinstance(enabled, bool):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'enabled' must be a boolean")
+        if body.get("reset"):
+            metrics.reset()
+        metrics.enabled = enabled
+        return {"pid": os.getpid(), "enabled": metrics.enabled}
+
+    async def handle_debug_profiler(self, body):
+        metrics = self.matcher.metrics
+        enabled = body.get("enabled")
+        if not isinstance(enabled, bool):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'enabled' must be a boolean")
+        interval = _optional_number(body, "interval", metrics.profiler.interval)
+        if interval <= 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'interval' must be positive")
+        if body.get("reset"):
+            metrics.profiler.clear()
+        # Stopping joins the sampling thread: keep it off the event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, metrics.set_profiling, enabled, interval)
+        return {"pid": os.getpid(), "running": metrics.profiler.running,
+                "samples": metrics.profiler.samples}
+
+    async def handle_debug_profile(self, body):
+        return TextResponse(self.matcher.metrics.profiler.collapsed())
+
+    # HTTP plumbing
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection (keep-alive until the client closes)"""
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, raw_body = request
+                status, payload = await self._dispatch(method, path, raw_body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except HTTPError as error:
+            _write_response(writer, error.status, {"error": error.message}, False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, raw_body):
+        """Route a request to its handler and return (status, payload)"""
+        path, _, query = path.partition("?")
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{method} not allowed on {path}"}
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown path {path}"}
+
+        try:
+            # GET parameters come from the query string
+            body = json.loads(raw_body) if raw_body else dict(parse_qsl(query))
+            if not isinstance(body, dict):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+            return HTTPStatus.OK, await handler(body)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return HTTPStatus.BAD_REQUEST, {"error": "Invalid JSON"}
+        except HTTPError as error:
+            return error.status, {"error": error.message}
+        except Exception as error:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(error)}
+
+    async def _sync_loop(self):
+        """
+        Periodically apply FAQ edits from the database to the matcher
+
+        Runs outside the scoring pool; FAQMatcher.sync() takes the matcher's
+        lock exclusively, so it waits for requests being scored and new ones
+        wait for it. A failed check is reported and retried next interval.
+        """
+        from init_db import get_all_faqs, get_data_version
+
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            matcher = self.matcher
+            try:
+                version = await loop.run_in_executor(None, get_data_version)
+                if version != matcher.db_version:
+                    faqs = await loop.run_in_executor(None, get_all_faqs)
+                    await loop.run_in_executor(None, matcher.sync, faqs)
+                    matcher.db_version = version
+            except Exception as error:
+                print(f"✗ FAQ sync failed, retrying in {self.sync_interval}s: {error!r}")
+
+    async def serve(self, host="127.0.0.1", port=8000, sock=None):
+        """Run the service until cancelled"""
+        if sock is not None:
+            server = await asyncio.start_server(self.handle_connection, sock=sock)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        self._server = server
+        if self.sync_interval:
+            self._sync_task = asyncio.ensure_future(self._sync_loop())
+        try:
+            async with server:
+                await server.serve_forever()
+        except asyncio.CancelledError:
+            if not self._stopping:
+                raise
+        finally:
+            if self._sync_task is not None:
+                self._sync_task.cancel()
+                self._sync_task = None
+            self.executor.shutdown(wait=self._stopping)
+
+
+def _require_string(body, key):
+    """Get a required non-empty string field from a JSON body"""
+    value = body.get(key)
+    if not isinstance(value, str) or not value.strip():
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{key}' must be a non-empty string")
+    return value
+
+
+def _optional_number(body, key, default):
+    """Get an optional numeric field from a JSON body"""
+    value = body.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{key}' must be a number")
+    return value
+
+
+def _optional_string(body, key):
+    """Get an optional string field from a JSON body (None if absent)"""
+    value = body.get(key)
+    if value is not None and not isinstance(value, str):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{key}' must be a string")
+    return value
+
+
+async def _read_request(reader):
+    """
+    Read one HTTP/1.1 request
+
+    Returns:
+        Tuple (method, path, headers, body) or None when the connection closed
+    """
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if length < 0:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if length > MAX_BODY_SIZE:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+
+def _write_response(writer, status, payload, keep_alive):
+    """Write a JSON (or TextResponse) response"""
+    if isinstance(payload, TextResponse):
+        body = payload.text.encode("utf-8")
+        content_type = payload.content_type
+    else:
+        body = json.dumps(payload).encode("utf-8")
+        content_type = "application/json"
+    status = HTTPStatus(status)
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+def load_matcher(backend="cosine"):
+    """Create the database if needed and build a FAQMatcher (loading the persisted index)"""
+    from init_db import DB_PATH, create_database, populate_faqs, get_all_faqs, get_data_version
+    from faq_matcher import FAQMatcher
+    from index_store import default_index_dir
+
+    if not os.path.exists(DB_PATH):
+        create_database()
+        populate_faqs()
+    matcher = FAQMatcher(get_all_faqs(), backend=backend, index_dir=default_index_dir(DB_PATH))
+    matcher.db_version = get_data_version()
+    return matcher
+
+
+def _worker_main(sock, index_dir, backend, workers, max_batch, max_wait, query_log_path=None):
+    """
+    Entry point of a pre-forked worker process
+
+    Serves from the memory-mapped index on the inherited socket. SIGHUP reloads
+    the index, SIGTERM stops the worker gracefully.
+    """
+    from faq_matcher import FAQMatcher
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The parent handles Ctrl+C
+    # The writer thread is started here: threads don't survive the fork
+    query_log = QueryLogger(query_log_path, source="service") if query_log_path else None
+    service = FAQService(
+        FAQMatcher(None, backend=backend, index_dir=index_dir, query_log=query_log),
+        workers=workers,
+        max_batch=max_batch,
+        max_wait=max_wait,
+    )
+
+    async def reload():
+        loop = asyncio.get_running_loop()
+        try:
+            matcher = await loop.run_in_executor(
+                service.executor, lambda: FAQMatcher(None, backend=backend, index_dir=index_dir)
+            )
+        except Exception as error:
+            print(f"✗ Worker {os.getpid()} kept the old index: {error}")
+            return
+        service.set_matcher(matcher)
+
+    reloads = set()  # Strong references to running reload tasks
+
+    def request_reload():
+        task = asyncio.ensure_future(reload())
+        reloads.add(task)
+        task.add_done_callback(reloads.discard)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGHUP, request_reload)
+        loop.add_signal_handler(signal.SIGTERM, service.stop)
+        await service.serve(sock=sock)
+
+    asyncio.run(run())
+    if query_log is not None:
+        query_log.close()
+
+
+def serve_prefork(host="127.0.0.1", port=8000, processes=2, backend="cosine", workers=4,
+                  max_batch=64, max_wait=0.002, sync_interval=5.0, query_log_path=None):
+    """
+    Run the service in pre-forked worker processes sharing one index
+
+    Args:
+        host, port: Address to listen on
+        processes: Number of worker processes
+        backend: Scoring backend of every worker
+        workers: Scoring threads per worker process
+        max_batch, max_wait: Micro-batching settings per worker process
+        sync_interval: Seconds between checks for FAQ edits (None disables)
+        query_log_path: SQLite file all workers log queries to (None disables)
+    """
+    from init_db import DB_PATH, get_data_version
+    from index_store import default_index_dir
+
+    index_dir = default_index_dir(DB_PATH)
+
+    def rebuild_index():
+        # Loads the index if it is current, refits and saves it otherwise
+        matcher = load_matcher()
+        if backend in ("semantic", "hybrid"):
+            # Fit the LSA model here too, so workers only load it instead of
+            # each fitting and saving one
+            from semantic_index import load_or_fit
+            load_or_fit(matcher)
+        return matcher.db_version
+
+    data_version = rebuild_index()
+
+    sock = socket.create_server((host, port), reuse_port=False)
+    sock.set_inheritable(True)
+    context = multiprocessing.get_context("fork")
+
+    def start_worker():
+        process = context.Process(
+            target=_worker_main,
+            args=(sock, index_dir, backend, workers, max_batch, max_wait, query_log_path),
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    children = [start_worker() for _ in range(processes)]
+    state = {"stopping": False, "reload": False}
+
+    def request_stop(signum, frame):
+        state["stopping"] = True
+
+    def request_reload(signum, frame):
+        state["reload"] = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGHUP, request_reload)
+    print(f"✓ FAQ service listening on http://{host}:{port} with {len(children)} processes")
+
+    last_check = time.monotonic()
+    try:
+        while not state["stopping"]:
+            time.sleep(0.2)
+
+            # Replace workers that died
+            for i, process in enumerate(children):
+                if not process.is_alive():
+                    print(f"✗ Worker {process.pid} exited ({process.exitcode}), restarting")
+                    children[i] = start_worker()
+
+            if sync_interval and time.monotonic() - last_check >= sync_interval:
+                last_check = time.monotonic()
+                if get_data_version() != data_version:
+                    state["reload"] = True
+
+            if state["reload"]:
+                state["reload"] = False
+                data_version = rebuild_index()
+                for process in children:
+                    os.kill(process.pid, signal.SIGHUP)
+                print(f"✓ Reloaded index (data version {data_version})")
+    finally:
+        for process in children:
+            if process.is_alive():
+                process.terminate()  # SIGTERM: graceful stop
+        for process in children:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.kill()
+        sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FAQ matching HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--backend", default="cosine", help="Scoring backend (see backends.py)")
+    parser.add_argument("--workers", type=int, default=4, help="Scoring threads")
+    parser.add_argument("--max-batch", type=int, default=64, help="Maximum micro-batch size")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="Maximum micro-batch wait")
+    parser.add_argument("--sync-interval", type=float, default=5.0,
+                        help="Seconds between checks for FAQ edits (0 disables)")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Worker processes sharing one memory-mapped index")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Record matcher metrics from the start (see /metrics)")
+    parser.add_argument("--query-log", nargs="?", const=default_log_path(), metavar="PATH",
+                        help="Log every query to a SQLite file (default path: faqs.log.db)")
+    args = parser.parse_args()
+
+    # Pre-forked workers inherit the setting
+    matcher_metrics.enabled = args.metrics
+
+    if args.processes > 1:
+        serve_prefork(
+            args.host,
+            args.port,
+            processes=args.processes,
+            backend=args.backend,
+            workers=args.workers,
+            max_batch=args.max_batch,
+            max_wait=args.max_wait_ms / 1000,
+            sync_interval=args.sync_interval or None,
+            query_log_path=args.query_log,
+        )
+        return
+
+    matcher = load_matcher(args.backend)
+    if args.query_log:
+        matcher.query_log = QueryLogger(args.query_log, source="service")
+    service = FAQService(
+        matcher,
+        workers=args.workers,
+        max_batch=args.max_batch,
+        max_wait=args.max_wait_ms / 1000,
+        sync_interval=args.sync_interval or None,
+    )
+    print(f"✓ FAQ service listening on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+Compact FAQ Storage
+Column-oriented FAQ storage that keeps text in contiguous UTF-8 buffers (with
+an offset array) and categories as integer codes, instead of one Python
+object per field per FAQ
+
+Backed by memory-mapped arrays from the persisted index, the buffers are
+shared by every process that opens the same index. Answers can also be left
+out entirely and fetched by FAQ id (e.g. from SQLite) for the FAQs returned.
+"""
+
+from collections.abc import Sequence
+import numpy as np
+
+# Number of FAQ ids per answer_loader call when iterating lazy answers
+ANSWER_FETCH_SIZE = 500
+
+
+def encode_texts(texts):
+    """
+    Pack strings into one UTF-8 buffer
+
+    Args:
+        texts: Iterable of strings
+
+    Returns:
+        Tuple (buffer as uint8 array, int64 offsets with len(texts) + 1 entries)
+    """
+    encoded = [text.encode("utf-8") for text in texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+class TextColumn(Sequence):
+    """Read-only sequence of strings decoded on access from a UTF-8 buffer"""
+
+    def __init__(self, buffer, offsets):
+        """
+        Args:
+            buffer: uint8 array with the concatenated UTF-8 text
+            offsets: int64 array; item i spans buffer[offsets[i]:offsets[i + 1]]
+        """
+        self.buffer = buffer
+        self.offsets = offsets
+
+    @classmethod
+    def from_texts(cls, texts):
+        """Create a column from a list of strings"""
+        return cls(*encode_texts(texts))
+
+    @property
+    def nbytes(self):
+        return self.buffer.nbytes + self.offsets.nbytes
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("TextColumn index out of range")
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+        return self.buffer[start:end].tobytes().decode("utf-8")
+
+
+class CategoryColumn(Sequence):
+    """Read-only sequence of category names decoded from integer codes (-1: no category)"""
+
+    def __init__(self, codes, names):
+        """
+        Args:
+            codes: Integer array (or list) with one code per FAQ
+            names: Category name of each code
+        """
+        self.codes = codes
+        self.names = names
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        code = self.codes[idx]
+        return self.names[code] if code >= 0 else None
+
+
+class LazyAnswers(Sequence):
+    """Answers of a FAQStore, fetched by FAQ id through its answer_loader"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return len(self.store)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return list(self._fetch(range(*idx.indices(len(self)))))
+        return self.store.answer(idx)
+
+    def __iter__(self):
+        return self._fetch(range(len(self)))
+
+    def _fetch(self, positions):
+        """Yield the answers at positions, loading ANSWER_FETCH_SIZE ids per call"""
+        for start in range(0, len(positions), ANSWER_FETCH_SIZE):
+            ids = [self.store.faq_id(idx) for idx in positions[start:start + ANSWER_FETCH_SIZE]]
+            answers = self.store.answer_loader(ids)
+            for faq_id in ids:
+                yield answers.get(faq_id)
+
+
+class FAQStore(Sequence):
+    """
+    Compact sequence of (id, question, answer, category) tuples
+
+    Columns:
+    - ids: int64 array
+    - questions (and answers, unless loaded lazily): TextColumn buffers
+    - categories: int32 codes into category_names (-1: no category)
+
+    Tuples are only built for the rows that are accessed. Edits switch the
+    columns to plain lists; compact() packs them again (FAQMatcher calls it
+    before the next query).
+    """
+
+    def __init__(self, ids, questions, category_codes, category_names, answers=None, answer_loader=None):
+        """
+        Args:
+            ids: int64 array of FAQ ids
+            questions: TextColumn of the questions
+            category_codes: int32 array with one code per FAQ
+            category_names: Category name of each code
+            answers: TextColumn of the answers, or None to use answer_loader
+            answer_loader: Callable mapping a list of FAQ ids to a dictionary
+                           {id: answer}; required if answers is None
+        """
+        if answers is None and answer_loader is None:
+            raise ValueError("FAQStore needs either answers or an answer_loader")
+        self._ids = ids
+        self._questions = questions
+        self._answers = answers
+        self._codes = category_codes
+        self.category_names = list(category_names)
+        self._category_lookup = {name: code for code, name in enumerate(self.category_names)}
+        self.answer_loader = answer_loader
+        self._packed = not isinstance(ids, list)
+
+    @classmethod
+    def from_faqs(cls, faqs, answer_loader=None):
+        """
+        Pack FAQs into a store
+
+        Args:
+            faqs: Iterable of tuples (id, question, answer, category)
+            answer_loader: Optional callable mapping a list of FAQ ids to
+                           {id: answer}; answers are then not stored
+
+        Returns:
+            FAQStore
+        """
+        store = cls([], [], [], [], answers=None if answer_loader else [], answer_loader=answer_loader)
+        for faq_id, question, answer, category in faqs:
+            store._ids.append(faq_id)
+            store._questions.append(question)
+            if store._answers is not None:
+                store._answers.append(answer)
+            store._codes.append(store._category_code(category))
+        store.compact()
+        return store
+
+    # Columns
+
+    @property
+    def ids(self):
+        """FAQ ids (array, or list while edited)"""
+        return self._ids
+
+    @property
+    def questions(self):
+        return self._questions
+
+    @property
+    def answers(self):
+        return self._answers if self._answers is not None else LazyAnswers(self)
+
+    @property
+    def categories(self):
+        return CategoryColumn(self._codes, self.category_names)
+
+    @property
+    def category_codes(self):
+        return self._codes
+
+    @property
+    def stores_answers(self):
+        """False if answers are fetched through the answer_loader"""
+        return self._answers is not None
+
+    @property
+    def nbytes(self):
+        """Bytes held by the packed columns (0 while edited)"""
+        if not self._packed:
+            return 0
+        columns = (self._ids, self._questions, self._codes, self._answers)
+        return sum(column.nbytes for column in columns if column is not None)
+
+    # Rows
+
+    def faq_id(self, idx):
+        return int(self._ids[idx])
+
+    def question(self, idx):
+        return self._questions[idx]
+
+    def answer(self, idx):
+        if self._answers is not None:
+            return self._answers[idx]
+        faq_id = self.faq_id(idx)
+        return self.answer_loader([faq_id]).get(faq_id)
+
+    def category(self, idx):
+        code = self._codes[idx]
+        return self.category_names[code] if code >= 0 else None
+
+    def equals(self, idx, faq):
+        """
+        Check whether row idx holds faq (id, question, answer, category)
+
+        Lazily loaded answers are not compared: they are always read fresh.
+        """
+        faq_id, question, answer, category = faq
+        return (
+            self.faq_id(idx) == faq_id
+            and self.question(idx) == question
+            and self.category(idx) == category
+            and (self._answers is None or self._answers[idx] == answer)
+        )
+
+    def take(self, positions):
+        """Get the FAQs at positions as tuples, fetching lazy answers in bulk"""
+        if self._answers is not None:
+            answers = (self._answers[idx] for idx in positions)
+        else:
+            answers = LazyAnswers(self)._fetch(positions)
+        return [
+            (self.faq_id(idx), self.question(idx), answer, self.category(idx))
+            for idx, answer in zip(positions, answers)
+        ]
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        return (self.faq_id(idx), self.question(idx), self.answer(idx), self.category(idx))
+
+    def __iter__(self):
+        # Answers are fetched in bulk rather than one loader call per row
+        return (
+            (int(faq_id), question, answer, category)
+            for faq_id, question, answer, category
+            in zip(self._ids, self._questions, self.answers, self.categories)
+        )
+
+    # Edits
+
+    def append(self, faq_id, question, answer, category):
+        """Add a FAQ at the end"""
+        self._thaw()
+        self._ids.append(faq_id)
+        self._questions.append(question)
+        if self._answers is not None:
+            self._answers.append(answer)
+        self._codes.append(self._category_code(category))
+
+    def replace(self, idx, faq_id, question, answer, category):
+        """Overwrite the FAQ at position idx"""
+        self._thaw()
+        self._ids[idx] = faq_id
+        self._questions[idx] = question
+        if self._answers is not None:
+            self._answers[idx] = answer
+        self._codes[idx] = self._category_code(category)
+
+    def delete(self, idx):
+        """Remove the FAQ at position idx"""
+        self._thaw()
+        del self._ids[idx]
+        del self._questions[idx]
+        if self._answers is not None:
+            del self._answers[idx]
+        del self._codes[idx]
+
+    def compact(self):
+        """Pack edited columns back into arrays and drop unused category names"""
+        if self._packed:
+            return
+        codes = np.array(self._codes, dtype=np.int32)
+        used = np.unique(codes[codes >= 0])
+        if len(used) < len(self.category_names):
+            remap = np.full(len(self.category_names), -1, dtype=np.int32)
+            remap[used] = np.arange(len(used), dtype=np.int32)
+            codes = np.where(codes >= 0, remap[codes], -1).astype(np.int32)
+            self.category_names = [self.category_names[code] for code in used]
+            self._category_lookup = {name: code for code, name in enumerate(self.category_names)}
+        self._codes = codes
+        self._ids = np.array(self._ids, dtype=np.int64)
+        self._questions = TextColumn.from_texts(self._questions)
+        if self._answers is not None:
+            self._answers = TextColumn.from_texts(self._answers)
+        self._packed = True
+
+    def _thaw(self):
+        """Switch the columns to lists before an edit"""
+        if not self._packed:
+            return
+        self._ids = [int(faq_id) for faq_id in self._ids]
+        self._questions = list(self._questions)
+        if self._answers is not None:
+            self._answers = list(self._answers)
+        self._codes = [int(code) for code in self._codes]
+        self._packed = False
+
+    def _category_code(self, category):
+        """Get the code of a category name, adding new names"""
+        if category is None:
+            return -1
+        code = self._category_lookup.get(category)
+        if code is None:
+            code = len(self.category_names)
+            self.category_names.append(category)
+            self._category_lookup[category] = code
+        return code
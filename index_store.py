@@ -0,0 +1,325 @@
+"""
+Matcher Index Store
+Persists the fitted TF-IDF model next to faqs.db so FAQMatcher can start
+without re-preprocessing every FAQ and refitting the vectorizer
+
+Layout of the index directory (default: faqs.index next to faqs.db):
+- meta.json:   index version, corpus signature and shapes
+- vocab.npy:   terms ordered by matrix column (fixed-width unicode)
+- idf.npy:     idf weight of each term
+- data.npy, indices.npy, indptr.npy: CSR arrays of the TF-IDF matrix
+- counts.npy:  raw term counts, aligned with data.npy (same sparsity pattern),
+               used for incremental FAQ edits
+- postings_data.npy, postings_indices.npy, postings_indptr.npy: the same
+               matrix in term-major order (posting lists), used by the backends
+- ids.npy, {question,answer}_text.npy / _offsets.npy: the FAQs themselves
+               as UTF-8 buffers (see faq_store.TextColumn)
+- category_codes.npy, category_names.npy: category of each FAQ as a code
+               into the distinct names (-1: no category)
+
+All arrays are raw .npy files loaded with memory mapping, so loading costs
+a few milliseconds and the pages are shared between processes. Worker
+processes can serve straight from an index without touching faqs.db.
+
+faqs.index itself is a symlink to a versioned directory (faqs.index.v-*).
+A rebuild writes a new version and atomically replaces the symlink, so a
+reader always resolves the path to a complete index.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from contextlib import contextmanager
+from faq_store import FAQStore, TextColumn, encode_texts
+
+try:
+    import fcntl
+except ImportError:  # Windows: publishers are not serialized
+    fcntl = None
+
+# Bump whenever the preprocessing or the on-disk layout changes
+INDEX_VERSION = 4
+
+# Attempts at opening an index whose version was replaced mid-load
+LOAD_ATTEMPTS = 3
+
+META_FILE = "meta.json"
+TEXT_COLUMNS = ("question", "answer")
+ARRAY_NAMES = (
+    "vocab", "idf", "data", "indices", "indptr", "counts",
+    "postings_data", "postings_indices", "postings_indptr",
+    "ids", "category_codes", "category_names",
+) + tuple(f"{column}_{part}" for column in TEXT_COLUMNS for part in ("text", "offsets"))
+
+
+def default_index_dir(db_path="faqs.db"):
+    """Get the index directory that belongs to a database file (faqs.db -> faqs.index)"""
+    return os.path.splitext(db_path)[0] + ".index"
+
+
+def corpus_signature(faqs):
+    """
+    Content hash of the FAQs (in order) stored in the index
+
+    Args:
+        faqs: List of tuples (id, question, answer, category)
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    for faq in faqs:
+        digest.update("\x1f".join(str(field) for field in faq[:4]).encode("utf-8") + b"\x1e")
+    return digest.hexdigest()
+
+
+def make_tmp_dir(target):
+    """Create a fresh directory next to target to write a new version into"""
+    parent = os.path.dirname(os.path.abspath(target))
+    tmp_dir = tempfile.mkdtemp(prefix=f"{os.path.basename(target)}.tmp-", dir=parent)
+    os.chmod(tmp_dir, 0o755)
+    return tmp_dir
+
+
+def publish_dir(tmp_dir, target):
+    """
+    Atomically make a fully written directory the current version of target
+
+    tmp_dir is renamed to a versioned sibling (target.v-*) and target is
+    replaced by a symlink to it with os.replace, so target never disappears
+    or points at a partial directory. The version target pointed at before
+    is kept for readers that are still opening it; older ones are removed.
+    Publishers of the same target (e.g. pre-fork workers saving a model at
+    once) take turns through a lock file, so none removes the version another
+    just linked. Without symlink support the directories are swapped with
+    two renames.
+
+    Args:
+        tmp_dir: Directory from make_tmp_dir(target)
+        target: Published path
+    """
+    parent = os.path.dirname(os.path.abspath(target))
+    prefix = f"{os.path.basename(target)}.v-"
+    version = f"{prefix}{os.getpid()}-{time.time_ns():x}"
+    os.rename(tmp_dir, os.path.join(parent, version))
+
+    link = f"{target}.link-{os.getpid()}-{time.time_ns():x}"
+    try:
+        os.symlink(version, link)
+    except (OSError, NotImplementedError):
+        with _publish_lock(target):
+            _swap_dirs(os.path.join(parent, version), target)
+        return
+
+    with _publish_lock(target):
+        previous = os.readlink(target) if os.path.islink(target) else None
+        if os.path.isdir(target) and not os.path.islink(target):
+            # Directory published before versioning: move it aside once
+            old_dir = f"{target}.old-{os.getpid()}"
+            os.rename(target, old_dir)
+            os.replace(link, target)
+            shutil.rmtree(old_dir, ignore_errors=True)
+        else:
+            os.replace(link, target)
+
+        for name in os.listdir(parent):
+            if name.startswith(prefix) and name not in (version, previous):
+                shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+
+
+@contextmanager
+def _publish_lock(target):
+    """Hold an exclusive lock on target.lock (no-op without fcntl)"""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{target}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _swap_dirs(new_dir, target):
+    """Replace target by new_dir with two renames (brief window without target)"""
+    if os.path.exists(target):
+        old_dir = f"{target}.old-{os.getpid()}"
+        os.rename(target, old_dir)
+        os.rename(new_dir, target)
+        shutil.rmtree(old_dir, ignore_errors=True)
+    else:
+        os.rename(new_dir, target)
+
+
+def save_index(index_dir, vocabulary, idf, tfidf_matrix, term_counts, faqs, signature):
+    """
+    Write the index to index_dir
+
+    Files are written to a temporary directory first and published with
+    publish_dir(), so readers never see a missing or half-written index.
+
+    Args:
+        index_dir: Target directory
+        vocabulary: Terms ordered by matrix column
+        idf: idf vector
+        tfidf_matrix: TF-IDF matrix (FAQs x terms)
+        term_counts: Raw term count matrix with the same sparsity pattern
+        faqs: faq_store.FAQStore, or a sequence of tuples (id, question,
+              answer, category), with one FAQ per matrix row
+        signature: corpus_signature() of the indexed FAQs
+    """
+    from scipy.sparse import csr_matrix
+
+    # counts.npy reuses the TF-IDF indices, so both matrices must already
+    # share one sparsity pattern (FAQMatcher derives the weights from the counts)
+    tfidf_matrix = csr_matrix(tfidf_matrix)
+    term_counts = csr_matrix(term_counts)
+    postings = tfidf_matrix.T.tocsr()
+    postings.sort_indices()
+    store = faqs if isinstance(faqs, FAQStore) else FAQStore.from_faqs(faqs)
+    store.compact()
+    arrays = {
+        "vocab": np.asarray(vocabulary, dtype=str),
+        "idf": np.asarray(idf, dtype=np.float64),
+        "data": tfidf_matrix.data,
+        "indices": tfidf_matrix.indices,
+        "indptr": tfidf_matrix.indptr,
+        "counts": term_counts.data,
+        "postings_data": postings.data,
+        "postings_indices": postings.indices,
+        "postings_indptr": postings.indptr,
+        "ids": store.ids,
+        "category_codes": store.category_codes,
+        "category_names": np.asarray(store.category_names, dtype=str),
+        "question_text": store.questions.buffer,
+        "question_offsets": store.questions.offsets,
+    }
+    # Lazily loaded answers are fetched in bulk and stored with the index
+    answers = store.answers if store.stores_answers else TextColumn(*encode_texts(store.answers))
+    arrays["answer_text"] = answers.buffer
+    arrays["answer_offsets"] = answers.offsets
+    meta = {
+        "version": INDEX_VERSION,
+        "signature": signature,
+        "n_faqs": tfidf_matrix.shape[0],
+        "n_terms": tfidf_matrix.shape[1],
+    }
+
+    tmp_dir = make_tmp_dir(index_dir)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+    with open(os.path.join(tmp_dir, META_FILE), "w") as f:
+        json.dump(meta, f)
+
+    # Open memory maps of the previous version stay valid
+    publish_dir(tmp_dir, index_dir)
+
+
+def read_meta(index_dir):
+    """Read meta.json of an index, or None if there is no index"""
+    try:
+        with open(os.path.join(index_dir, META_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_index(index_dir, signature=None):
+    """
+    Load a persisted index with memory-mapped arrays
+
+    Args:
+        index_dir: Index directory
+        signature: Expected corpus_signature(); the index is treated as stale
+                   if it differs (None skips the check)
+
+    Returns:
+        Dictionary with 'vocabulary' (list of terms), 'idf', 'tfidf_matrix',
+        'tfidf_matrix_t' (posting lists), 'term_counts' and 'faqs'
+        (faq_store.FAQStore over the stored columns), or None if the index
+        is missing, stale or from another INDEX_VERSION
+    """
+    for attempt in range(LOAD_ATTEMPTS):
+        # Resolve the symlink once so meta and arrays come from one version
+        version_dir = os.path.realpath(index_dir)
+        meta = read_meta(version_dir)
+        if meta is None and os.path.exists(index_dir) and attempt + 1 < LOAD_ATTEMPTS:
+            continue
+        if meta is None or meta.get("version") != INDEX_VERSION:
+            return None
+        if signature is not None and meta.get("signature") != signature:
+            return None
+        try:
+            arrays = {
+                name: np.load(os.path.join(version_dir, f"{name}.npy"), mmap_mode="r")
+                for name in ARRAY_NAMES
+            }
+            break
+        except (OSError, ValueError):
+            # The version was removed by a newer rebuild while loading
+            if attempt + 1 == LOAD_ATTEMPTS:
+                return None
+
+    from scipy.sparse import csr_matrix
+
+    shape = (meta["n_faqs"], meta["n_terms"])
+    tfidf_matrix = csr_matrix(
+        (arrays["data"], arrays["indices"], arrays["indptr"]), shape=shape, copy=False
+    )
+    term_counts = csr_matrix(
+        (arrays["counts"], arrays["indices"], arrays["indptr"]), shape=shape, copy=False
+    )
+    tfidf_matrix_t = csr_matrix(
+        (arrays["postings_data"], arrays["postings_indices"], arrays["postings_indptr"]),
+        shape=shape[::-1], copy=False,
+    )
+    tfidf_matrix_t.has_sorted_indices = True
+    questions, answers = (
+        TextColumn(arrays[f"{column}_text"], arrays[f"{column}_offsets"])
+        for column in TEXT_COLUMNS
+    )
+    faqs = FAQStore(
+        arrays["ids"], questions, arrays["category_codes"], arrays["category_names"].tolist(),
+        answers=answers,
+    )
+    return {
+        "vocabulary": arrays["vocab"].tolist(),
+        "idf": arrays["idf"],
+        "tfidf_matrix": tfidf_matrix,
+        "tfidf_matrix_t": tfidf_matrix_t,
+        "term_counts": term_counts,
+        "faqs": faqs,
+        "signature": meta["signature"],
+    }
+
+
+def build_index(index_dir=None):
+    """
+    Build (or rebuild) the index for the FAQ database
+
+    Args:
+        index_dir: Target directory (default: default_index_dir(DB_PATH))
+
+    Returns:
+        Path of the index directory
+    """
+    from init_db import DB_PATH, get_all_faqs
+    from faq_matcher import FAQMatcher
+
+    index_dir = index_dir or default_index_dir(DB_PATH)
+    matcher = FAQMatcher(get_all_faqs())
+    matcher.save_index(index_dir)
+    return index_dir
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    path = build_index()
+    print(f"✓ Index written to {os.path.abspath(path)} in {time.perf_counter() - start:.2f}s")
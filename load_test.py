@@ -0,0 +1,723 @@
+"""
+Load Tester
+Replays JSONL question logs against FAQMatcher (in this process) or a running
+faq_service.py, and reports throughput, latency percentiles, error rate and
+CPU/RSS over time to find saturation points
+
+Load models:
+- closed loop (default): --concurrency users each ask the next question as
+  soon as the previous one is answered
+- open loop: --rate R starts R requests per second no matter how fast they
+  are answered. Latency is measured from the scheduled start, so queueing
+  behind a saturated target counts (no coordinated omission).
+- ramp: --ramp 50:30,50-400:120 runs open-loop stages of "rate:seconds" or
+  "start-end:seconds" (rate changing linearly during the stage)
+
+Requests run in a thread pool, on an asyncio event loop or in worker
+processes (--mode); --concurrency bounds the requests in flight. Questions
+are streamed from the file and replayed from the start when it runs out.
+
+Every --interval seconds a line shows offered and completed requests per
+second, latency p50/p95/p99, errors and CPU/RSS of the load target: this
+process and its children, or the service processes given with --pid (Linux
+/proc; elsewhere only this process is measured).
+
+Usage:
+    python load_test.py questions.jsonl --duration 30 --concurrency 8
+    python load_test.py requests.jsonl --question-field title --url http://127.0.0.1:8000 \
+        --rate 200 --duration 60 --pid 12345
+    python load_test.py questions.jsonl --ramp 50:20,50-500:120 --mode processes \
+        --concurrency 4 --slo-ms 50 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from urllib.parse import urlsplit
+from benchmark import percentile, peak_rss_mb, environment_info
+
+MODES = ("threads", "asyncio", "processes")
+
+# Target and warm-up barrier of the current worker process (processes mode,
+# see _init_worker)
+_worker_target = None
+_worker_barrier = None
+
+
+def read_questions(path, question_field="question", repeat=True):
+    """
+    Stream questions from a JSONL file
+
+    Args:
+        path: JSONL file
+        question_field: Field holding the question (records without it are skipped)
+        repeat: Start over at the end of the file
+
+    Yields:
+        Question strings
+    """
+    from faq_import import read_jsonl
+
+    while True:
+        found = False
+        for record in read_jsonl(path):
+            question = record.get(question_field)
+            if isinstance(question, str) and question.strip():
+                found = True
+                yield question
+        if not found:
+            raise ValueError(f"No '{question_field}' values in {path}")
+        if not repeat:
+            return
+
+
+def parse_ramp(spec):
+    """
+    Parse a ramp schedule
+
+    Args:
+        spec: Comma-separated stages "rate:seconds" or "start-end:seconds"
+
+    Returns:
+        List of (start rate, end rate, seconds) tuples
+    """
+    stages = []
+    for stage in spec.split(","):
+        try:
+            rates, seconds = stage.strip().split(":")
+            start, _, end = rates.partition("-")
+            stages.append((float(start), float(end or start), float(seconds)))
+        except ValueError:
+            raise ValueError(f"Invalid ramp stage '{stage}' (expected rate:seconds or start-end:seconds)")
+    return stages
+
+
+def arrival_times(stages):
+    """
+    Yield open-loop request start times (seconds from the test start)
+
+    Args:
+        stages: List of (start rate, end rate, seconds)
+    """
+    offset = 0.0
+    for start_rate, end_rate, seconds in stages:
+        t = 0.0
+        while t < seconds:
+            rate = start_rate + (end_rate - start_rate) * t / seconds
+            if rate <= 0:
+                # Nothing to send at this rate: move on by a small step
+                t += 0.01
+                continue
+            yield offset + t
+            t += 1.0 / rate
+        offset += seconds
+
+
+class MatcherTarget:
+    """Calls FAQMatcher.find_best_match in this process"""
+
+    def __init__(self, backend="cosine", threshold=0.3, db_path=None):
+        self.backend = backend
+        self.threshold = threshold
+        self.db_path = db_path
+        self.index_dir = None
+        self.matcher = None
+
+    def open(self):
+        """Build the matcher, building or validating the persisted index"""
+        import init_db
+        from faq_matcher import FAQMatcher
+        from index_store import default_index_dir
+
+        if self.db_path:
+            init_db.DB_PATH = self.db_path
+        self.index_dir = default_index_dir(init_db.DB_PATH)
+        self.matcher = FAQMatcher(
+            init_db.get_all_faqs(), backend=self.backend,
+            index_dir=self.index_dir, answer_loader=init_db.get_answers,
+        )
+
+    def open_worker(self):
+        """Open the index built by open() read-only (memory-mapped) in a worker process"""
+        from faq_matcher import FAQMatcher
+
+        self.matcher = FAQMatcher(None, backend=self.backend, index_dir=self.index_dir)
+
+    def __getstate__(self):
+        # Worker processes open their own matcher
+        return {**self.__dict__, "matcher": None}
+
+    def __call__(self, question):
+        self.matcher.find_best_match(question, self.threshold)
+
+    async def call_async(self, question, connection):
+        """Run the matcher in the event loop's default executor"""
+        await asyncio.get_running_loop().run_in_executor(None, self, question)
+        return connection
+
+
+class HTTPTarget:
+    """POSTs questions to the /match endpoint of faq_service.py"""
+
+    def __init__(self, url, threshold=0.3, timeout=10.0):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.path = (parts.path.rstrip("/") or "") + "/match"
+        self.threshold = threshold
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def open(self):
+        pass
+
+    def open_worker(self):
+        pass
+
+    def __getstate__(self):
+        # Connections are per thread and process
+        return {key: value for key, value in self.__dict__.items() if key != "_local"}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state, _local=threading.local())
+
+    def _body(self, question):
+        return json.dumps({"question": question, "threshold": self.threshold}).encode("utf-8")
+
+    def __call__(self, question):
+        """Send one request on this thread's keep-alive connection"""
+        import http.client
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.connection = connection
+        try:
+            connection.request("POST", self.path, self._body(question), {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            response.read()
+        except Exception:
+            connection.close()
+            self._local.connection = None
+            raise
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}")
+
+    async def call_async(self, question, connection):
+        """
+        Send one request on an asyncio keep-alive connection
+
+        Args:
+            question: Question to send
+            connection: (reader, writer) from a previous call, or None
+
+        Returns:
+            The connection to reuse (None after an error)
+        """
+        try:
+            if connection is None:
+                connection = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port), self.timeout
+                )
+            reader, writer = connection
+            body = self._body(question)
+            writer.write(
+                f"POST {self.path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1")
+                + body
+            )
+            await writer.drain()
+            status, length = await asyncio.wait_for(self._read_head(reader), self.timeout)
+            await asyncio.wait_for(reader.readexactly(length), self.timeout)
+        except Exception:
+            if connection is not None:
+                connection[1].close()
+            raise
+        if status != 200:
+            raise RuntimeError(f"HTTP {status}")
+        return connection
+
+    @staticmethod
+    async def _read_head(reader):
+        """Read a response's status line and headers: (status, content length)"""
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by the server")
+        status = int(status_line.split()[1])
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return status, length
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value.strip())
+
+
+class ProcessSampler:
+    """CPU and RSS of a set of processes and their children (Linux /proc)"""
+
+    def __init__(self, pids):
+        """
+        Args:
+            pids: Root process ids; their child processes are included
+        """
+        self.pids = list(pids)
+        self.ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self.page_size = resource.getpagesize()
+        self.proc = os.path.isdir("/proc")
+        self._last = None
+        # CPU seconds per process at the previous sample
+        self._cpu = {}
+
+    def sample(self):
+        """
+        Get (CPU % since the previous sample, RSS in MB)
+
+        CPU above 100% means more than one core was busy.
+        """
+        now = time.monotonic()
+        if self.proc:
+            # Summed per process, so processes exiting between samples do not count negatively
+            cpu_seconds, rss_bytes, cpu = 0.0, 0, {}
+            for pid in self._processes():
+                try:
+                    with open(f"/proc/{pid}/stat") as f:
+                        fields = f.read().rsplit(")", 1)[1].split()
+                    with open(f"/proc/{pid}/statm") as f:
+                        resident = int(f.read().split()[1])
+                except (OSError, IndexError, ValueError):
+                    continue  # The process exited
+                cpu[pid] = (int(fields[11]) + int(fields[12])) / self.ticks
+                cpu_seconds += cpu[pid] - self._cpu.get(pid, 0.0)
+                rss_bytes += resident * self.page_size
+            self._cpu = cpu
+            rss_mb = rss_bytes / (1024 * 1024)
+        else:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            cpu_seconds = usage.ru_utime + usage.ru_stime - self._cpu.get(None, 0.0)
+            self._cpu = {None: usage.ru_utime + usage.ru_stime}
+            # Only the peak is available without /proc
+            rss_mb = peak_rss_mb()
+        last, self._last = self._last, now
+        if last is None or now <= last:
+            return None, round(rss_mb, 1)
+        return round(cpu_seconds / (now - last) * 100, 1), round(rss_mb, 1)
+
+    def _processes(self):
+        """The root processes and all their descendants"""
+        parents = {}
+        for entry in os.listdir("/proc"):
+            if entry.isdigit():
+                try:
+                    with open(f"/proc/{entry}/stat") as f:
+                        parents.setdefault(int(f.read().rsplit(")", 1)[1].split()[1]), []).append(int(entry))
+                except (OSError, IndexError, ValueError):
+                    continue
+        found, pending = set(), list(self.pids)
+        while pending:
+            pid = pending.pop()
+            if pid not in found:
+                found.add(pid)
+                pending.extend(parents.get(pid, ()))
+        return found
+
+
+class Recorder:
+    """Collects request outcomes, per reporting interval and in total"""
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.error_types = {}
+        self.offered = 0
+        self._window = ([], 0, 0)  # (latencies, errors, offered) of the current interval
+        self._lock = threading.Lock()
+
+    def offer(self):
+        """Count a request that was due to start"""
+        with self._lock:
+            latencies, errors, offered = self._window
+            self._window = (latencies, errors, offered + 1)
+            self.offered += 1
+
+    def record(self, latency, error=None):
+        """Record a finished request (latency in seconds) or its error"""
+        with self._lock:
+            latencies, errors, offered = self._window
+            if error is None:
+                latencies.append(latency)
+                self.latencies.append(latency)
+            else:
+                self._window = (latencies, errors + 1, offered)
+                self.errors += 1
+                name = type(error).__name__ if isinstance(error, BaseException) else str(error)
+                self.error_types[name] = self.error_types.get(name, 0) + 1
+
+    def take_window(self):
+        """Get and reset the current interval's (latencies, errors, offered)"""
+        with self._lock:
+            window, self._window = self._window, ([], 0, 0)
+        return window
+
+
+def _init_worker(target, barrier):
+    """Open the target once per worker process"""
+    global _worker_target, _worker_barrier
+    target.open_worker()
+    _worker_target = target
+    _worker_barrier = barrier
+
+
+def _call_worker(question):
+    _worker_target(question)
+
+
+def _warm_worker(question):
+    """Answer one question (loading lazy resources), then wait until every worker got here"""
+    _worker_target(question)
+    _worker_barrier.wait()
+
+
+class LoadTest:
+    """Runs one load test against a target and reports the timeline"""
+
+    def __init__(self, target, questions, mode="threads", concurrency=8, duration=30.0, rate=None,
+                 ramp=None, interval=1.0, max_backlog=10000, pids=None, slo_ms=None, verbose=True):
+        """
+        Args:
+            target: MatcherTarget or HTTPTarget
+            questions: Iterator of questions (e.g. read_questions())
+            mode: 'threads', 'asyncio' or 'processes'
+            concurrency: Maximum number of requests in flight
+            duration: Test length in seconds (closed loop and --rate)
+            rate: Open-loop requests per second (None: closed loop)
+            ramp: Open-loop stages from parse_ramp() (overrides rate and duration)
+            interval: Seconds per timeline entry
+            max_backlog: Open-loop requests allowed to wait for a free worker;
+                         further ones count as 'Overloaded' errors
+            pids: Processes to measure CPU/RSS of (default: this process and
+                  its children)
+            slo_ms: Latency objective for max_throughput_within_slo (p95)
+            verbose: Print a line per interval
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}'. Choose from: {', '.join(MODES)}")
+        self.target = target
+        self.questions = questions
+        self.mode = mode
+        self.concurrency = concurrency
+        if ramp:
+            self.stages = ramp
+        elif rate:
+            self.stages = [(rate, rate, duration)]
+        else:
+            self.stages = None
+        self.duration = sum(stage[2] for stage in self.stages) if self.stages else duration
+        self.interval = interval
+        self.max_backlog = max_backlog
+        self.sampler = ProcessSampler(pids or [os.getpid()])
+        self.slo_ms = slo_ms
+        self.verbose = verbose
+        self.recorder = Recorder()
+        self.timeline = []
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+
+    def run(self):
+        """
+        Run the test
+
+        Returns:
+            Report dictionary (summary, per-interval timeline, error types)
+        """
+        executor = None
+        # Build or validate the persisted index once, here, before any worker opens it
+        self.target.open()
+        if self.mode == "processes":
+            barrier = multiprocessing.Barrier(self.concurrency)
+            executor = ProcessPoolExecutor(
+                max_workers=self.concurrency, initializer=_init_worker, initargs=(self.target, barrier)
+            )
+            # One warm-up task per worker (the barrier keeps a worker from taking
+            # two), so all workers are ready before the clock starts
+            list(executor.map(_warm_worker, [next(self.questions)] * self.concurrency))
+        elif self.mode == "threads":
+            executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="load")
+
+        self.sampler.sample()
+        done = threading.Event()
+        reporter = threading.Thread(target=self._report_loop, args=(done,), daemon=True)
+        self.started = time.monotonic()
+        reporter.start()
+        try:
+            if executor is None:
+                asyncio.run(self._run_async())
+            else:
+                with executor:
+                    self._run_pool(executor)
+        finally:
+            done.set()
+            reporter.join()
+        self.elapsed = time.monotonic() - self.started
+        return self.report()
+
+    # Thread and process pools
+
+    def _run_pool(self, executor):
+        """Submit requests to a thread or process pool until the schedule ends"""
+        call = _call_worker if self.mode == "processes" else self.target
+        slots = threading.BoundedSemaphore(self.concurrency) if self.stages is None else None
+        for scheduled in self._schedule(slots):
+            self.recorder.offer()
+            if self.stages is not None and self._in_flight >= self.concurrency + self.max_backlog:
+                self.recorder.record(None, "Overloaded")
+                continue
+            with self._in_flight_lock:
+                self._in_flight += 1
+            future = executor.submit(call, next(self.questions))
+            future.add_done_callback(lambda future, scheduled=scheduled: self._finish(future, scheduled, slots))
+
+    def _schedule(self, slots):
+        """Yield request start times: when a slot is free (closed loop) or by the arrival schedule"""
+        if self.stages is None:
+            deadline = self.started + self.duration
+            while True:
+                slots.acquire()
+                now = time.monotonic()
+                if now >= deadline:
+                    slots.release()
+                    return
+                yield now
+        for offset in arrival_times(self.stages):
+            scheduled = self.started + offset
+            delay = scheduled - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            yield scheduled
+
+    def _finish(self, future, scheduled, slots):
+        error = future.exception()
+        self.recorder.record(time.monotonic() - scheduled, error)
+        with self._in_flight_lock:
+            self._in_flight -= 1
+        if slots is not None:
+            slots.release()
+
+    # asyncio
+
+    async def _run_async(self):
+        # One connection slot per concurrent request (a keep-alive connection for HTTP)
+        connections = asyncio.Queue()
+        for _ in range(self.concurrency):
+            connections.put_nowait(None)
+        loop = asyncio.get_running_loop()
+        if isinstance(self.target, MatcherTarget):
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=self.concurrency))
+        tasks = set()
+        deadline = self.started + self.duration
+
+        async def request(question, scheduled):
+            connection = await connections.get()
+            try:
+                connection = await self.target.call_async(question, connection)
+                self.recorder.record(time.monotonic() - scheduled)
+            except Exception as error:
+                connection = None
+                self.recorder.record(None, error)
+            finally:
+                self._in_flight -= 1
+                connections.put_nowait(connection)
+
+        if self.stages is None:
+            async def user():
+                while time.monotonic() < deadline:
+                    self.recorder.offer()
+                    self._in_flight += 1
+                    await request(next(self.questions), time.monotonic())
+            await asyncio.gather(*(user() for _ in range(self.concurrency)))
+        else:
+            for offset in arrival_times(self.stages):
+                scheduled = self.started + offset
+                delay = scheduled - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self.recorder.offer()
+                if self._in_flight >= self.concurrency + self.max_backlog:
+                    self.recorder.record(None, "Overloaded")
+                    continue
+                self._in_flight += 1
+                task = asyncio.ensure_future(request(next(self.questions), scheduled))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+
+        # Close keep-alive connections
+        while not connections.empty():
+            connection = connections.get_nowait()
+            if isinstance(connection, tuple):
+                connection[1].close()
+
+    # Reporting
+
+    def _report_loop(self, done):
+        """Append a timeline entry every interval until the test is done"""
+        next_report = time.monotonic() + self.interval
+        while not done.wait(max(0.0, next_report - time.monotonic())):
+            self._report_interval(self.interval)
+            next_report += self.interval
+        # Requests finished since the last full interval
+        remainder = time.monotonic() - (next_report - self.interval)
+        if remainder > 0.05:
+            self._report_interval(remainder)
+
+    def _report_interval(self, seconds):
+        latencies, errors, offered = self.recorder.take_window()
+        latencies.sort()
+        cpu_percent, rss_mb = self.sampler.sample()
+        entry = {
+            "t": round(time.monotonic() - self.started, 2),
+            "offered_rps": round(offered / seconds, 1),
+            "throughput_rps": round(len(latencies) / seconds, 1),
+            "errors": errors,
+            "in_flight": self._in_flight,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+            "cpu_percent": cpu_percent,
+            "rss_mb": rss_mb,
+        }
+        self.timeline.append(entry)
+        if self.verbose:
+            latency = (
+                f"p50 {entry['p50_ms']:7.2f}ms p95 {entry['p95_ms']:7.2f}ms p99 {entry['p99_ms']:7.2f}ms"
+                if latencies else "no responses" + " " * 33
+            )
+            cpu = f"{cpu_percent:5.0f}%" if cpu_percent is not None else "    -"
+            print(f"   t={entry['t']:6.1f}s  offered {entry['offered_rps']:8.1f}/s  "
+                  f"done {entry['throughput_rps']:8.1f}/s  {latency}  err {errors:4d}  "
+                  f"cpu {cpu}  rss {rss_mb:7.1f}MB")
+
+    def report(self):
+        """Summary of the whole run plus the timeline"""
+        recorder = self.recorder
+        latencies = sorted(recorder.latencies)
+        total = len(latencies) + recorder.errors
+        summary = {
+            "requests": total,
+            "completed": len(latencies),
+            "errors": recorder.errors,
+            "error_rate": round(recorder.errors / total, 4) if total else 0.0,
+            "duration_s": round(self.elapsed, 2),
+            "throughput_rps": round(len(latencies) / self.elapsed, 1) if self.elapsed else 0.0,
+            "latency_ms": {
+                f"p{pct}": round(percentile(latencies, pct) * 1000, 2) for pct in (50, 90, 95, 99)
+            } if latencies else None,
+        }
+        if latencies:
+            summary["latency_ms"]["max"] = round(latencies[-1] * 1000, 2)
+        if self.slo_ms is not None:
+            # Highest interval throughput that kept p95 within the objective and had no errors
+            within = [
+                entry["throughput_rps"] for entry in self.timeline
+                if entry["p95_ms"] is not None and entry["p95_ms"] <= self.slo_ms and not entry["errors"]
+            ]
+            summary["max_throughput_within_slo"] = max(within) if within else 0.0
+        return {"summary": summary, "error_types": recorder.error_types, "timeline": self.timeline}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay question logs against FAQMatcher or the HTTP service")
+    parser.add_argument("path", help="JSONL file with one question per line")
+    parser.add_argument("--question-field", default="question", help="JSON field holding the question")
+    parser.add_argument("--url", help="Base URL of faq_service.py (default: FAQMatcher in this process)")
+    parser.add_argument("--backend", default="cosine", help="Scoring backend for in-process runs")
+    parser.add_argument("--db", help="SQLite database file for in-process runs (default: init_db.DB_PATH)")
+    parser.add_argument("--threshold", type=float, default=0.3)
+    parser.add_argument("--mode", choices=MODES, default="threads", help="How requests run concurrently")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum requests in flight")
+    parser.add_argument("--duration", type=float, default=30.0, help="Test length in seconds")
+    parser.add_argument("--rate", type=float, help="Open loop: requests started per second")
+    parser.add_argument("--ramp", help="Open-loop stages, e.g. 50:30,50-400:120 (rate or start-end : seconds)")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds per timeline entry")
+    parser.add_argument("--max-backlog", type=int, default=10000,
+                        help="Open-loop requests allowed to wait for a worker before counting as errors")
+    parser.add_argument("--timeout", type=float, default=10.0, help="HTTP request timeout in seconds")
+    parser.add_argument("--pid", type=int, action="append",
+                        help="Measure CPU/RSS of this process and its children (repeatable; default: this process)")
+    parser.add_argument("--slo-ms", type=float, help="p95 objective for max_throughput_within_slo")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    try:
+        ramp = parse_ramp(args.ramp) if args.ramp else None
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    try:
+        questions = read_questions(args.path, args.question_field)
+        # Fail before starting the load if the file has no questions
+        first = next(questions)
+    except (OSError, ValueError) as e:
+        print(f"✗ Could not read questions: {e}")
+        sys.exit(1)
+
+    def replay():
+        yield first
+        yield from questions
+
+    if args.url:
+        target = HTTPTarget(args.url, args.threshold, args.timeout)
+    else:
+        target = MatcherTarget(args.backend, args.threshold, args.db)
+    load_test = LoadTest(
+        target, replay(), args.mode, args.concurrency, args.duration, args.rate, ramp,
+        args.interval, args.max_backlog, args.pid, args.slo_ms,
+    )
+    if ramp:
+        model = "ramp " + ", ".join(f"{start:g}-{end:g}/s for {seconds:g}s" for start, end, seconds in ramp)
+    elif args.rate:
+        model = f"open loop at {args.rate:g}/s"
+    else:
+        model = f"closed loop with {args.concurrency} users"
+    print(f"⏱  Load test: {args.url or 'in-process FAQMatcher'}, {model}, "
+          f"{args.mode} (concurrency {args.concurrency})")
+    report = load_test.run()
+
+    summary = report["summary"]
+    latency = summary["latency_ms"] or {}
+    print(f"✓ {summary['completed']:,} requests in {summary['duration_s']:.1f}s "
+          f"({summary['throughput_rps']:,.1f}/s), error rate {summary['error_rate']:.2%}")
+    if latency:
+        print(f"   Latency: p50 {latency['p50']:.2f}ms, p95 {latency['p95']:.2f}ms, "
+              f"p99 {latency['p99']:.2f}ms, max {latency['max']:.2f}ms")
+    if report["error_types"]:
+        print(f"   Errors: {', '.join(f'{name} x{count}' for name, count in report['error_types'].items())}")
+    if "max_throughput_within_slo" in summary:
+        print(f"   Max throughput with p95 <= {args.slo_ms:g}ms: {summary['max_throughput_within_slo']:,.1f}/s")
+
+    if args.output:
+        report = {
+            "environment": environment_info(),
+            "config": {
+                "path": args.path, "target": args.url or f"in-process ({args.backend})",
+                "mode": args.mode, "concurrency": args.concurrency, "duration": args.duration,
+                "rate": args.rate, "ramp": args.ramp, "interval": args.interval,
+            },
+            **report,
+        }
+        with open(args.output, "w") as f:
+            f.write(json.dumps(report, indent=2) + "\n")
+        print(f"✓ Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
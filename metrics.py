@@ -0,0 +1,291 @@
+"""
+Matcher Metrics
+Per-stage timers, similarity score histograms and match counters for
+FAQMatcher, exported as JSON or Prometheus text, plus a sampling profiler that
+can be switched on and off at runtime
+
+Stages (durations per call; a batch call counts once):
+- preprocess: whole preprocessing of a question (including query cache hits)
+- tokenize, lemmatize: the steps inside preprocessing (query cache misses only)
+- correct: typo correction of unknown terms (result cache misses only)
+- vectorize: question -> TF-IDF (or LSA) vector
+- score: similarity computation against the FAQs
+- select: top-k selection
+
+Recording is off by default. While disabled, every hook is one attribute
+check, so instrumented code runs at full speed.
+"""
+
+import bisect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+STAGES = ("preprocess", "tokenize", "lemmatize", "correct", "vectorize", "score", "select")
+
+# Histogram bucket upper bounds: stage durations (seconds) and similarity scores (0-1)
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0,
+)
+SCORE_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+# HELP text of the match counters in the Prometheus output
+COUNTER_HELP = {
+    "queries": "Questions matched",
+    "matches": "Questions answered with a FAQ",
+    "misses_below_threshold": "Questions whose best score was below the threshold",
+}
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus semantics: value <= upper bound)"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Add one observation"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """List of (upper bound, cumulative count), ending with +Inf"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def snapshot(self):
+        """Histogram as a dictionary"""
+        return {
+            "buckets": {("+Inf" if bound == float("inf") else str(bound)): count
+                        for bound, count in self.cumulative()},
+            "sum": self.sum,
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else 0.0,
+        }
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler: a background thread samples the Python stacks of all
+    other threads every interval seconds and counts them
+
+    The result is in collapsed-stack format ("file:function;...;file:function
+    count" per line), which flame graph tools read directly.
+    """
+
+    def __init__(self, interval=0.005, max_stacks=10000, max_depth=64):
+        """
+        Args:
+            interval: Seconds between samples
+            max_stacks: Maximum number of distinct stacks kept (the rest is
+                        counted under "[other]")
+            max_depth: Maximum number of frames per stack (innermost kept)
+        """
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.samples = 0
+        # Guards stacks and samples: collapsed() may run while sampling
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start sampling (no-op if already running)"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling; collected stacks are kept"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def clear(self):
+        """Drop collected stacks"""
+        with self._lock:
+            self.stacks = Counter()
+            self.samples = 0
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            sampled = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames = []
+                while frame is not None and len(frames) < self.max_depth:
+                    code = frame.f_code
+                    frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                sampled.append(";".join(reversed(frames)))
+            with self._lock:
+                for stack in sampled:
+                    if stack not in self.stacks and len(self.stacks) >= self.max_stacks:
+                        stack = "[other]"
+                    self.stacks[stack] += 1
+                self.samples += 1
+
+    def collapsed(self):
+        """Collected stacks in collapsed-stack format, most frequent first"""
+        with self._lock:
+            stacks = self.stacks.copy()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class MatcherMetrics:
+    """Thread-safe metrics registry shared by FAQMatcher, its backends and the preprocessor"""
+
+    def __init__(self, enabled=False):
+        """
+        Args:
+            enabled: Start recording immediately
+        """
+        self.enabled = enabled
+        self.profiler = SamplingProfiler()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zero all timers, histograms and counters"""
+        with self._lock:
+            self.stages = {stage: Histogram(LATENCY_BUCKETS) for stage in STAGES}
+            self.scores = Histogram(SCORE_BUCKETS)
+            self.counters = {"queries": 0, "matches": 0, "misses_below_threshold": 0}
+
+    # Recording hooks
+
+    def start(self):
+        """Start timing a stage: returns a timestamp, or None while disabled"""
+        return time.perf_counter() if self.enabled else None
+
+    def lap(self, stage, started):
+        """
+        Record the time since started under stage
+
+        Returns:
+            The current timestamp (start of the next stage), or None if
+            started is None (recording disabled)
+        """
+        if started is None:
+            return None
+        now = time.perf_counter()
+        with self._lock:
+            self.stages[stage].observe(now - started)
+        return now
+
+    def record_match(self, score, threshold):
+        """Record the best similarity of one question (None: no candidate)"""
+        with self._lock:
+            self.counters["queries"] += 1
+            if score is not None:
+                self.scores.observe(float(score))
+            if score is not None and score >= threshold:
+                self.counters["matches"] += 1
+            else:
+                self.counters["misses_below_threshold"] += 1
+
+    # Profiler
+
+    def set_profiling(self, enabled, interval=None):
+        """Switch the sampling profiler on or off at runtime"""
+        if interval is not None:
+            self.profiler.interval = interval
+        if enabled:
+            self.profiler.start()
+        else:
+            self.profiler.stop()
+
+    # Export
+
+    def snapshot(self, cache_stats=None):
+        """
+        Get all metrics as a dictionary
+
+        Args:
+            cache_stats: Optional FAQMatcher.cache_stats() to include
+        """
+        with self._lock:
+            snapshot = {
+                "enabled": self.enabled,
+                "stages_seconds": {stage: histogram.snapshot() for stage, histogram in self.stages.items()},
+                "similarity": self.scores.snapshot(),
+                "counters": dict(self.counters),
+            }
+        snapshot["profiler"] = {"running": self.profiler.running, "samples": self.profiler.samples}
+        if cache_stats is not None:
+            snapshot["caches"] = cache_stats
+        return snapshot
+
+    def prometheus(self, cache_stats=None):
+        """
+        Get all metrics in the Prometheus text exposition format
+
+        Args:
+            cache_stats: Optional FAQMatcher.cache_stats() to include
+        """
+        lines = []
+
+        def counter(name, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in samples:
+                lines.append(f"{name}{labels} {value}")
+
+        def histogram(name, help_text, histograms, label=None):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for label_value, hist in histograms:
+                prefix = f'{label}="{label_value}",' if label else ""
+                for bound, count in hist.cumulative():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{{prefix}le="{le}"}} {count}')
+                suffix = f'{{{prefix[:-1]}}}' if prefix else ""
+                lines.append(f"{name}_sum{suffix} {hist.sum!r}")
+                lines.append(f"{name}_count{suffix} {hist.count}")
+
+        with self._lock:
+            histogram("faq_matcher_stage_seconds", "Duration of matcher stages per call",
+                      self.stages.items(), label="stage")
+            histogram("faq_matcher_similarity", "Best similarity score per question",
+                      [(None, self.scores)])
+            for name, value in self.counters.items():
+                counter(f"faq_matcher_{name}_total", COUNTER_HELP[name], [("", value)])
+
+        if cache_stats is not None:
+            caches = dict(cache_stats.get("preprocessing") or {})
+            for cache in ("results", "spelling"):
+                if cache_stats.get(cache):
+                    caches[cache] = cache_stats[cache]
+            # Each family's samples follow its own HELP/TYPE lines
+            for field in ("hits", "misses"):
+                counter(f"faq_matcher_cache_{field}_total", f"Cache {field} per cache",
+                        [(f'{{cache="{cache}"}}', stats[field]) for cache, stats in caches.items()])
+        counter("faq_matcher_profiler_samples_total", "Stack samples taken by the profiler",
+                [("", self.profiler.samples)])
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry used by default
+matcher_metrics = MatcherMetrics()
@@ -0,0 +1,139 @@
+"""
+Text Preprocessing Pipeline
+Memoized, allocation-light version of the NLTK preprocessing used by FAQMatcher
+Steps: Normalize -> Tokenize (compiled regex) -> Filter (set lookup) -> Lemmatize (LRU cache)
+"""
+
+import re
+import string
+from functools import lru_cache
+
+# Regex tokenizer producing the same tokens as nltk.word_tokenize on lowercased
+# FAQ text: contractions are split ("don't" -> "do", "n't"; "you'll" -> "you",
+# "'ll"), hyphenated words and numbers stay whole ("5-7", "t-shirt", "1,000",
+# "10:00"), "cannot" becomes "can", "not", and every other punctuation character
+# is its own token.
+TOKEN_PATTERN = re.compile(r"""
+      \bcan(?=not\b)                      # "cannot" -> "can", "not"
+    | \w+(?=n't\b)                        # "do" in "don't"
+    | n't\b                               # "n't"
+    | '(?:s|m|d|ll|re|ve)\b               # "'s", "'ll", ...
+    | \+?\w+(?:(?:[-/.]|[:,](?=\d))\w+)*  # words, numbers, e-mail, 5-7, 1,000, +1
+    | \.\.\.                              # ellipsis
+    | --                                  # dash
+    | \S                                  # any other punctuation character
+""", re.VERBOSE)
+
+
+def regex_tokenize(text):
+    """
+    Tokenize text with the compiled TOKEN_PATTERN
+
+    Args:
+        text: Lowercased input text
+
+    Returns:
+        List of tokens
+    """
+    return TOKEN_PATTERN.findall(text)
+
+
+class TextPreprocessor:
+    """
+    Preprocessing pipeline with caching at two levels
+
+    - Whole queries: an LRU cache keyed on the normalized (lowercased,
+      whitespace-collapsed) text, so repeated questions skip every step
+    - Lemmas: an LRU cache in front of the lemmatizer
+
+    Stopwords and punctuation are merged into one frozenset so filtering is a
+    single set lookup per token. Stopwords may be given as a loader function,
+    called on the first query, so creating a pipeline costs nothing.
+    """
+
+    def __init__(self, stop_words, lemmatize, tokenize=regex_tokenize,
+                 lemma_cache_size=50000, query_cache_size=10000, metrics=None):
+        """
+        Initialize the pipeline
+
+        Args:
+            stop_words: Iterable of stopwords to remove, or a function returning
+                        them (called on first use)
+            lemmatize: Function mapping a token to its lemma (only called on
+                       lemma cache misses, so it may load its data lazily)
+            tokenize: Function mapping lowercased text to tokens
+                      (regex_tokenize, or nltk.word_tokenize for exact NLTK behaviour)
+            lemma_cache_size: Maximum number of cached lemmas
+            query_cache_size: Maximum number of cached preprocessed queries
+            metrics: Optional metrics.MatcherMetrics recording the tokenize
+                     and lemmatize stages
+        """
+        self._stop_words = stop_words
+        self.metrics = metrics
+        self._drop_tokens = None
+        self.tokenize = tokenize
+        self.lemmatize = lru_cache(maxsize=lemma_cache_size)(lemmatize)
+        self._process_cached = lru_cache(maxsize=query_cache_size)(self._process)
+
+    @property
+    def drop_tokens(self):
+        """Frozenset of stopwords and punctuation (loaded on first access)"""
+        if self._drop_tokens is None:
+            stop_words = self._stop_words() if callable(self._stop_words) else self._stop_words
+            self._drop_tokens = frozenset(stop_words) | frozenset(string.punctuation)
+        return self._drop_tokens
+
+    def __call__(self, text):
+        """
+        Preprocess text
+
+        Args:
+            text: Input text string
+
+        Returns:
+            Preprocessed text string (space separated lemmas)
+        """
+        return self._process_cached(' '.join(text.lower().split()))
+
+    def _process(self, text):
+        """Tokenize, filter and lemmatize already normalized text"""
+        drop_tokens = self.drop_tokens
+        lemmatize = self.lemmatize
+        metrics = self.metrics
+        started = metrics.start() if metrics is not None else None
+        tokens = self.tokenize(text)
+        if started is not None:
+            started = metrics.lap('tokenize', started)
+        processed = ' '.join([
+            lemmatize(token)
+            for token in tokens
+            if token not in drop_tokens
+        ])
+        if started is not None:
+            metrics.lap('lemmatize', started)
+        return processed
+
+    def process_document(self, text):
+        """
+        Preprocess document text (e.g. FAQ answers) without the query cache,
+        so bulk text doesn't evict cached questions
+
+        Args:
+            text: Input text string
+
+        Returns:
+            Preprocessed text string (space separated lemmas)
+        """
+        return self._process(' '.join(text.lower().split()))
+
+    def cache_info(self):
+        """Get hit/miss statistics of the lemma and query caches"""
+        return {
+            'lemmas': self.lemmatize.cache_info()._asdict(),
+            'queries': self._process_cached.cache_info()._asdict(),
+        }
+
+    def clear_cache(self):
+        """Empty both caches"""
+        self.lemmatize.cache_clear()
+        self._process_cached.cache_clear()
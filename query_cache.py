@@ -0,0 +1,85 @@
+"""
+Query Result Cache
+Bounded LRU cache with optional TTL and exportable hit/miss counters, used by
+FAQMatcher to skip scoring for repeated questions
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+# Returned by QueryCache.get() when the key is not cached
+MISSING = object()
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache with optional time-to-live
+
+    When max_size entries are stored, the least recently used entry is
+    evicted. Entries older than ttl seconds are treated as misses.
+    """
+
+    def __init__(self, max_size=10000, ttl=None, clock=time.monotonic):
+        """
+        Args:
+            max_size: Maximum number of entries
+            ttl: Maximum entry age in seconds (None: entries never expire)
+            clock: Time source (seconds)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Get a cached value, or MISSING"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            value, stored_at = entry
+            if self.ttl is not None and self.clock() - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entry if full"""
+        with self._lock:
+            self._entries[key] = (value, self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Get counters as a dictionary (e.g. for metrics export)"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+        }
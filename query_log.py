@@ -0,0 +1,190 @@
+"""
+Query Log
+Non-blocking persistence of every matched question for analytics
+
+log() only puts a tuple on a bounded in-memory queue (about a microsecond);
+a background writer thread drains the queue and inserts rows into the
+query_log table in batches, one transaction per batch. When the queue is
+full the backpressure policy decides what happens:
+- 'drop':  discard the new entry and count it (callers never wait; default)
+- 'block': wait up to block_timeout seconds for space, then drop
+
+The log lives in its own SQLite file (default: faqs.log.db next to faqs.db)
+so analytics writes never contend with FAQ edits. Several processes can log
+to the same file (WAL mode, busy timeout).
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+POLICIES = ("drop", "block")
+
+CREATE_LOG_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS query_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp REAL NOT NULL,
+        question TEXT NOT NULL,
+        match_id INTEGER,
+        score REAL,
+        latency_ms REAL,
+        category TEXT,
+        source TEXT
+    )
+'''
+INSERT_LOG_SQL = '''
+    INSERT INTO query_log (timestamp, question, match_id, score, latency_ms, category, source)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Queue item that stops the writer thread
+_STOP = object()
+
+
+def default_log_path(db_path="faqs.db"):
+    """Get the query log database that belongs to a FAQ database (faqs.db -> faqs.log.db)"""
+    return os.path.splitext(db_path)[0] + ".log.db"
+
+
+class QueryLogger:
+    """Bounded queue plus a background thread writing batched inserts"""
+
+    def __init__(self, path=None, source=None, queue_size=10000, batch_size=500,
+                 flush_interval=0.5, policy="drop", block_timeout=0.01):
+        """
+        Args:
+            path: SQLite file of the log (default: default_log_path())
+            source: Label stored with every entry (e.g. 'app' or 'service')
+            queue_size: Maximum number of entries waiting to be written
+            batch_size: Maximum number of entries per insert transaction
+            flush_interval: Seconds the writer waits to fill a batch before
+                            writing what it has
+            policy: Backpressure policy when the queue is full ('drop' or 'block')
+            block_timeout: Seconds to wait for space with the 'block' policy
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}'. Choose from: {', '.join(POLICIES)}")
+        self.path = path or default_log_path()
+        self.source = source
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_error = None
+        self._queue = queue.Queue(queue_size)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="query-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, question, match_id, score, latency_ms, category=None):
+        """
+        Queue one entry without blocking (except with the 'block' policy)
+
+        Args:
+            question: Question as asked
+            match_id: Id of the returned FAQ, or None if nothing matched
+            score: Best similarity (0-1), also when below the threshold, or None
+            latency_ms: Time the matcher call took
+            category: Category the question was restricted to, if any
+
+        Returns:
+            True if queued, False if dropped
+        """
+        if self._closed:
+            self.dropped += 1
+            return False
+        entry = (time.time(), question, match_id, score, latency_ms, category, self.source)
+        try:
+            if self.policy == "block":
+                self._queue.put(entry, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self):
+        """Block until every queued entry is written"""
+        self._queue.join()
+
+    def close(self):
+        """Write what is queued and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self):
+        """Get queue and writer counters"""
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+    def _run(self):
+        """Writer thread: collect up to batch_size entries, insert them, repeat"""
+        conn = None
+        try:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(CREATE_LOG_TABLE_SQL)
+            conn.commit()
+        except sqlite3.Error as error:
+            # Keep draining the queue (batches count as errors) so callers never hang
+            self.errors += 1
+            self.last_error = str(error)
+            conn = None
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                        self._queue.task_done()
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                if batch:
+                    self._write(conn, batch)
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _write(self, conn, batch):
+        """Insert a batch in one transaction (a failed batch is counted and dropped)"""
+        try:
+            if conn is None:
+                raise sqlite3.OperationalError(f"query log {self.path} is not open")
+            with conn:
+                conn.executemany(INSERT_LOG_SQL, batch)
+            self.written += len(batch)
+            self.batches += 1
+        except sqlite3.Error as error:
+            self.errors += 1
+            self.last_error = str(error)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
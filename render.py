@@ -0,0 +1,432 @@
+"""
+Dashboard Rendering
+HTML fragments for app.py, built once and shared by every rerun and session
+
+- Static fragments (page styles, the left column, headers) are built at import
+- Answer HTML is cached per FAQ content (id, question, answer, category) and
+  escaped once, so answer edits that leave the corpus version alone show up
+- FAQ and category stats are rebuilt only when the corpus version changes
+
+A page of chat turns is emitted as one markdown element instead of two per
+turn. User input is always escaped (html.escape) before it is embedded.
+"""
+
+import html
+import re
+import threading
+from metrics import Histogram, LATENCY_BUCKETS
+from query_cache import QueryCache, MISSING
+
+PAGE_STYLE = """
+<style>
+@import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
+
+* {
+    font-family: 'Inter', sans-serif;
+}
+
+.stApp {
+    background: #1E3A8A;
+}
+
+.main .block-container {
+    padding: 0;
+    max-width: 100%;
+}
+
+/* Left section */
+.left-content {
+    background: linear-gradient(rgba(30, 58, 138, 0.85), rgba(30, 58, 138, 0.85)), 
+                url('https://images.unsplash.com/photo-1441986300917-64674bd600d8?w=1200') center/cover;
+    min-height: 100vh;
+    padding: 3rem;
+    color: white;
+}
+
+.left-content h1 {
+    font-size: 3rem;
+    font-weight: 700;
+    line-height: 1.2;
+    margin-bottom: 1.5rem;
+    color: white;
+}
+
+.left-content p {
+    font-size: 1.1rem;
+    line-height: 1.6;
+    color: rgba(255, 255, 255, 0.9);
+    margin-bottom: 3rem;
+}
+
+.info-block {
+    margin-bottom: 2rem;
+}
+
+.info-block h3 {
+    font-size: 1.2rem;
+    font-weight: 600;
+    margin-bottom: 0.5rem;
+    color: white;
+}
+
+.info-block p {
+    font-size: 0.95rem;
+    color: rgba(255, 255, 255, 0.8);
+    line-height: 1.5;
+    margin-bottom: 0;
+}
+
+/* Right section */
+.right-content {
+    background: #F8FAFC;
+    min-height: 100vh;
+    padding: 2.5rem;
+}
+
+.right-content h2 {
+    font-size: 1.8rem;
+    font-weight: 700;
+    color: #1E3A8A;
+    margin-bottom: 0.5rem;
+}
+
+.right-content .subheader {
+    font-size: 0.95rem;
+    color: #64748B;
+    margin-bottom: 2rem;
+}
+
+/* Stats */
+.stats-row {
+    display: grid;
+    grid-template-columns: repeat(3, 1fr);
+    gap: 1rem;
+}
+
+.stat-box {
+    background: white;
+    padding: 1.2rem;
+    border-radius: 12px;
+    text-align: center;
+    box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
+    margin-bottom: 1rem;
+    border: 1px solid #E2E8F0;
+}
+
+.stat-number {
+    font-size: 2rem;
+    font-weight: 700;
+    color: #1E3A8A;
+}
+
+.stat-label {
+    color: #64748B;
+    font-size: 0.85rem;
+    margin-top: 4px;
+    font-weight: 500;
+}
+
+/* Chat */
+.chat-container {
+    background: white;
+    border-radius: 12px;
+    padding: 1.5rem;
+    box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
+    margin-bottom: 1.5rem;
+    max-height: 450px;
+    overflow-y: auto;
+    border: 1px solid #E2E8F0;
+}
+
+.user-message {
+    background: #FCD34D;
+    color: #1E3A8A;
+    padding: 12px 16px;
+    border-radius: 12px 12px 2px 12px;
+    margin: 10px 0;
+    max-width: 80%;
+    margin-left: auto;
+    font-size: 0.95rem;
+    font-weight: 500;
+}
+
+.bot-answer {
+    background: #EFF6FF;
+    color: #1E293B;
+    padding: 16px;
+    border-radius: 12px;
+    margin: 10px 0;
+    border-left: 4px solid #1E3A8A;
+}
+
+.bot-answer strong {
+    color: #1E3A8A;
+    display: block;
+    margin-bottom: 8px;
+    font-size: 1rem;
+    font-weight: 600;
+}
+
+.bot-message {
+    background: #FEF3C7;
+    color: #92400E;
+    padding: 14px;
+    border-radius: 12px;
+    margin: 10px 0;
+    border-left: 4px solid #FCD34D;
+    font-size: 0.9rem;
+}
+
+.info-box {
+    background: #DBEAFE;
+    padding: 14px 16px;
+    border-radius: 12px;
+    margin: 10px 0;
+    color: #1E40AF;
+    font-weight: 500;
+    border-left: 4px solid #3B82F6;
+    font-size: 0.9rem;
+}
+
+.category-badge {
+    display: inline-block;
+    background: #1E3A8A;
+    color: white;
+    padding: 6px 14px;
+    border-radius: 20px;
+    font-size: 0.8rem;
+    font-weight: 600;
+    margin: 4px 4px 4px 0;
+}
+
+.similarity-score {
+    background: #FCD34D;
+    color: #1E3A8A;
+    padding: 6px 14px;
+    border-radius: 20px;
+    display: inline-block;
+    margin-top: 8px;
+    font-size: 0.8rem;
+    font-weight: 600;
+}
+
+/* Input */
+.stTextInput > div > div > input {
+    border-radius: 10px;
+    border: 2px solid #CBD5E1;
+    padding: 12px 16px;
+    font-size: 0.95rem;
+    background: white;
+}
+
+.stTextInput > div > div > input:focus {
+    border-color: #1E3A8A;
+    box-shadow: 0 0 0 3px rgba(30, 58, 138, 0.1);
+    outline: none;
+}
+
+/* Button */
+.stButton > button {
+    background: #FCD34D;
+    color: #1E3A8A;
+    border-radius: 10px;
+    padding: 12px 24px;
+    font-weight: 600;
+    border: none;
+    box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
+    transition: all 0.2s ease;
+}
+
+.stButton > button:hover {
+    background: #FBBF24;
+    transform: translateY(-1px);
+    box-shadow: 0 4px 8px rgba(0, 0, 0, 0.15);
+}
+
+/* Scrollbar */
+.chat-container::-webkit-scrollbar {
+    width: 6px;
+}
+
+.chat-container::-webkit-scrollbar-track {
+    background: #F1F5F9;
+    border-radius: 10px;
+}
+
+.chat-container::-webkit-scrollbar-thumb {
+    background: #CBD5E1;
+    border-radius: 10px;
+}
+
+/* Hide Streamlit elements */
+#MainMenu {visibility: hidden;}
+footer {visibility: hidden;}
+header {visibility: hidden;}
+.stDeployButton {visibility: hidden;}
+
+[data-testid="column"] {
+    padding: 0 !important;
+}
+</style>
+"""
+
+LEFT_COLUMN_HTML = """
+<div class="left-content">
+    <h1>You Have Questions,<br>We Have Answers</h1>
+    <p>Discover our premium clothing collection designed with care. Get instant answers to all your questions about sizing, shipping, returns, and more.</p>
+
+    <div style="margin-top: 4rem;">
+        <div class="info-block">
+            <h3>📍 About Us</h3>
+            <p>Premium Fashion Boutique<br>Delivering quality since 2020<br>Worldwide shipping available</p>
+        </div>
+
+        <div class="info-block">
+            <h3>📧 Contact</h3>
+            <p>Email: support@clothingbrand.com<br>Phone: +1 (555) 123-4567<br>Hours: Mon-Sun | 9:00 AM - 10:00 PM</p>
+        </div>
+
+        <div class="info-block">
+            <h3>🌐 Follow Us</h3>
+            <p>Instagram | Facebook | Twitter<br>@fashionboutique</p>
+        </div>
+    </div>
+</div>
+"""
+
+HEADER_HTML = (
+    '<h2>FAQ Assistant</h2>'
+    '<p class="subheader">Our team is ready to assist you with every detail, big or small.</p>'
+)
+EMPTY_CHAT_HTML = (
+    '<div class="info-box">💡 <strong>Try asking:</strong> "What sizes do you offer?", '
+    '"How long does shipping take?", "What is your return policy?"</div>'
+)
+NO_MATCH_HTML = (
+    '<div class="bot-message">😕 I couldn\'t find a good match. '
+    'Please try rephrasing or contact support@clothingbrand.com</div>'
+)
+CATEGORIES_TITLE_HTML = (
+    '<br><p style="font-size: 0.9rem; font-weight: 600; color: #1E3A8A; '
+    'margin-bottom: 0.5rem;">📂 Categories</p>'
+)
+
+
+def minify_css(css):
+    """Drop comments and insignificant whitespace from a stylesheet"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};])\s*", r"\1", css).strip()
+
+
+# Sent on every rerun, so it is minified once here
+STYLE_HTML = minify_css(PAGE_STYLE)
+
+
+class DashboardRenderer:
+    """
+    Cached HTML for the parts of the dashboard that depend on the FAQs
+
+    One renderer is shared by all sessions of a process. The matcher's
+    version is the corpus version: when it changes, cached fragments are
+    no longer used.
+    """
+
+    def __init__(self, matcher, answer_cache_size=5000):
+        """
+        Args:
+            matcher: FAQMatcher whose FAQs are shown
+            answer_cache_size: Maximum number of cached answer fragments
+        """
+        self.matcher = matcher
+        self.answers = QueryCache(max_size=answer_cache_size)
+        # (corpus version, stats fragment with an {asked} slot, categories fragment)
+        self._corpus = None
+        self._lock = threading.Lock()
+        self.reruns = Histogram(LATENCY_BUCKETS)
+
+    def stats_html(self, asked):
+        """Stats boxes (FAQs, categories and the questions asked in this session)"""
+        return self._corpus_html()[0].replace("{asked}", str(asked))
+
+    def categories_html(self):
+        """Category badges with their title"""
+        return self._corpus_html()[1]
+
+    def answer_html(self, match):
+        """
+        Answer bubble content of a match, without the per-question score badge
+
+        Args:
+            match: FAQMatcher result dictionary
+
+        Returns:
+            HTML fragment, cached per FAQ content
+        """
+        # Answers loaded through an answer_loader change without a new corpus
+        # version, so the content itself is the key
+        key = (match['id'], match['question'], match['answer'], match['category'])
+        fragment = self.answers.get(key)
+        if fragment is MISSING:
+            fragment = (
+                f'<strong>📌 {html.escape(match["question"])}</strong>'
+                f'{html.escape(match["answer"] or "")}<br><br>'
+                f'<span class="category-badge">{html.escape(match["category"] or "")}</span>'
+            )
+            self.answers.put(key, fragment)
+        return fragment
+
+    def turn_html(self, turn):
+        """Question and answer of one conversation.Turn"""
+        question = f'<div class="user-message">❓ {html.escape(turn.question)}</div>'
+        if not turn.match:
+            return question + NO_MATCH_HTML
+        return (
+            f'{question}<div class="bot-answer">{self.answer_html(turn.match)}'
+            f'<span class="similarity-score">🎯 {turn.match["similarity_score"]}% Match</span></div>'
+        )
+
+    def chat_html(self, turns):
+        """
+        Chat box with a page of turns as one fragment
+
+        Args:
+            turns: conversation.Turn objects in chronological order
+
+        Returns:
+            HTML of the chat container
+        """
+        body = "".join(self.turn_html(turn) for turn in turns) if turns else EMPTY_CHAT_HTML
+        return f'<div class="chat-container">{body}</div>'
+
+    def record_rerun(self, seconds):
+        """Add the server-side duration of one script run"""
+        with self._lock:
+            self.reruns.observe(seconds)
+
+    def stats(self):
+        """Get rerun timings and answer cache counters"""
+        return {"reruns_seconds": self.reruns.snapshot(), "answers": self.answers.stats()}
+
+    def _corpus_html(self):
+        """Get the (stats, categories) fragments, rebuilt when the corpus version changed"""
+        corpus = self._corpus
+        version = self.matcher.version
+        if corpus is None or corpus[0] != version:
+            categories = self.matcher.get_all_categories()
+            boxes = "".join(
+                f'<div class="stat-box"><div class="stat-number">{number}</div>'
+                f'<div class="stat-label">{label}</div></div>'
+                for number, label in (
+                    (len(self.matcher.faqs), "FAQs"),
+                    (len(categories), "Categories"),
+                    ("{asked}", "Asked"),
+                )
+            )
+            badges = "".join(
+                f'<span class="category-badge">{html.escape(category)}</span>' for category in categories
+            )
+            # Replaced as one tuple, so concurrent sessions never see a mix of versions
+            corpus = (version, f'<div class="stats-row">{boxes}</div>', CATEGORIES_TITLE_HTML + badges)
+            self._corpus = corpus
+        return corpus[1], corpus[2]
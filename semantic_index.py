@@ -0,0 +1,369 @@
+"""
+Semantic Index
+Dense LSA vectors for FAQ questions with an IVF approximate nearest-neighbour
+index, used by the 'semantic' and 'hybrid' backends (see backends.py)
+
+- LSA: TruncatedSVD over the matcher's TF-IDF space, fitted offline on FAQ
+  questions and answers, so terms that co-occur in FAQs end up close together
+  even if a user question shares no term with the FAQ question
+- Vectors: L2-normalized float32, memory-mapped from the model directory
+- IVF: spherical k-means centroids partition the vectors into lists; a query
+  only scans the lists whose centroids are closest to it
+
+Layout of the model directory (default: faqs.semantic next to faqs.index,
+published like the index as a symlink to a versioned directory):
+- meta.json:       model version, corpus signature and shapes
+- projection.npy:  terms x dimensions (float32), maps TF-IDF vectors to LSA space
+- centroids.npy, list_indptr.npy, list_ids.npy: IVF lists (FAQ positions
+                   grouped by nearest centroid)
+- vectors.npy:     FAQs x dimensions (float32), one normalized vector per FAQ,
+                   stored in list order so each probed list is one contiguous
+                   block
+
+Usage:
+    python semantic_index.py    # fit and save the model for faqs.db
+"""
+
+import json
+import os
+import shutil
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+from backends import vectorize
+from index_store import make_tmp_dir, publish_dir
+
+# Bump whenever the model or the on-disk layout changes
+SEMANTIC_VERSION = 1
+
+META_FILE = "meta.json"
+ARRAY_NAMES = ("projection", "centroids", "list_indptr", "list_ids", "vectors")
+
+# LSA dimensions (capped by the corpus size)
+DEFAULT_DIMENSIONS = 128
+# Corpora smaller than this are searched exhaustively (one IVF list)
+MIN_IVF_FAQS = 4096
+# Rows per block when assigning vectors to centroids (bounds temporary memory)
+ASSIGN_BLOCK = 65536
+
+
+def default_semantic_dir(index_dir):
+    """Get the semantic model directory that belongs to an index (faqs.index -> faqs.semantic)"""
+    return os.path.splitext(index_dir)[0] + ".semantic"
+
+
+def normalize_rows(vectors):
+    """L2-normalize the rows of a dense matrix (zero rows stay zero) as float32"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return (vectors / norms).astype(np.float32)
+
+
+def assign_lists(vectors, centroids):
+    """Position of the most similar centroid for every vector"""
+    assignment = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), ASSIGN_BLOCK):
+        block = vectors[start:start + ASSIGN_BLOCK]
+        assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignment
+
+
+def spherical_kmeans(vectors, n_clusters, iterations=10, seed=0):
+    """
+    Cluster normalized vectors by cosine similarity
+
+    Trained on a sample of at most 64 vectors per cluster.
+
+    Returns:
+        Normalized centroids (n_clusters x dimensions)
+    """
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), n_clusters * 64)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+    centroids = sample[rng.choice(sample_size, n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = assign_lists(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        filled = np.bincount(assignment, minlength=n_clusters) > 0
+        # Empty clusters keep their previous centroid
+        centroids[filled] = normalize_rows(sums[filled])
+    return centroids
+
+
+class IVFIndex:
+    """Inverted file index: FAQ vectors grouped by their nearest centroid"""
+
+    def __init__(self, centroids, list_indptr, list_ids, vectors):
+        """
+        Args:
+            centroids: Normalized centroids (lists x dimensions), one per non-empty list
+            list_indptr: List l holds rows list_indptr[l]:list_indptr[l + 1]
+            list_ids: FAQ position of each row, sorted within each list
+            vectors: Normalized FAQ vectors in list order
+        """
+        self.centroids = centroids
+        self.list_indptr = list_indptr
+        self.list_ids = list_ids
+        self.vectors = vectors
+        self._vector_rows = None
+
+    @classmethod
+    def build(cls, vectors, centroids=None):
+        """
+        Build the lists for vectors
+
+        Args:
+            vectors: Normalized FAQ vectors
+            centroids: Existing centroids to assign to (default: cluster
+                       about sqrt(n) lists, or one list for small corpora)
+        """
+        if centroids is None:
+            if len(vectors) < MIN_IVF_FAQS:
+                centroids = normalize_rows(np.ones((1, vectors.shape[1])))
+            else:
+                centroids = spherical_kmeans(vectors, int(np.sqrt(len(vectors))))
+        assignment = assign_lists(vectors, centroids)
+        sizes = np.bincount(assignment, minlength=len(centroids))
+
+        # Drop empty lists so every probed list yields candidates
+        keep = sizes > 0
+        remap = np.cumsum(keep) - 1
+        list_indptr = np.zeros(keep.sum() + 1, dtype=np.int64)
+        np.cumsum(sizes[keep], out=list_indptr[1:])
+        list_ids = np.argsort(remap[assignment], kind="stable").astype(np.int64)
+        return cls(np.ascontiguousarray(centroids[keep]), list_indptr, list_ids, vectors[list_ids])
+
+    def search(self, query, nprobe):
+        """
+        Cosine similarity of query with the FAQs in the nprobe closest lists
+
+        Returns:
+            Tuple (sorted FAQ positions, scores)
+        """
+        n_lists = len(self.centroids)
+        if n_lists == 1 or nprobe >= n_lists:
+            probe = range(n_lists)
+        else:
+            probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        blocks = [(self.list_indptr[l], self.list_indptr[l + 1]) for l in probe]
+        ids = np.concatenate([self.list_ids[start:end] for start, end in blocks])
+        scores = np.concatenate([self.vectors[start:end] @ query for start, end in blocks])
+        # Position order, so ties are broken by the lower FAQ position
+        order = np.argsort(ids)
+        return ids[order], scores[order]
+
+    def score_rows(self, query, positions):
+        """Cosine similarity of query with the FAQs at the given positions"""
+        if self._vector_rows is None:
+            # Row of each FAQ position in the list-ordered vectors
+            vector_rows = np.empty(len(self.list_ids), dtype=np.int64)
+            vector_rows[self.list_ids] = np.arange(len(self.list_ids))
+            self._vector_rows = vector_rows
+        return self.vectors[self._vector_rows[positions]] @ query
+
+
+class SemanticModel:
+    """LSA projection and IVF index over the FAQ vectors"""
+
+    def __init__(self, projection, ivf):
+        """
+        Args:
+            projection: terms x dimensions matrix mapping TF-IDF vectors to LSA space
+            ivf: IVFIndex over the normalized FAQ vectors
+        """
+        self.projection = projection
+        self.ivf = ivf
+
+    @classmethod
+    def fit(cls, matcher, dimensions=DEFAULT_DIMENSIONS, use_answers=True):
+        """
+        Fit the LSA model on the matcher's TF-IDF matrix
+
+        Args:
+            matcher: Fitted FAQMatcher
+            dimensions: Maximum number of LSA dimensions
+            use_answers: Also fit on the answers (vectorized with the question
+                         vocabulary), which adds term co-occurrences the short
+                         questions alone don't have
+
+        Returns:
+            SemanticModel
+        """
+        from sklearn.decomposition import TruncatedSVD
+
+        matcher._refresh()
+        tfidf = matcher.tfidf_matrix
+        training = tfidf
+        if use_answers:
+            idf = np.asarray(matcher.idf, dtype=np.float64)
+            columns, weights, indptr = [], [], [0]
+            for answer in matcher.answers:
+                answer_columns, answer_weights = vectorize(
+                    matcher.preprocess_document(answer), matcher.vocabulary, idf
+                )
+                columns.append(answer_columns)
+                weights.append(answer_weights)
+                indptr.append(indptr[-1] + len(answer_columns))
+            answers = csr_matrix(
+                (np.concatenate(weights or [np.empty(0)]),
+                 np.concatenate(columns or [np.empty(0, dtype=np.int64)]), indptr),
+                shape=tfidf.shape,
+            )
+            training = vstack([tfidf, answers], format="csr")
+
+        n_components = max(1, min(dimensions, min(training.shape) - 1))
+        svd = TruncatedSVD(n_components=n_components, random_state=0)
+        svd.fit(training)
+        projection = np.ascontiguousarray(svd.components_.T, dtype=np.float32)
+        return cls(projection, IVFIndex.build(normalize_rows(tfidf @ projection)))
+
+    def refresh(self, matcher):
+        """
+        Fold the matcher's current TF-IDF rows into the existing LSA space
+
+        Terms added since fitting have no projection and are ignored; the
+        IVF centroids are kept and the lists rebuilt.
+        """
+        n_terms = matcher.tfidf_matrix.shape[1]
+        if n_terms > len(self.projection):
+            padding = np.zeros((n_terms - len(self.projection), self.projection.shape[1]), dtype=np.float32)
+            self.projection = np.vstack([self.projection, padding])
+        vectors = normalize_rows(matcher.tfidf_matrix @ self.projection)
+        self.ivf = IVFIndex.build(vectors, self.ivf.centroids)
+
+    def embed(self, columns, weights):
+        """Normalized LSA vector of a TF-IDF vector given as (columns, weights)"""
+        vector = weights.astype(np.float32) @ self.projection[columns]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def search(self, query, nprobe):
+        """
+        Cosine similarity of query with the FAQs in the nprobe closest IVF lists
+
+        Returns:
+            Tuple (sorted FAQ positions, scores clipped to 0-1)
+        """
+        candidates, scores = self.ivf.search(query, nprobe)
+        return candidates, np.clip(scores, 0.0, 1.0).astype(np.float64)
+
+    def score_rows(self, query, positions):
+        """Exact cosine similarity (clipped to 0-1) of query with the FAQs at positions"""
+        return np.clip(self.ivf.score_rows(query, positions), 0.0, 1.0).astype(np.float64)
+
+    def save(self, model_dir, signature):
+        """
+        Write the model to model_dir (published atomically)
+
+        Args:
+            model_dir: Target directory
+            signature: index_store.corpus_signature() of the FAQs the model was fitted on
+
+        Returns:
+            True if the model was published, False if publishing failed
+            because another process was saving a model at the same time
+        """
+        arrays = {
+            "projection": self.projection,
+            "centroids": self.ivf.centroids,
+            "list_indptr": self.ivf.list_indptr,
+            "list_ids": self.ivf.list_ids,
+            "vectors": self.ivf.vectors,
+        }
+        meta = {
+            "version": SEMANTIC_VERSION,
+            "signature": signature,
+            "n_faqs": len(self.ivf.vectors),
+            "n_terms": len(self.projection),
+            "dimensions": self.projection.shape[1],
+        }
+
+        tmp_dir = make_tmp_dir(model_dir)
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+        with open(os.path.join(tmp_dir, META_FILE), "w") as f:
+            json.dump(meta, f)
+
+        try:
+            publish_dir(tmp_dir, model_dir)
+        except OSError:
+            # Lost a race with another process publishing (e.g. migrating
+            # a plain model directory at the same moment)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+        return True
+
+    @classmethod
+    def load(cls, model_dir, signature):
+        """
+        Memory-map a saved model
+
+        Returns:
+            SemanticModel, or None if the model is missing, from another
+            SEMANTIC_VERSION or fitted on other FAQs
+        """
+        # Resolve the symlink once so meta and arrays come from one version
+        model_dir = os.path.realpath(model_dir)
+        try:
+            with open(os.path.join(model_dir, META_FILE)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != SEMANTIC_VERSION or meta.get("signature") != signature:
+            return None
+        try:
+            arrays = {
+                name: np.load(os.path.join(model_dir, f"{name}.npy"), mmap_mode="r")
+                for name in ARRAY_NAMES
+            }
+        except (OSError, ValueError):
+            return None
+        ivf = IVFIndex(arrays["centroids"], arrays["list_indptr"], arrays["list_ids"], arrays["vectors"])
+        return cls(arrays["projection"], ivf)
+
+
+def load_or_fit(matcher):
+    """
+    Get the semantic model for a matcher
+
+    The persisted model next to the matcher's index is used when it was
+    fitted on the same FAQs; otherwise the model is fitted (and saved when
+    the matcher has an index directory).
+    """
+    model_dir = default_semantic_dir(matcher.index_dir) if matcher.index_dir else None
+    signature = matcher.signature
+    if model_dir and signature:
+        model = SemanticModel.load(model_dir, signature)
+        if model is not None:
+            return model
+    model = SemanticModel.fit(matcher)
+    if model_dir and signature and not model.save(model_dir, signature):
+        # Another process saved a model concurrently: share its memory maps
+        return SemanticModel.load(model_dir, signature) or model
+    return model
+
+
+def build_semantic_index():
+    """
+    Fit and save the semantic model for the FAQ database
+
+    Returns:
+        Path of the model directory
+    """
+    from init_db import DB_PATH, get_all_faqs
+    from faq_matcher import FAQMatcher
+    from index_store import default_index_dir
+
+    index_dir = default_index_dir(DB_PATH)
+    matcher = FAQMatcher(get_all_faqs(), index_dir=index_dir)
+    model_dir = default_semantic_dir(index_dir)
+    SemanticModel.fit(matcher).save(model_dir, matcher.signature)
+    return model_dir
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    path = build_semantic_index()
+    print(f"✓ Semantic index written to {os.path.abspath(path)} in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,288 @@
+"""
+Sharded FAQ Matcher
+One FAQ database and one FAQMatcher per tenant (brand), so a question for a
+brand only scores that brand's FAQs
+
+Shards are separate SQLite files next to faqs.db (faqs.<tenant>.db, filled
+with e.g. `python faq_import.py acme.jsonl --tenant acme`), each with its own
+persisted index (faqs.<tenant>.index/). A shard's matcher is loaded on first
+use and kept in an LRU of at most max_loaded shards, so memory is bounded by
+the number of active tenants rather than the total. Questions without a
+tenant are scattered to all shards in a thread pool and the per-shard top-k
+lists are merged. Shards that aren't loaded then are opened just for that
+question and closed afterwards, without entering the LRU, so cross-tenant
+questions never evict the shards of active tenants.
+"""
+
+import glob
+import heapq
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Tenant names become part of file names
+TENANT_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+# Names that belong to other files next to faqs.db (faqs.log.db)
+RESERVED_TENANTS = ("log",)
+
+
+def shard_db_path(tenant, db_path="faqs.db"):
+    """
+    Get the database file of a tenant (faqs.db -> faqs.<tenant>.db)
+
+    Args:
+        tenant: Tenant name (letters, digits, '_' and '-')
+        db_path: Main FAQ database the shards are stored next to
+
+    Returns:
+        Path of the tenant's database
+    """
+    if not TENANT_PATTERN.match(tenant) or tenant in RESERVED_TENANTS:
+        raise ValueError(f"Invalid tenant name '{tenant}'")
+    root, extension = os.path.splitext(db_path)
+    return f"{root}.{tenant}{extension}"
+
+
+def discover_tenants(db_path="faqs.db"):
+    """Get the sorted names of the tenants with a database next to db_path"""
+    root, extension = os.path.splitext(db_path)
+    prefix = os.path.basename(root) + "."
+    tenants = []
+    for path in glob.glob(f"{glob.escape(root)}.*{extension}"):
+        tenant = os.path.basename(path)[len(prefix):-len(extension) or None]
+        if TENANT_PATTERN.match(tenant) and tenant not in RESERVED_TENANTS:
+            tenants.append(tenant)
+    return sorted(tenants)
+
+
+class Shard:
+    """A tenant's repository and loaded matcher"""
+
+    def __init__(self, tenant, repository, matcher):
+        self.tenant = tenant
+        self.repository = repository
+        self.matcher = matcher
+
+
+class ShardedMatcher:
+    """
+    Lazily loaded per-tenant FAQMatchers behind one matching interface
+
+    Results are FAQMatcher result dictionaries with an added 'tenant'; FAQ
+    ids are only unique within a tenant.
+    """
+
+    def __init__(self, tenants=None, db_path="faqs.db", max_loaded=8, workers=4,
+                 backend="cosine", **matcher_options):
+        """
+        Args:
+            tenants: Tenant names (default: discover_tenants(db_path))
+            db_path: Main FAQ database the shards are stored next to
+            max_loaded: Maximum number of shards kept loaded (least recently
+                        used ones are unloaded first)
+            workers: Threads scoring shards in parallel for cross-tenant questions
+            backend: Scoring backend of every shard
+            **matcher_options: Passed to every shard's FAQMatcher (e.g.
+                               cache_size, query_log)
+        """
+        self.db_path = db_path
+        self.tenants = list(tenants) if tenants is not None else discover_tenants(db_path)
+        for tenant in self.tenants:
+            shard_db_path(tenant, db_path)  # Validates the name
+        self.max_loaded = max_loaded
+        self.backend = backend
+        self.matcher_options = matcher_options
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="faq-shard")
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+        # One lock per tenant, so a shard is loaded once while others load in parallel
+        self._load_locks = {tenant: threading.Lock() for tenant in self.tenants}
+        self.loads = 0
+        self.evictions = 0
+        # Shards opened for one cross-tenant question without entering the LRU
+        self.temporary_loads = 0
+
+    def find_best_match(self, user_question, threshold=0.3, tenant=None, category=None):
+        """
+        Find the best matching FAQ of a tenant, or of all tenants
+
+        Args:
+            user_question: User's question
+            threshold: Minimum similarity score (0-1)
+            tenant: Only match this tenant's FAQs (None: all tenants)
+            category: Only match FAQs of this category (case-insensitive)
+
+        Returns:
+            Result dictionary with 'tenant', or None if no match is found
+        """
+        matches = self.find_best_matches([user_question], threshold, 1, tenant=tenant, category=category)[0]
+        return matches[0] if matches else None
+
+    def find_best_matches(self, questions, threshold=0.3, top_k=1, tenant=None, category=None):
+        """
+        Find the top_k matching FAQs for several questions
+
+        Without a tenant every shard scores the questions in the thread pool
+        (scatter) and the per-shard results are merged by score (gather).
+        When all tenants fit in max_loaded they are loaded into the LRU as
+        usual; otherwise shards that aren't loaded are opened temporarily,
+        so the loaded ones stay loaded.
+
+        Args:
+            questions: List of user questions
+            threshold: Minimum similarity score (0-1)
+            top_k: Maximum number of matches per question
+            tenant: Only match this tenant's FAQs (None: all tenants)
+            category: Only match FAQs of this category (case-insensitive)
+
+        Returns:
+            List (one entry per question) of result lists, best match first
+        """
+        questions = list(questions)
+        if tenant is not None:
+            return self._match_shard(tenant, questions, threshold, top_k, category)
+
+        # Loading every tenant into the LRU would evict shards on every question
+        temporary = len(self.tenants) > self.max_loaded
+        per_shard = self.executor.map(
+            lambda name: self._match_shard(name, questions, threshold, top_k, category, temporary),
+            self.tenants,
+        )
+        merged = [[] for _ in questions]
+        for shard_results in per_shard:
+            for matches, results in zip(merged, shard_results):
+                matches.extend(results)
+        return [
+            heapq.nlargest(top_k, matches, key=lambda result: result['similarity_score'])
+            for matches in merged
+        ]
+
+    def get_all_categories(self, tenant):
+        """Get the FAQ categories of a tenant"""
+        return self.shard(tenant).matcher.get_all_categories()
+
+    def shard(self, tenant):
+        """
+        Get a tenant's shard, loading it (and unloading the least recently
+        used one) if needed, with FAQ edits since the last use applied
+
+        Args:
+            tenant: Tenant name
+
+        Returns:
+            Shard
+        """
+        if tenant not in self._load_locks:
+            raise KeyError(f"Unknown tenant '{tenant}'")
+        with self._lock:
+            shard = self._loaded.get(tenant)
+            if shard is not None:
+                self._loaded.move_to_end(tenant)
+        if shard is None:
+            with self._load_locks[tenant]:
+                with self._lock:
+                    shard = self._loaded.get(tenant)
+                if shard is None:
+                    shard = self._load(tenant)
+                    self._store(shard)
+        return self._sync(shard)
+
+    def loaded_shard(self, tenant):
+        """Get a tenant's shard if it is loaded (with edits applied), else None"""
+        with self._lock:
+            shard = self._loaded.get(tenant)
+            if shard is not None:
+                self._loaded.move_to_end(tenant)
+        return self._sync(shard) if shard is not None else None
+
+    def _sync(self, shard):
+        """Pick up edits made through the tenant's database"""
+        data_version = shard.repository.get_data_version()
+        if data_version != shard.matcher.db_version:
+            with self._load_locks[shard.tenant]:
+                if data_version != shard.matcher.db_version:
+                    shard.matcher.sync(shard.repository.get_all_faqs())
+                    shard.matcher.db_version = data_version
+        return shard
+
+    def loaded_tenants(self):
+        """Names of the loaded shards, least recently used first"""
+        with self._lock:
+            return list(self._loaded)
+
+    def stats(self):
+        """Get shard counters"""
+        return {
+            "tenants": len(self.tenants),
+            "loaded": len(self._loaded),
+            "max_loaded": self.max_loaded,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "temporary_loads": self.temporary_loads,
+        }
+
+    def close(self):
+        """Stop the thread pool and close the shards' connections"""
+        self.executor.shutdown(wait=True)
+        with self._lock:
+            for shard in self._loaded.values():
+                shard.repository.pool.close()
+            self._loaded.clear()
+
+    def _match_shard(self, tenant, questions, threshold, top_k, category, temporary=False):
+        """
+        Score questions against one shard and tag the results with the tenant
+
+        With temporary, a shard that isn't loaded is opened for this call
+        only and closed afterwards instead of being added to the LRU.
+        """
+        shard = self.loaded_shard(tenant) if temporary else self.shard(tenant)
+        if shard is None:
+            shard = self._load(tenant)
+            with self._lock:
+                self.temporary_loads += 1
+            try:
+                results = shard.matcher.find_best_matches(questions, threshold, top_k, category=category)
+            finally:
+                shard.repository.pool.close()
+        else:
+            results = shard.matcher.find_best_matches(questions, threshold, top_k, category=category)
+        for matches in results:
+            for result in matches:
+                result['tenant'] = tenant
+        return results
+
+    def _load(self, tenant):
+        """Open a tenant's database and build (or load the persisted index of) its matcher"""
+        from faq_repository import FAQRepository
+        from faq_matcher import FAQMatcher
+        from index_store import default_index_dir
+
+        path = shard_db_path(tenant, self.db_path)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No database for tenant '{tenant}' ({path})")
+        repository = FAQRepository(path, pool_size=2)
+        data_version = repository.get_data_version()
+        matcher = FAQMatcher(
+            repository.get_all_faqs(),
+            backend=self.backend,
+            index_dir=default_index_dir(path),
+            answer_loader=repository.get_answers,
+            **self.matcher_options,
+        )
+        matcher.db_version = data_version
+        return Shard(tenant, repository, matcher)
+
+    def _store(self, shard):
+        """Add a loaded shard to the LRU, unloading the least recently used ones"""
+        with self._lock:
+            self._loaded[shard.tenant] = shard
+            self.loads += 1
+            while len(self._loaded) > self.max_loaded:
+                _, evicted = self._loaded.popitem(last=False)
+                # Requests still using it keep their reference; connections
+                # they return later are closed by the pool
+                evicted.repository.pool.close()
+                self.evictions += 1
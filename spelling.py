@@ -0,0 +1,200 @@
+"""
+Typo Correction
+Corrects out-of-vocabulary query terms against the FAQ vocabulary with a
+SymSpell-style deletion index ("shiping" -> "shipping", "retrun" -> "return",
+"sizez" -> "size")
+
+Every vocabulary term is indexed under all strings obtained by deleting up to
+max_distance characters from its prefix. A query term is looked up by
+generating its own deletes the same way: terms sharing a delete are the only
+candidates, and only those are checked with an edit distance. Lookups
+therefore cost a few dozen hash probes, independent of the vocabulary size.
+
+Deletes are stored as sorted 64-bit hashes with a parallel array of term ids
+(a few bytes per delete instead of one Python string each); hash collisions
+only add candidates that the edit distance check rejects.
+"""
+
+import threading
+from functools import lru_cache
+import numpy as np
+from backends import TERM_PATTERN
+
+
+def deletes(word, max_distance):
+    """
+    All strings obtained by deleting up to max_distance characters from word
+
+    Args:
+        word: Input string
+        max_distance: Maximum number of deleted characters
+
+    Returns:
+        Set of strings, including word itself
+    """
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {
+            item[:i] + item[i + 1:]
+            for item in frontier if len(item) > 1
+            for i in range(len(item))
+        }
+        result |= frontier
+    return result
+
+
+def edit_distance(source, target, max_distance):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions)
+
+    Args:
+        source: First string
+        target: Second string
+        max_distance: Stop early once the distance exceeds this
+
+    Returns:
+        The distance, or max_distance + 1 if it is larger than max_distance
+    """
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+    # Only the part between the common prefix and suffix needs the table
+    start = 0
+    while start < min(len(source), len(target)) and source[start] == target[start]:
+        start += 1
+    source, target = source[start:], target[start:]
+    while source and target and source[-1] == target[-1]:
+        source, target = source[:-1], target[:-1]
+    previous_previous = None
+    previous = list(range(len(target) + 1))
+    for i, source_char in enumerate(source, 1):
+        current = [i] + [0] * len(target)
+        for j, target_char in enumerate(target, 1):
+            cost = source_char != target_char
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and source_char == target[j - 2]
+                    and source[i - 2] == target_char):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else max_distance + 1
+
+
+class SpellingCorrector:
+    """
+    Deletion index over a growing vocabulary
+
+    Terms are only ever appended (like FAQMatcher's vocabulary), so update()
+    indexes just the new ones. Among candidates within the allowed distance,
+    the closest wins, then the one occurring in the most FAQs.
+    """
+
+    def __init__(self, max_distance=2, prefix_length=7, min_length=4, cache_size=50000):
+        """
+        Args:
+            max_distance: Maximum edit distance of a correction (terms of up
+                          to 7 characters only allow 1, so common words like
+                          "please" aren't bent into FAQ terms like "place")
+            prefix_length: Only this many leading characters are indexed,
+                           which bounds the deletes per term
+            min_length: Shorter query terms are never corrected
+            cache_size: Maximum number of cached corrections
+        """
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.min_length = min_length
+        self.terms = []
+        self.frequencies = np.empty(0, dtype=np.int64)
+        # (sorted delete hashes, term id of each hash), replaced as one tuple
+        self._deletes = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        self._lock = threading.Lock()
+        self.correct_term = lru_cache(maxsize=cache_size)(self._correct_term)
+
+    def update(self, terms, frequencies):
+        """
+        Index terms added since the last update and take new frequencies
+
+        Args:
+            terms: Full vocabulary list (terms ordered by id)
+            frequencies: Number of FAQs per term id (terms with 0 are never suggested)
+        """
+        with self._lock:
+            new_terms = terms[len(self.terms):]
+            if new_terms:
+                hashes, term_ids = [], []
+                for term_id, term in enumerate(new_terms, len(self.terms)):
+                    if not self._correctable(term):
+                        continue
+                    term_deletes = deletes(term[:self.prefix_length], self.max_distance)
+                    hashes.extend(map(hash, term_deletes))
+                    term_ids.extend([term_id] * len(term_deletes))
+                old_hashes, old_term_ids = self._deletes
+                hashes = np.concatenate((old_hashes, np.array(hashes, dtype=np.int64)))
+                term_ids = np.concatenate((old_term_ids, np.array(term_ids, dtype=np.int64)))
+                order = np.argsort(hashes, kind="stable")
+                # Terms first, so concurrent lookups never see an unknown term id
+                self.terms = list(terms)
+                self._deletes = (hashes[order], term_ids[order])
+            self.frequencies = np.asarray(frequencies)
+            self.correct_term.cache_clear()
+
+    def correct(self, processed_question, vocabulary):
+        """
+        Replace unknown terms of a preprocessed question by their corrections
+
+        Args:
+            processed_question: Preprocessed question
+            vocabulary: Dictionary term -> column of the known terms
+
+        Returns:
+            The question's terms (known and corrected ones) joined by spaces;
+            terms without a correction are kept as they are
+        """
+        terms = TERM_PATTERN.findall(processed_question)
+        if all(term in vocabulary for term in terms):
+            return processed_question
+        return " ".join(
+            term if term in vocabulary else (self.correct_term(term) or term)
+            for term in terms
+        )
+
+    def _correctable(self, term):
+        return len(term) >= self.min_length and not any(char.isdigit() for char in term)
+
+    def _correct_term(self, term):
+        """Get the best correction of an unknown term, or None"""
+        if not self._correctable(term):
+            return None
+        max_distance = 1 if len(term) <= 7 else self.max_distance
+        probes = np.fromiter(
+            (hash(delete) for delete in deletes(term[:self.prefix_length], max_distance)),
+            dtype=np.int64,
+        )
+        hashes, term_ids = self._deletes
+        starts = np.searchsorted(hashes, probes, side="left")
+        ends = np.searchsorted(hashes, probes, side="right")
+        candidates = {
+            int(term_id)
+            for start, end in zip(starts, ends) if end > start
+            for term_id in term_ids[start:end]
+        }
+
+        best = None
+        best_key = None
+        for term_id in candidates:
+            frequency = self.frequencies[term_id] if term_id < len(self.frequencies) else 0
+            if frequency <= 0:
+                continue
+            candidate = self.terms[term_id]
+            distance = edit_distance(term, candidate, max_distance)
+            if distance > max_distance:
+                continue
+            key = (distance, -frequency, candidate)
+            if best_key is None or key < best_key:
+                best, best_key = candidate, key
+        return best
+
+    def cache_info(self):
+        """Get hit/miss statistics of the correction cache"""
+        return self.correct_term.cache_info()._asdict()
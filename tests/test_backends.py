@@ -0,0 +1,99 @@
+"""
+Tests for the scoring backends (see backends.py)
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faq_matcher import FAQMatcher
+from init_db import SEED_FAQS
+
+FAQS = [(i, question, answer, category) for i, (question, answer, category) in enumerate(SEED_FAQS, 1)]
+QUESTIONS = (
+    [faq[1] for faq in FAQS] + [faq[2] for faq in FAQS]
+    + ['shipping return policy size', 'zebra xylophone']
+)
+
+
+class CosineParityTest(unittest.TestCase):
+    """Backends that promise the cosine ranking must return the same top-k"""
+
+    def assert_same_top_k(self, backend, category=None):
+        cosine = FAQMatcher(FAQS, cache_size=0)
+        other = FAQMatcher(FAQS, backend=backend, cache_size=0)
+        # Also after an edit adding vocabulary and one removing a FAQ
+        for matcher in (cosine, other):
+            matcher.add_faq(100, 'Can I pay with gift cards or vouchers?', 'Yes.', FAQS[0][3])
+            matcher.remove_faq(FAQS[1][0])
+
+        expected = cosine.top_scores(QUESTIONS, top_k=5, category=category)
+        actual = other.top_scores(QUESTIONS, top_k=5, category=category)
+        for question, (ids, scores), (other_ids, other_scores) in zip(QUESTIONS, expected, actual):
+            with self.subTest(question=question):
+                # Only FAQs sharing a term with the question score above 0
+                positive = scores > 0
+                other_positive = other_scores > 0
+                self.assertEqual(list(other_ids[other_positive]), list(ids[positive]))
+                np.testing.assert_allclose(other_scores[other_positive], scores[positive])
+
+    def test_inverted(self):
+        self.assert_same_top_k('inverted')
+        self.assert_same_top_k('inverted', category=FAQS[0][3])
+
+    def test_sparse(self):
+        self.assert_same_top_k('sparse')
+        self.assert_same_top_k('sparse', category=FAQS[0][3])
+
+    def test_sparse_query_path_does_not_use_scikit_learn(self):
+        matcher = FAQMatcher(FAQS, backend='sparse', cache_size=0)
+        matcher.find_best_match(FAQS[0][1])
+        self.assertIsNone(matcher._vectorizer)
+
+
+class BM25FTest(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = FAQMatcher(FAQS, backend='bm25', cache_size=0)
+
+    def test_questions_worded_like_an_answer_match_their_faq(self):
+        for faq_id, question, answer, category in FAQS:
+            with self.subTest(faq_id=faq_id):
+                self.assertEqual(self.matcher.find_best_match(answer[:60])['id'], faq_id)
+                self.assertGreater(self.matcher.find_best_match(question)['similarity_score'], 90)
+
+    def test_scores_are_clipped_and_lowered_by_unknown_terms(self):
+        (ids, scores), (_, unknown_scores), (_, none) = self.matcher.top_scores(
+            [FAQS[3][1], FAQS[3][1] + ' zebra xylophone', 'zebra xylophone'], top_k=1,
+        )
+        self.assertEqual((ids[0], scores[0]), (FAQS[3][0], 1.0))
+        self.assertLess(unknown_scores[0], scores[0])
+        self.assertEqual(none[0], 0.0)
+
+    def test_edits_match_a_fresh_build(self):
+        self.matcher.update_faq(FAQS[0][0], FAQS[0][1], 'Umbrellas come in one size.', FAQS[0][3])
+        self.matcher.add_faq(100, 'Do you sell scarves?', 'Wool scarves in winter.', 'Products')
+        self.matcher.remove_faq(FAQS[1][0])
+        self.assertEqual(self.matcher.find_best_match('umbrellas')['id'], FAQS[0][0])
+        self.assertEqual(self.matcher.find_best_match('wool')['id'], 100)
+
+        edited = [(faq_id, question, answer, category) for faq_id, question, answer, category in self.matcher.faqs]
+        fresh = FAQMatcher(edited, backend='bm25', cache_size=0)
+        for category in (None, FAQS[0][3]):
+            expected = fresh.top_scores(QUESTIONS, top_k=5, category=category)
+            actual = self.matcher.top_scores(QUESTIONS, top_k=5, category=category)
+            for question, (ids, scores), (other_ids, other_scores) in zip(QUESTIONS, expected, actual):
+                with self.subTest(question=question, category=category):
+                    positive = scores > 0
+                    self.assertEqual(list(other_ids[other_scores > 0]), list(ids[positive]))
+                    np.testing.assert_allclose(other_scores[other_scores > 0], scores[positive])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+Tests for the benchmark suite helpers (benchmark.py)
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import compare, generate_corpus, generate_queries, percentile, run_size
+
+
+class BenchmarkHelpersTest(unittest.TestCase):
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(100, 0, -1))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([7], 95), 7)
+
+    def test_corpus_and_queries_are_deterministic(self):
+        faqs = generate_corpus(200)
+        self.assertEqual(faqs, generate_corpus(200))
+        self.assertEqual([faq[0] for faq in faqs], list(range(1, 201)))
+        self.assertEqual(generate_queries(faqs, 50), generate_queries(faqs, 50))
+
+    def test_compare_flags_regressions_by_direction(self):
+        baseline = {"results": {"40": {"latency_p50_ms": 1.0, "batch_qps": 1000.0, "import_s": 0.2}}}
+        current = {"results": {"40": {"latency_p50_ms": 1.5, "batch_qps": 1200.0, "import_s": 0.21}}}
+        lines, regressions = compare(baseline, current, tolerance=0.10)
+        self.assertEqual(regressions, 1)
+        self.assertIn("regression", next(line for line in lines if "latency_p50_ms" in line))
+
+    def test_run_size_reports_every_metric(self):
+        metrics = run_size(40, n_queries=20)
+        for name in ("init_s", "index_load_s", "latency_p50_ms", "latency_p99_ms", "batch_qps", "peak_rss_mb"):
+            self.assertGreater(metrics[name], 0, name)
+        self.assertLessEqual(metrics["latency_p50_ms"], metrics["latency_p99_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Tests for the multi-turn conversation engine (conversation.py)
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation import ConversationEngine
+from faq_matcher import FAQMatcher
+from init_db import SEED_FAQS
+from metrics import MatcherMetrics
+
+FAQS = [(i, question, answer, category) for i, (question, answer, category) in enumerate(SEED_FAQS, 1)]
+
+
+class ConversationEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = MatcherMetrics(enabled=True)
+        self.matcher = FAQMatcher(FAQS, cache_size=0, metrics=self.metrics)
+        self.engine = ConversationEngine(self.matcher, max_turns=3)
+
+    def test_follow_up_prefers_the_previous_category(self):
+        question = "How long does it take?"
+        self.assertEqual(self.engine.ask("a", question).match['category'], "Shipping")
+
+        self.engine.ask("b", "Can I exchange an item?")
+        follow_up = self.engine.ask("b", question)
+        self.assertEqual((follow_up.match['category'], follow_up.context), ("Returns", "Returns"))
+
+    def test_question_clearly_in_another_category_keeps_its_match(self):
+        self.engine.ask("a", "Can I track my order?")
+        turn = self.engine.ask("a", "What payment methods do you accept?")
+        self.assertEqual(turn.match['category'], "Payment")
+        self.assertIsNone(turn.context)
+
+    def test_each_turn_is_recorded_once(self):
+        self.engine.ask("a", "Can I exchange an item?")
+        self.engine.ask("a", "How long does it take?")
+        self.assertEqual(self.metrics.counters["queries"], 2)
+
+    def test_sessions_are_separate_and_history_is_paged(self):
+        for question in ("What sizes do you offer?", "Do you ship internationally?",
+                         "Can I cancel my order?", "Do you offer gift cards?"):
+            self.engine.ask("a", question)
+        self.assertEqual(self.engine.history("b"), ([], 1))
+
+        turns, pages = self.engine.history("a", page_size=2)
+        self.assertEqual(pages, 2)
+        self.assertEqual([turn.question for turn in turns], ["Can I cancel my order?", "Do you offer gift cards?"])
+        # Only max_turns turns are kept, but every question is counted
+        turns, _ = self.engine.history("a", page=1, page_size=2)
+        self.assertEqual([turn.question for turn in turns], ["Do you ship internationally?"])
+        self.assertEqual(self.engine.asked("a"), 4)
+
+        self.engine.clear("a")
+        self.assertEqual(self.engine.history("a"), ([], 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
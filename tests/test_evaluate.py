@@ -0,0 +1,72 @@
+"""
+Tests for the offline evaluation harness (evaluate.py)
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluate import evaluate_scores, score_questions
+from faq_matcher import FAQMatcher
+from init_db import SEED_FAQS
+
+FAQS = [(i, question, answer, category) for i, (question, answer, category) in enumerate(SEED_FAQS, 1)]
+
+
+class EvaluateScoresTest(unittest.TestCase):
+
+    def test_accuracy_and_threshold_sweep(self):
+        ids = np.array([[1, 2], [3, 2], [4, 5], [6, -1]])
+        scores = np.array([[0.9, 0.5], [0.4, 0.3], [0.35, 0.1], [0.2, 0.0]])
+        # Correct at top 1, correct at top 2, wrong, off-topic
+        labels = np.array([1, 2, 7, -1])
+        result = evaluate_scores(ids, scores, labels, thresholds=(0.1, 0.3, 0.5), max_false_match=0.25)
+
+        self.assertEqual((result["questions"], result["labeled"]), (4, 3))
+        self.assertEqual(result["top1_accuracy"], round(1 / 3, 4))
+        self.assertEqual(result["topk_accuracy"], round(2 / 3, 4))
+        sweep = {entry["threshold"]: entry for entry in result["thresholds"]}
+        self.assertEqual(sweep[0.1]["answered"], 1.0)
+        self.assertEqual(sweep[0.1]["false_match_rate"], 0.75)
+        self.assertEqual(sweep[0.3]["false_match_rate"], 0.5)
+        self.assertEqual(sweep[0.5], {
+            "threshold": 0.5, "answered": 0.25, "accuracy": round(1 / 3, 4),
+            "precision": 1.0, "false_match_rate": 0.0,
+        })
+        self.assertEqual(result["recommended_threshold"], 0.5)
+
+    def test_no_recommendation_when_every_threshold_is_too_loose(self):
+        ids = np.array([[2], [3]])
+        scores = np.array([[0.9], [0.8]])
+        result = evaluate_scores(ids, scores, np.array([1, -1]), thresholds=(0.1, 0.5))
+        self.assertIsNone(result["recommended_threshold"])
+
+
+class ScoreQuestionsTest(unittest.TestCase):
+
+    def test_worker_pool_matches_in_process_scores(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        index_dir = os.path.join(tmp_dir, "index")
+        matcher = FAQMatcher(FAQS, index_dir=index_dir, cache_size=0)
+        questions = [faq[1] for faq in FAQS] + ["zebra xylophone"]
+
+        ids, scores, seconds = score_questions(questions, index_dir, "cosine", top_k=3, batch_size=7, workers=2)
+        self.assertEqual(ids.shape, (len(questions), 3))
+        self.assertGreater(seconds, 0)
+        for row, (faq_ids, similarities) in enumerate(matcher.top_scores(questions, 3)):
+            np.testing.assert_array_equal(ids[row, :len(faq_ids)], faq_ids)
+            np.testing.assert_allclose(scores[row, :len(similarities)], similarities)
+        self.assertEqual(list(ids[:len(FAQS), 0]), [faq[0] for faq in FAQS])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Tests for the streaming bulk importer (faq_import.py, FAQRepository.import_faqs)
+
+Run with: python -m unittest discover tests
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import init_db
+from faq_import import import_file
+from faq_repository import FAQRepository
+
+
+class FAQImportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.db_path = os.path.join(self.tmp_dir, "faqs.db")
+        self.repository = FAQRepository(self.db_path)
+        self.addCleanup(self.repository.pool.close)
+        self.repository.create_schema()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def questions(self):
+        return sorted(faq[1] for faq in self.repository.get_all_faqs())
+
+    def test_csv_and_jsonl_with_field_mapping(self):
+        csv_path = self.write("faqs.csv", "question,answer,category\nDo you ship?,Yes.,Shipping\nNo answer,,\n")
+        jsonl_path = self.write("faqs.jsonl", "\n".join(json.dumps(record) for record in [
+            {"title": "Can I return shoes?", "body": "Within 30 days."},
+            {"title": "Is there a sale?", "body": "In July.", "category": "Offers"},
+        ]))
+        with mock.patch.object(init_db, "DB_PATH", self.db_path):
+            stats = import_file(csv_path)
+            self.assertEqual((stats["inserted"], stats["skipped"]), (1, 1))
+            import_file(jsonl_path, question_field="title", answer_field="body", default_category="Requests")
+        categories = {faq[1]: faq[3] for faq in self.repository.get_all_faqs()}
+        self.assertEqual(categories, {
+            "Do you ship?": "Shipping", "Can I return shoes?": "Requests", "Is there a sale?": "Offers",
+        })
+
+    def test_duplicates_are_skipped_in_the_input_and_against_stored_faqs(self):
+        self.repository.add_faq("Do you ship abroad?", "Yes.", "Shipping")
+        rows = [
+            ("do you  ship ABROAD", "Again.", "Shipping"),  # Stored already
+            ("Can I pay later?", "Yes.", "Payment"),
+            ("can i pay later!", "Twice.", "Payment"),  # Earlier in the input
+        ]
+        stats = self.repository.import_faqs(iter(rows), chunk_size=2)
+        self.assertEqual((stats["read"], stats["inserted"], stats["duplicates"]), (3, 1, 2))
+        self.assertEqual(self.questions(), ["Can I pay later?", "Do you ship abroad?"])
+        # Re-running the import inserts nothing
+        self.assertEqual(self.repository.import_faqs(iter(rows))["inserted"], 0)
+
+    def test_failed_chunk_is_rolled_back_and_import_can_resume(self):
+        rows = [(f"Question {i}?", f"Answer {i}", "Misc") for i in range(5)]
+        broken = rows[:3] + [("Question broken?", None, "Misc")] + rows[3:]
+        version = self.repository.get_data_version()
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.repository.import_faqs(iter(broken), chunk_size=2)
+        # The first chunk was committed, the chunk with the bad row wasn't
+        self.assertEqual(self.questions(), ["Question 0?", "Question 1?"])
+        self.assertEqual(self.repository.get_data_version(), version + 1)
+
+        stats = self.repository.import_faqs(iter(rows), chunk_size=2)
+        self.assertEqual((stats["inserted"], stats["duplicates"]), (3, 2))
+        self.assertEqual(self.questions(), [f"Question {i}?" for i in range(5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
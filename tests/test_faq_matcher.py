@@ -0,0 +1,119 @@
+"""
+Tests for FAQMatcher: batch matching, edits and concurrent searches
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faq_matcher import FAQMatcher
+from init_db import SEED_FAQS
+
+FAQS = [(i, question, answer, category) for i, (question, answer, category) in enumerate(SEED_FAQS, 1)]
+
+
+class BatchMatchTest(unittest.TestCase):
+    """find_best_matches scores a batch like find_best_match scores each question"""
+
+    def setUp(self):
+        self.matcher = FAQMatcher(FAQS, cache_size=0)
+        self.questions = [faq[1].lower() for faq in FAQS] + ['when will my parcel arrive', 'zebra xylophone']
+
+    def test_best_match_per_question(self):
+        # Small batches: several backend calls per request
+        results = self.matcher.find_best_matches(self.questions, batch_size=4)
+        self.assertEqual(len(results), len(self.questions))
+        for question, matches in zip(self.questions, results):
+            single = self.matcher.find_best_match(question)
+            self.assertEqual(matches[0] if matches else None, single)
+
+    def test_top_k_ordered_and_thresholded(self):
+        results = self.matcher.find_best_matches(self.questions, threshold=0.1, top_k=3)
+        for matches in results:
+            self.assertLessEqual(len(matches), 3)
+            scores = [match['similarity_score'] for match in matches]
+            self.assertEqual(scores, sorted(scores, reverse=True))
+            self.assertTrue(all(score >= 10 for score in scores))
+        self.assertEqual(results[-1], [])
+        self.assertEqual(self.matcher.find_best_matches([]), [])
+
+
+class CategoryFilterTest(unittest.TestCase):
+    """Matching within a category only returns that category's FAQs"""
+
+    def setUp(self):
+        self.matcher = FAQMatcher(FAQS, cache_size=0)
+        self.shipping = [faq for faq in FAQS if faq[3] == 'Shipping']
+
+    def test_filtered_matches_stay_in_the_category(self):
+        question = self.shipping[0][1]
+        self.assertEqual(self.matcher.find_best_match(question, category='shipping')['id'], self.shipping[0][0])
+        self.assertIsNone(self.matcher.find_best_match(question, category='Returns', threshold=0.9))
+        for matches in self.matcher.find_best_matches([faq[1] for faq in FAQS], threshold=0.0, top_k=5,
+                                                      category='SHIPPING'):
+            self.assertTrue(matches)
+            self.assertEqual({match['category'] for match in matches}, {'Shipping'})
+        self.assertEqual(self.matcher.find_best_matches([question], category='No such category'), [[]])
+
+    def test_listing_follows_edits(self):
+        self.assertEqual(self.matcher.get_all_categories(), sorted({faq[3] for faq in FAQS}))
+        self.assertEqual(len(self.matcher.search_by_category('shipping')), len(self.shipping))
+
+        self.matcher.add_faq(100, 'Do you sell umbrellas?', 'Yes.', 'Rain gear')
+        self.matcher.remove_faq(self.shipping[0][0])
+        self.assertIn('Rain gear', self.matcher.get_all_categories())
+        self.assertEqual(self.matcher.search_by_category('rain gear'),
+                         [{'question': 'Do you sell umbrellas?', 'answer': 'Yes.', 'category': 'Rain gear'}])
+        self.assertEqual(len(self.matcher.search_by_category('Shipping')), len(self.shipping) - 1)
+        self.assertEqual(self.matcher.find_best_match('umbrellas', category='Rain Gear')['id'], 100)
+
+
+class ConcurrentSyncTest(unittest.TestCase):
+    """sync() while other threads search must never fail a search"""
+
+    def run_concurrently(self, backend):
+        matcher = FAQMatcher(FAQS, backend=backend, cache_size=0)
+        questions = [faq[1] for faq in FAQS] + ["brand new zebra question"]
+        errors = []
+        done = threading.Event()
+
+        def search():
+            while not done.is_set():
+                try:
+                    for question in questions[:10]:
+                        matcher.find_best_match(question)
+                    matcher.find_best_matches(questions[:5], top_k=3, category=FAQS[0][3])
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=search) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        try:
+            for i in range(60):
+                # Alternate removals and additions with new vocabulary
+                extra = [(10000 + j, f"novel term{i}x{j} about zebra{i}", "Answer", "Other") for j in range(i % 4)]
+                matcher.sync(FAQS[i % 3:] + extra)
+        finally:
+            done.set()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+
+    def test_cosine(self):
+        self.run_concurrently('cosine')
+
+    def test_inverted(self):
+        self.run_concurrently('inverted')
+
+    def test_bm25(self):
+        self.run_concurrently('bm25')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Tests for the pooled FAQ repository (faq_repository.py)
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faq_repository import ConnectionPool, FAQRepository
+from init_db import SEED_FAQS
+
+
+class FAQRepositoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.db_path = os.path.join(self.tmp_dir, "faqs.db")
+        self.repository = self.open(version_check_interval=60)
+        self.repository.create_schema()
+        self.repository.add_faqs(SEED_FAQS)
+
+    def open(self, **kwargs):
+        repository = FAQRepository(self.db_path, **kwargs)
+        self.addCleanup(repository.pool.close)
+        return repository
+
+    def test_reads_and_writes(self):
+        faqs = self.repository.get_all_faqs()
+        self.assertEqual([faq[1:] for faq in faqs], list(SEED_FAQS))
+        faq_id = self.repository.add_faq("Do you sell umbrellas?", "Yes.", "Products")
+        self.assertEqual(self.repository.get_faq(faq_id), ("Do you sell umbrellas?", "Yes."))
+        self.assertTrue(self.repository.update_faq(faq_id, "Do you sell umbrellas?", "No.", "Products"))
+        self.assertEqual(self.repository.get_answers([faq_id, 10 ** 6]), {faq_id: "No."})
+        self.assertTrue(self.repository.delete_faq(faq_id))
+        self.assertIsNone(self.repository.get_faq(faq_id))
+        self.assertFalse(self.repository.delete_faq(faq_id))
+
+    def test_writes_bump_the_version_and_refresh_cached_stats(self):
+        version = self.repository.get_data_version()
+        count = self.repository.get_count()
+        self.repository.add_faq("Do you sell umbrellas?", "Yes.", "Umbrellas")
+        self.assertGreater(self.repository.get_data_version(), version)
+        self.assertEqual(self.repository.get_count(), count + 1)
+        self.assertIn("Umbrellas", self.repository.get_categories())
+
+    def test_other_writers_show_up_after_the_check_interval(self):
+        reader = self.open(version_check_interval=0.5)
+        version = reader.get_data_version()
+        count = reader.get_count()
+        self.open().add_faq("Do you sell umbrellas?", "Yes.", "Products")
+        # Trusted within the interval, re-read after it
+        self.assertEqual(reader.get_data_version(), version)
+        time.sleep(0.6)
+        self.assertGreater(reader.get_data_version(), version)
+        self.assertEqual(reader.get_count(), count + 1)
+
+
+class PoolLimitTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.pool = ConnectionPool(os.path.join(self.tmp_dir, "faqs.db"), size=2)
+        self.addCleanup(self.pool.close)
+
+    def test_borrowers_share_at_most_size_connections(self):
+        seen = set()
+        in_use = []
+        peak = []
+        lock = threading.Lock()
+
+        def borrow():
+            for _ in range(20):
+                with self.pool.connection() as conn:
+                    with lock:
+                        seen.add(id(conn))
+                        in_use.append(conn)
+                        peak.append(len(in_use))
+                    conn.execute("SELECT 1")
+                    with lock:
+                        in_use.remove(conn)
+
+        threads = [threading.Thread(target=borrow) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(len(seen), 2)
+        self.assertLessEqual(max(peak), 2)
+
+    def test_error_rolls_back(self):
+        with self.pool.connection() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+        with self.assertRaises(sqlite3.IntegrityError):
+            with self.pool.connection() as conn:
+                conn.execute("INSERT INTO t VALUES (1)")
+                raise sqlite3.IntegrityError("abort")
+        with self.pool.connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
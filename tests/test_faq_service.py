@@ -0,0 +1,144 @@
+"""
+Tests for the FAQ HTTP service (request handling, micro-batching, pre-fork mode)
+
+Run with: python -m unittest discover tests
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+import urllib.request
+from http import HTTPStatus
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faq_matcher import FAQMatcher
+from faq_repository import FAQRepository
+from faq_service import FAQService
+from init_db import SEED_FAQS
+
+FAQS = [(i, question, answer, category) for i, (question, answer, category) in enumerate(SEED_FAQS, 1)]
+SERVICE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "faq_service.py")
+
+
+class FAQServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.service = FAQService(FAQMatcher(FAQS, cache_size=0), workers=2, max_wait=0.01)
+        self.addCleanup(self.service.executor.shutdown)
+
+    def dispatch(self, method, path, body=b""):
+        if isinstance(body, dict):
+            body = json.dumps(body).encode("utf-8")
+        return asyncio.run(self.service._dispatch(method, path, body))
+
+    def test_match(self):
+        status, payload = self.dispatch("POST", "/match", {"question": FAQS[3][1]})
+        self.assertEqual(status, HTTPStatus.OK)
+        self.assertEqual(payload["match"]["id"], FAQS[3][0])
+
+    def test_invalid_requests_are_client_errors(self):
+        cases = [
+            ("POST", "/match", b'{"question": "caf\xe9"}'),  # Latin-1, not UTF-8
+            ("POST", "/match", b"{not json"),
+            ("POST", "/match", b'["question"]'),
+            ("POST", "/match", {"question": ""}),
+            ("POST", "/match", {"question": "shipping", "threshold": "high"}),
+            ("POST", "/match/batch", {"questions": ["shipping"], "top_k": 0}),
+        ]
+        for method, path, body in cases:
+            with self.subTest(body=body):
+                status, payload = self.dispatch(method, path, body)
+                self.assertEqual(status, HTTPStatus.BAD_REQUEST)
+                self.assertIn("error", payload)
+        self.assertEqual(self.dispatch("GET", "/nowhere")[0], HTTPStatus.NOT_FOUND)
+        self.assertEqual(self.dispatch("GET", "/match")[0], HTTPStatus.METHOD_NOT_ALLOWED)
+
+    def test_concurrent_questions_share_one_batch(self):
+        calls = []
+        find_best_matches = self.service.matcher.find_best_matches
+
+        def counting(questions, *args, **kwargs):
+            calls.append(len(questions))
+            return find_best_matches(questions, *args, **kwargs)
+
+        self.service.matcher.find_best_matches = counting
+
+        async def ask_all():
+            return await asyncio.gather(*(self.service.batcher.match(faq[1]) for faq in FAQS[:5]))
+
+        results = asyncio.run(ask_all())
+        self.assertEqual([matches[0]["id"] for matches in results], [faq[0] for faq in FAQS[:5]])
+        self.assertEqual(calls, [5])
+        # Batch tasks are referenced until they finish, then released
+        self.assertEqual(self.service.batcher._batches, set())
+
+
+class PreforkServiceTest(unittest.TestCase):
+    """faq_service.py --processes: workers share the index and pick up FAQ edits"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        # Creates faqs.db and faqs.index in the working directory
+        self.process = subprocess.Popen(
+            [sys.executable, SERVICE, "--processes", "2", "--port", str(self.port), "--sync-interval", "0.2"],
+            cwd=self.tmp_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        self.addCleanup(self.stop)
+        self.wait_for(lambda: self.request("/health")["status"] == "ok")
+
+    def stop(self):
+        self.process.send_signal(signal.SIGTERM)
+        self.process.wait(timeout=30)
+
+    def request(self, path, body=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        with urllib.request.urlopen(f"http://127.0.0.1:{self.port}{path}", data, timeout=10) as response:
+            return json.load(response)
+
+    def wait_for(self, condition, timeout=60):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if condition():
+                    return
+            except OSError:
+                pass
+            if time.monotonic() > deadline:
+                self.fail("condition not met in time")
+            time.sleep(0.1)
+
+    def test_workers_serve_the_shared_index_and_reload_edits(self):
+        self.assertTrue(os.path.islink(os.path.join(self.tmp_dir, "faqs.index")))
+        self.assertNotEqual(self.request("/health")["pid"], self.process.pid)
+        question = "Do you sell umbrellas?"
+        self.assertIsNone(self.request("/match", {"question": question, "threshold": 0.9})["match"])
+
+        repository = FAQRepository(os.path.join(self.tmp_dir, "faqs.db"))
+        repository.add_faq(question, "Yes, in three colours.", "Products")
+        repository.pool.close()
+
+        def every_worker_has_it():
+            # Connections land on either worker: require a run of hits
+            return all(
+                (self.request("/match", {"question": question})["match"] or {}).get("question") == question
+                for _ in range(10)
+            )
+
+        self.wait_for(every_worker_has_it)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests for the compact columnar FAQ store (faq_store.py)
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faq_matcher import FAQMatcher
+from faq_store import FAQStore, TextColumn
+
+FAQS = [
+    (3, "Wie lange dauert der Versand?", "3–5 Tage 🚚", "Versand"),
+    (7, "Do you ship abroad?", "Yes.", "Shipping"),
+    (9, "Any gift cards?", "", None),
+]
+
+
+class TextColumnTest(unittest.TestCase):
+
+    def test_roundtrips_unicode_and_empty_strings(self):
+        texts = ["", "ümlaut", "emoji 🚚", ""]
+        column = TextColumn.from_texts(texts)
+        self.assertEqual(list(column), texts)
+        self.assertEqual(column[-2], "emoji 🚚")
+        self.assertEqual(column[1:3], texts[1:3])
+        with self.assertRaises(IndexError):
+            column[len(texts)]
+
+
+class FAQStoreTest(unittest.TestCase):
+
+    def test_roundtrip(self):
+        store = FAQStore.from_faqs(FAQS)
+        self.assertEqual(list(store), FAQS)
+        self.assertEqual(store[1], FAQS[1])
+        self.assertEqual(store.take([2, 0]), [FAQS[2], FAQS[0]])
+        self.assertGreater(store.nbytes, 0)
+
+    def test_edits_and_compact(self):
+        store = FAQStore.from_faqs(FAQS)
+        store.append(11, "New?", "Yes.", "Shipping")
+        store.replace(0, 3, "Versand?", "Schnell.", "Versand")
+        store.delete(1)
+        store.compact()
+        self.assertEqual(list(store), [
+            (3, "Versand?", "Schnell.", "Versand"), FAQS[2], (11, "New?", "Yes.", "Shipping"),
+        ])
+        # Unused category names are dropped when packing
+        store.delete(0)
+        store.compact()
+        self.assertEqual(store.category_names, ["Shipping"])
+        self.assertEqual(list(store.categories), [None, "Shipping"])
+
+    def test_lazy_answers_are_fetched_in_bulk(self):
+        answers = {faq[0]: faq[2] for faq in FAQS}
+        calls = []
+
+        def load(ids):
+            calls.append(list(ids))
+            return {faq_id: answers[faq_id] for faq_id in ids}
+
+        store = FAQStore.from_faqs(FAQS, answer_loader=load)
+        self.assertFalse(store.stores_answers)
+        self.assertEqual(calls, [])
+        self.assertEqual(list(store), FAQS)
+        self.assertEqual(calls, [[3, 7, 9]])
+        self.assertEqual(store.take([1]), [FAQS[1]])
+
+    def test_matcher_results_load_answers_on_demand(self):
+        answers = {faq[0]: faq[2] for faq in FAQS}
+        loaded = []
+
+        def load(ids):
+            loaded.extend(ids)
+            return {faq_id: answers[faq_id] for faq_id in ids}
+
+        matcher = FAQMatcher(FAQS, answer_loader=load, cache_size=0)
+        match = matcher.find_best_match("Do you ship abroad?")
+        self.assertEqual((match["id"], match["answer"]), (7, "Yes."))
+        self.assertEqual(loaded, [7])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+"""
+Tests that heavy dependencies are imported on first use, not at import time
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LazyImportTest(unittest.TestCase):
+
+    def test_importing_the_matcher_loads_no_heavy_modules(self):
+        code = (
+            f"import sys; sys.path.insert(0, {ROOT!r}); import faq_matcher, faq_service; "
+            "print(' '.join(name for name in ('nltk', 'sklearn', 'scipy') if name in sys.modules))"
+        )
+        # Isolated mode: a fresh interpreter without site customizations
+        output = subprocess.run(
+            [sys.executable, "-I", "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(output.strip(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Tests for the persisted matcher index (index_store.py)
+
+Run with: python -m unittest discover tests
+"""
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import index_store
+from faq_matcher import FAQMatcher
+from init_db import SEED_FAQS
+
+FAQS = [(i, question, answer, category) for i, (question, answer, category) in enumerate(SEED_FAQS, 1)]
+
+
+def load_until(index_dir, done, failures):
+    """Load the index in a loop until done is set, counting failed loads"""
+    while not done.is_set():
+        if index_store.load_index(index_dir) is None:
+            with failures.get_lock():
+                failures.value += 1
+
+
+class IndexStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.index_dir = os.path.join(self.tmp_dir, "faqs.index")
+        self.matcher = FAQMatcher(FAQS, cache_size=0)
+        self.matcher.save_index(self.index_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_loaded_index_matches_like_fitted_matcher(self):
+        loaded = FAQMatcher(None, index_dir=self.index_dir, cache_size=0)
+        for faq in FAQS:
+            expected = self.matcher.find_best_match(faq[1])
+            match = loaded.find_best_match(faq[1])
+            self.assertEqual(match["id"], expected["id"])
+            self.assertAlmostEqual(match["similarity_score"], expected["similarity_score"])
+
+    def test_stale_signature_is_rejected(self):
+        signature = index_store.corpus_signature(FAQS)
+        self.assertIsNotNone(index_store.load_index(self.index_dir, signature))
+        self.assertIsNone(index_store.load_index(self.index_dir, index_store.corpus_signature(FAQS[1:])))
+        # A matcher given changed FAQs refits instead of serving the stale index
+        changed = FAQS[:-1] + [(999, "Do you ship to the moon?", "Not yet.", "Shipping")]
+        matcher = FAQMatcher(changed, index_dir=self.index_dir, cache_size=0)
+        self.assertEqual(matcher.find_best_match("Do you ship to the moon?")["id"], 999)
+        self.assertEqual(index_store.read_meta(self.index_dir)["signature"], index_store.corpus_signature(changed))
+
+    def test_other_index_version_is_rejected(self):
+        with mock.patch.object(index_store, "INDEX_VERSION", index_store.INDEX_VERSION + 1):
+            self.assertIsNone(index_store.load_index(self.index_dir))
+        self.assertIsNone(index_store.load_index(os.path.join(self.tmp_dir, "missing.index")))
+
+    def test_rebuild_keeps_current_and_previous_version(self):
+        for _ in range(3):
+            self.matcher.save_index(self.index_dir)
+        self.assertTrue(os.path.islink(self.index_dir))
+        versions = [name for name in os.listdir(self.tmp_dir) if name.startswith("faqs.index.v-")]
+        self.assertEqual(len(versions), 2)
+        self.assertIn(os.readlink(self.index_dir), versions)
+
+    def test_loads_during_rebuilds_always_find_an_index(self):
+        # Readers in other processes, like pre-fork workers swapping in a rebuild
+        done = multiprocessing.Event()
+        failures = multiprocessing.Value("i", 0)
+        readers = [
+            multiprocessing.Process(target=load_until, args=(self.index_dir, done, failures))
+            for _ in range(2)
+        ]
+        for reader in readers:
+            reader.start()
+        try:
+            for _ in range(100):
+                self.matcher.save_index(self.index_dir)
+        finally:
+            done.set()
+            for reader in readers:
+                reader.join()
+        self.assertEqual(failures.value, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
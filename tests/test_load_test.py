@@ -0,0 +1,107 @@
+"""
+Tests for the load tester (load_test.py)
+
+Run with: python -m unittest discover tests
+"""
+
+import itertools
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import init_db
+from faq_repository import FAQRepository
+from init_db import SEED_FAQS
+from load_test import LoadTest, MatcherTarget, Recorder, arrival_times, parse_ramp, read_questions
+
+
+class ScheduleTest(unittest.TestCase):
+
+    def test_parse_ramp(self):
+        self.assertEqual(parse_ramp("50:30, 50-400:120"), [(50.0, 50.0, 30.0), (50.0, 400.0, 120.0)])
+        for spec in ("50", "a:10", "1:2:3"):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_ramp(spec)
+
+    def test_arrival_times(self):
+        self.assertEqual(list(arrival_times([(4, 4, 1), (2, 2, 1)])), [0.0, 0.25, 0.5, 0.75, 1.0, 1.5])
+        self.assertEqual(list(arrival_times([(0, 0, 1)])), [])
+        # A linear ramp sends more requests at its end than at its start
+        times = list(arrival_times([(10, 100, 2)]))
+        self.assertLess(sum(t < 1 for t in times), sum(t >= 1 for t in times))
+        self.assertTrue(all(0 <= t < 2 for t in times))
+
+
+class RecorderTest(unittest.TestCase):
+
+    def test_windows_and_totals(self):
+        recorder = Recorder()
+        for _ in range(3):
+            recorder.offer()
+        recorder.record(0.1)
+        recorder.record(None, TimeoutError())
+        self.assertEqual(recorder.take_window(), ([0.1], 1, 3))
+        recorder.record(None, "Overloaded")
+        self.assertEqual(recorder.take_window(), ([], 1, 0))
+        self.assertEqual((recorder.latencies, recorder.errors, recorder.offered), ([0.1], 2, 3))
+        self.assertEqual(recorder.error_types, {"TimeoutError": 1, "Overloaded": 1})
+
+
+class LoadTestRunTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.db_path = os.path.join(self.tmp_dir, "faqs.db")
+        repository = FAQRepository(self.db_path)
+        repository.create_schema()
+        repository.add_faqs(SEED_FAQS)
+        repository.pool.close()
+        # MatcherTarget.open() points init_db at the test database
+        patcher = mock.patch.object(init_db, "DB_PATH", init_db.DB_PATH)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_read_questions_skips_records_without_the_field(self):
+        path = os.path.join(self.tmp_dir, "questions.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(json.dumps(record) for record in [{"q": "First?"}, {"other": 1}, {"q": "  "}, {"q": "Second?"}]))
+        self.assertEqual(list(itertools.islice(read_questions(path, "q"), 3)), ["First?", "Second?", "First?"])
+        self.assertEqual(list(read_questions(path, "q", repeat=False)), ["First?", "Second?"])
+        with self.assertRaises(ValueError):
+            next(read_questions(path, "missing"))
+
+    def test_workers_open_the_index_built_by_the_parent(self):
+        target = MatcherTarget(db_path=self.db_path)
+        questions = itertools.cycle(faq[0] for faq in SEED_FAQS)
+        load_test = LoadTest(target, questions, mode="processes", concurrency=2, duration=0.5,
+                             interval=0.25, verbose=False)
+        report = load_test.run()
+        self.assertTrue(os.path.exists(target.index_dir))
+        self.assertIsNone(pickle.loads(pickle.dumps(target)).matcher)
+
+        summary = report["summary"]
+        self.assertGreater(summary["completed"], 0)
+        self.assertEqual(summary["errors"], 0)
+        self.assertTrue(report["timeline"])
+
+    def test_open_loop_run(self):
+        target = MatcherTarget(db_path=self.db_path)
+        questions = itertools.cycle(faq[0] for faq in SEED_FAQS)
+        load_test = LoadTest(target, questions, mode="asyncio", concurrency=2, rate=40, duration=0.5,
+                             interval=0.25, slo_ms=1000, verbose=False)
+        summary = load_test.run()["summary"]
+        self.assertEqual(summary["requests"], 20)
+        self.assertEqual(summary["errors"], 0)
+        self.assertGreater(summary["max_throughput_within_slo"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Tests for matcher metrics (histograms, Prometheus output, profiler)
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faq_matcher import FAQMatcher
+from init_db import SEED_FAQS
+from metrics import Histogram, MatcherMetrics
+
+FAQS = [(i, question, answer, category) for i, (question, answer, category) in enumerate(SEED_FAQS, 1)]
+
+
+def metric_families(text):
+    """Parse exposition text into [(family, help, type, [sample lines])], in order"""
+    families = []
+    for line in text.splitlines():
+        match = re.match(r"# (HELP|TYPE) (\S+) (.*)", line)
+        if match:
+            kind, name, value = match.groups()
+            if not families or families[-1][0] != name:
+                families.append([name, None, None, []])
+            families[-1][1 if kind == "HELP" else 2] = value
+        else:
+            families[-1][3].append(line)
+    return families
+
+
+class HistogramTest(unittest.TestCase):
+
+    def test_buckets_are_cumulative_and_inclusive(self):
+        histogram = Histogram((0.1, 0.5))
+        for value in (0.1, 0.2, 0.5, 3.0):
+            histogram.observe(value)
+        self.assertEqual(histogram.cumulative(), [(0.1, 1), (0.5, 3), (float("inf"), 4)])
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 3.8)
+
+
+class MatcherMetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = MatcherMetrics(enabled=True)
+        self.matcher = FAQMatcher(FAQS, metrics=self.metrics)
+
+    def test_records_nothing_while_disabled(self):
+        self.metrics.enabled = False
+        self.matcher.find_best_match(FAQS[0][1])
+        self.assertEqual(self.metrics.counters["queries"], 0)
+
+    def test_counts_matches_and_misses(self):
+        self.matcher.find_best_match(FAQS[0][1])
+        self.matcher.find_best_match("zebra xylophone")
+        self.assertEqual(self.metrics.counters, {"queries": 2, "matches": 1, "misses_below_threshold": 1})
+        self.assertEqual(self.metrics.scores.count, 2)
+
+    def test_prometheus_groups_samples_under_their_family(self):
+        self.matcher.find_best_match(FAQS[0][1])
+        self.matcher.find_best_match("shiping tme")
+        families = metric_families(self.metrics.prometheus(self.matcher.cache_stats()))
+
+        names = [family[0] for family in families]
+        self.assertEqual(len(names), len(set(names)), "a family is split or repeated")
+        for name, help_text, metric_type, samples in families:
+            with self.subTest(family=name):
+                self.assertTrue(help_text)
+                self.assertIn(metric_type, ("counter", "histogram"))
+                self.assertTrue(samples)
+                for sample in samples:
+                    self.assertTrue(sample.startswith(name), sample)
+        cache_hits = families[names.index("faq_matcher_cache_hits_total")][3]
+        self.assertIn('faq_matcher_cache_hits_total{cache="results"}', [line.split()[0] for line in cache_hits])
+
+    def test_profiler_samples_other_threads(self):
+        done = threading.Event()
+
+        def busy():
+            while not done.is_set():
+                sum(range(1000))
+
+        thread = threading.Thread(target=busy)
+        thread.start()
+        try:
+            self.metrics.set_profiling(True, interval=0.001)
+            time.sleep(0.1)
+            self.metrics.set_profiling(False)
+        finally:
+            done.set()
+            thread.join()
+        self.assertGreater(self.metrics.profiler.samples, 0)
+        self.assertIn("busy", self.metrics.profiler.collapsed())
+
+
+if __name__ == "__main__":
+    unittest.main()
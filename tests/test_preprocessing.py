@@ -0,0 +1,73 @@
+"""
+Tests for the memoized preprocessing pipeline (preprocessing.py)
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from init_db import SEED_FAQS
+from preprocessing import TextPreprocessor, regex_tokenize
+
+
+class RegexTokenizeTest(unittest.TestCase):
+
+    def test_splits_like_nltk(self):
+        text = "i don't think you'll ship t-shirts in 5-7 days; we cannot charge $1,000 at 10:00... e-mail help@shop.com!"
+        self.assertEqual(regex_tokenize(text), [
+            'i', 'do', "n't", 'think', 'you', "'ll", 'ship', 't-shirts', 'in', '5-7', 'days', ';',
+            'we', 'can', 'not', 'charge', '$', '1,000', 'at', '10:00', '...', 'e-mail', 'help',
+            '@', 'shop.com', '!',
+        ])
+
+    def test_faq_questions_match_nltk_tokenizer(self):
+        # The sentence-level NLTK tokenizer needs no downloaded data
+        from nltk.tokenize import NLTKWordTokenizer
+
+        tokenizer = NLTKWordTokenizer()
+        for question, _, _ in SEED_FAQS:
+            with self.subTest(question=question):
+                self.assertEqual(regex_tokenize(question.lower()), tokenizer.tokenize(question.lower()))
+
+
+class TextPreprocessorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.lemmatized = []
+
+        def lemmatize(token):
+            self.lemmatized.append(token)
+            return token[:-1] if token.endswith('s') else token
+
+        self.preprocess = TextPreprocessor(lambda: ['do', 'i', 'the'], lemmatize)
+
+    def test_filters_stopwords_and_punctuation_and_lemmatizes(self):
+        self.assertEqual(self.preprocess('How do I track the orders?'), 'how track order')
+
+    def test_normalized_queries_share_one_cache_entry(self):
+        first = self.preprocess('Track   my ORDERS')
+        self.assertEqual(self.preprocess('track my orders'), first)
+        self.assertEqual(self.preprocess.cache_info()['queries']['hits'], 1)
+        # Each distinct token is lemmatized once
+        self.preprocess('my orders shipped')
+        self.assertEqual(sorted(self.lemmatized), ['my', 'orders', 'shipped', 'track'])
+
+    def test_documents_bypass_the_query_cache(self):
+        self.assertEqual(self.preprocess.process_document('Orders ship daily.'), 'order ship daily')
+        self.assertEqual(self.preprocess.cache_info()['queries']['currsize'], 0)
+
+    def test_stopwords_are_loaded_on_first_use(self):
+        loads = []
+        preprocess = TextPreprocessor(lambda: loads.append(1) or ['the'], str)
+        self.assertEqual(loads, [])
+        preprocess('the order')
+        preprocess('the refund')
+        self.assertEqual(loads, [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
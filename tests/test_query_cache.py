@@ -0,0 +1,81 @@
+"""
+Tests for the query result cache (query_cache.py) and its use in FAQMatcher
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faq_matcher import FAQMatcher
+from init_db import SEED_FAQS
+from query_cache import MISSING, QueryCache
+
+FAQS = [(i, question, answer, category) for i, (question, answer, category) in enumerate(SEED_FAQS, 1)]
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class QueryCacheTest(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = QueryCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)  # "b" is now least recently used
+        cache.put("c", 3)
+        self.assertIs(cache.get("b"), MISSING)
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = QueryCache(ttl=10, clock=clock)
+        cache.put("a", 1)
+        clock.now = 10
+        self.assertEqual(cache.get("a"), 1)
+        clock.now = 10.5
+        self.assertIs(cache.get("a"), MISSING)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["expirations"], stats["size"]), (1, 1, 1, 0))
+
+
+class MatcherResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = FAQMatcher(FAQS, typo_tolerance=False)
+        self.cache = self.matcher.result_cache
+
+    def test_equivalent_questions_share_an_entry(self):
+        first = self.matcher.find_best_match("How long does shipping take?")
+        hits = self.cache.hits
+        # Differs only in case, punctuation and stopwords
+        self.assertEqual(self.matcher.find_best_match("how long does the SHIPPING take"), first)
+        self.assertEqual(self.cache.hits, hits + 1)
+
+    def test_keys_are_scoped_by_category_and_top_k(self):
+        question = "How long does shipping take?"
+        self.matcher.find_best_match(question)
+        self.matcher.find_best_match(question, category="Returns")
+        self.matcher.find_best_matches([question], top_k=3)
+        self.assertEqual(len(self.cache), 3)
+
+    def test_edits_invalidate_cached_results(self):
+        question = "Do you sell umbrellas?"
+        self.assertIsNone(self.matcher.find_best_match(question))
+        self.matcher.add_faq(100, question, "Yes.", "Products")
+        self.assertEqual(self.matcher.find_best_match(question)["id"], 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+"""
+Tests for the asynchronous query log (query_log.py)
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faq_matcher import FAQMatcher
+from init_db import SEED_FAQS
+from query_log import QueryLogger, default_log_path
+
+FAQS = [(i, question, answer, category) for i, (question, answer, category) in enumerate(SEED_FAQS, 1)]
+
+
+class QueryLogTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.path = os.path.join(self.tmp_dir, "faqs.log.db")
+
+    def logger(self, **kwargs):
+        logger = QueryLogger(self.path, source="test", **kwargs)
+        self.addCleanup(logger.close)
+        return logger
+
+    def rows(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute(
+                "SELECT question, match_id, score, category, source FROM query_log ORDER BY id"
+            ).fetchall()
+        finally:
+            conn.close()
+
+    def stall_writer(self):
+        """Make the writer thread wait inside its first batch until the returned event is set"""
+        started = threading.Event()
+        release = threading.Event()
+        write = QueryLogger._write
+
+        def slow_write(logger, conn, batch):
+            started.set()
+            release.wait(10)
+            write(logger, conn, batch)
+
+        patcher = mock.patch.object(QueryLogger, "_write", slow_write)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(release.set)
+        return started, release
+
+
+class QueryLoggerTest(QueryLogTestCase):
+
+    def test_entries_are_written_in_batches(self):
+        logger = self.logger(batch_size=4, flush_interval=0.05)
+        for i in range(10):
+            self.assertTrue(logger.log(f"Question {i}?", i, 0.5, 1.0, "Misc"))
+        logger.flush()
+        self.assertEqual(self.rows(), [(f"Question {i}?", i, 0.5, "Misc", "test") for i in range(10)])
+        stats = logger.stats()
+        self.assertEqual((stats["written"], stats["dropped"], stats["errors"]), (10, 0, 0))
+        self.assertGreaterEqual(stats["batches"], 3)
+
+    def test_drop_policy_discards_entries_when_the_queue_is_full(self):
+        started, release = self.stall_writer()
+        logger = self.logger(queue_size=2, batch_size=1)
+        self.assertTrue(logger.log("first", 1, 0.9, 1.0))
+        self.assertTrue(started.wait(5))
+        self.assertTrue(logger.log("second", 2, 0.9, 1.0))
+        self.assertTrue(logger.log("third", 3, 0.9, 1.0))
+        self.assertFalse(logger.log("dropped", 4, 0.9, 1.0))
+        release.set()
+        logger.flush()
+        self.assertEqual([row[0] for row in self.rows()], ["first", "second", "third"])
+        self.assertEqual(logger.stats()["dropped"], 1)
+
+    def test_block_policy_waits_for_space(self):
+        started, release = self.stall_writer()
+        logger = self.logger(queue_size=1, batch_size=1, policy="block", block_timeout=0.05)
+        logger.log("first", 1, 0.9, 1.0)
+        self.assertTrue(started.wait(5))
+        logger.log("second", 2, 0.9, 1.0)
+        # No space within block_timeout: dropped
+        self.assertFalse(logger.log("timed out", 3, 0.9, 1.0))
+        # Space freed while waiting: queued
+        logger.block_timeout = 5
+        threading.Timer(0.05, release.set).start()
+        self.assertTrue(logger.log("third", 4, 0.9, 1.0))
+        logger.flush()
+        self.assertEqual([row[0] for row in self.rows()], ["first", "second", "third"])
+
+    def test_close_writes_queued_entries_and_drops_later_ones(self):
+        logger = self.logger(flush_interval=10)
+        logger.log("queued", None, 0.1, 1.0)
+        logger.close()
+        self.assertFalse(logger.log("too late", None, 0.1, 1.0))
+        self.assertEqual(self.rows(), [("queued", None, 0.1, None, "test")])
+        self.assertEqual(logger.stats()["dropped"], 1)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            QueryLogger(self.path, policy="wait")
+
+    def test_default_log_path(self):
+        self.assertEqual(default_log_path("data/faqs.db"), os.path.join("data", "faqs.log.db"))
+
+
+class MatcherQueryLogTest(QueryLogTestCase):
+
+    def test_matcher_logs_each_recorded_question(self):
+        logger = self.logger(flush_interval=0.05)
+        matcher = FAQMatcher(FAQS, cache_size=0, query_log=logger)
+        match = matcher.find_best_match("How long does shipping take?")
+        matcher.find_best_match("How long does shipping take?", record=False)
+        matcher.find_best_match("zebra xylophone", category="Returns")
+        logger.flush()
+        rows = self.rows()
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0][:2], ("How long does shipping take?", match["id"]))
+        self.assertAlmostEqual(rows[0][2], match["similarity_score"] / 100, places=3)
+        self.assertEqual(rows[1], ("zebra xylophone", None, rows[1][2], "Returns", "test"))
+
+
+if __name__ == "__main__":
+    unittest.main()
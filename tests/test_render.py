@@ -0,0 +1,69 @@
+"""
+Tests for the dashboard HTML fragments (render.py)
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation import Turn
+from faq_matcher import FAQMatcher
+from init_db import SEED_FAQS
+from render import DashboardRenderer, minify_css
+
+FAQS = [(i, question, answer, category) for i, (question, answer, category) in enumerate(SEED_FAQS, 1)]
+
+
+def match(faq_id, question, answer, category, score=90.0):
+    return {"id": faq_id, "question": question, "answer": answer, "category": category, "similarity_score": score}
+
+
+class DashboardRendererTest(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = FAQMatcher(FAQS, cache_size=0)
+        self.renderer = DashboardRenderer(self.matcher)
+
+    def test_user_input_and_faq_text_are_escaped(self):
+        turn = Turn("<script>alert(1)</script>", match(1, "Q & A?", "<b>bold</b>", "Tips"), None, 0.0)
+        fragment = self.renderer.turn_html(turn)
+        self.assertNotIn("<script>", fragment)
+        self.assertNotIn("<b>", fragment)
+        self.assertIn("&lt;script&gt;alert(1)&lt;/script&gt;", fragment)
+        self.assertIn("Q &amp; A?", fragment)
+        self.assertIn("90.0% Match", fragment)
+
+    def test_answer_fragments_are_cached_per_faq_content(self):
+        first = self.renderer.answer_html(match(1, "Q?", "Old answer", "Tips"))
+        self.assertIs(self.renderer.answer_html(match(1, "Q?", "Old answer", "Tips", score=50.0)), first)
+        # Same id and corpus version, new answer text (e.g. loaded through an answer_loader)
+        edited = self.renderer.answer_html(match(1, "Q?", "New answer", "Tips"))
+        self.assertIn("New answer", edited)
+        self.assertNotIn("Old answer", edited)
+
+    def test_corpus_fragments_follow_the_matcher_version(self):
+        stats = self.renderer.stats_html(asked=2)
+        self.assertIn(f'<div class="stat-number">{len(FAQS)}</div>', stats)
+        self.assertIn('<div class="stat-number">2</div>', stats)
+        self.assertNotIn("Gifts &amp; More", self.renderer.categories_html())
+
+        self.matcher.add_faq(100, "Do you wrap presents?", "Yes.", "Gifts & More")
+        self.assertIn(f'<div class="stat-number">{len(FAQS) + 1}</div>', self.renderer.stats_html(asked=2))
+        self.assertIn("Gifts &amp; More", self.renderer.categories_html())
+
+    def test_chat_html_without_turns_shows_the_hint(self):
+        self.assertIn("Try asking", self.renderer.chat_html([]))
+        no_match = self.renderer.chat_html([Turn("zebra?", None, None, 0.0)])
+        self.assertIn("couldn't find a good match", no_match)
+
+    def test_minify_css(self):
+        css = "/* comment */\n.a {\n    color: red;\n}\n\n.b { margin: 0 auto; }\n"
+        self.assertEqual(minify_css(css), ".a{color: red;}.b{margin: 0 auto;}")
+
+
+if __name__ == "__main__":
+    unittest.main()
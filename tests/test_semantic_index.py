@@ -0,0 +1,85 @@
+"""
+Tests for the persisted LSA model of the semantic and hybrid backends
+
+Run with: python -m unittest discover tests
+"""
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import index_store
+import semantic_index
+from faq_matcher import FAQMatcher
+from init_db import SEED_FAQS
+
+FAQS = [(i, question, answer, category) for i, (question, answer, category) in enumerate(SEED_FAQS, 1)]
+
+
+def fit_and_save(index_dir, barrier, failures):
+    """Fit and save the model at the same moment as the other processes"""
+    matcher = FAQMatcher(FAQS, index_dir=index_dir, cache_size=0)
+    model = semantic_index.SemanticModel.fit(matcher)
+    barrier.wait()
+    try:
+        model.save(semantic_index.default_semantic_dir(index_dir), matcher.signature)
+    except OSError:
+        with failures.get_lock():
+            failures.value += 1
+
+
+class SemanticIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.index_dir = os.path.join(self.tmp_dir, "faqs.index")
+        self.model_dir = semantic_index.default_semantic_dir(self.index_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_saved_model_is_loaded_by_the_next_matcher(self):
+        matcher = FAQMatcher(FAQS, backend="semantic", index_dir=self.index_dir, cache_size=0)
+        self.assertIsNotNone(semantic_index.SemanticModel.load(self.model_dir, matcher.signature))
+        self.assertIsNone(semantic_index.SemanticModel.load(self.model_dir, "other signature"))
+
+        loaded = FAQMatcher(None, backend="semantic", index_dir=self.index_dir, cache_size=0)
+        for faq in FAQS:
+            self.assertEqual(loaded.find_best_match(faq[1])["id"], matcher.find_best_match(faq[1])["id"])
+
+    def test_processes_saving_at_once_all_succeed(self):
+        barrier = multiprocessing.Barrier(4)
+        failures = multiprocessing.Value("i", 0)
+        processes = [
+            multiprocessing.Process(target=fit_and_save, args=(self.index_dir, barrier, failures))
+            for _ in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual(failures.value, 0)
+        signature = index_store.corpus_signature(FAQS)
+        self.assertIsNotNone(semantic_index.SemanticModel.load(self.model_dir, signature))
+
+    def test_lost_publish_race_loads_the_saved_model(self):
+        matcher = FAQMatcher(FAQS, index_dir=self.index_dir, cache_size=0)
+        semantic_index.SemanticModel.fit(matcher).save(self.model_dir, matcher.signature)
+        stale = semantic_index.SemanticModel.load(self.model_dir, "other signature")
+        self.assertIsNone(stale)
+
+        # Another process published first: this one's model is discarded
+        with mock.patch.object(semantic_index.SemanticModel, "load", side_effect=[None, "saved"]), \
+                mock.patch.object(semantic_index, "publish_dir", side_effect=FileExistsError):
+            self.assertEqual(semantic_index.load_or_fit(matcher), "saved")
+        self.assertFalse([name for name in os.listdir(self.tmp_dir) if ".tmp-" in name])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Tests for ShardedMatcher (per-tenant databases behind one matcher)
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faq_repository import ConnectionPool, FAQRepository
+from sharded_matcher import ShardedMatcher, discover_tenants, shard_db_path
+
+TENANT_FAQS = {
+    "acme": [("How long does shipping take?", "Three to five days.", "Shipping")],
+    "beta": [("What is your return policy?", "Returns within 30 days.", "Returns")],
+    "gamma": [("Do you sell waterproof hiking boots?", "Yes, in sizes 36 to 47.", "Products")],
+}
+
+
+class ShardedMatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "faqs.db")
+        for tenant, faqs in TENANT_FAQS.items():
+            repository = FAQRepository(shard_db_path(tenant, self.db_path))
+            repository.create_schema()
+            repository.add_faqs(faqs)
+            repository.pool.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_discovers_tenants(self):
+        self.assertEqual(discover_tenants(self.db_path), ["acme", "beta", "gamma"])
+        with self.assertRaises(ValueError):
+            shard_db_path("../etc", self.db_path)
+
+    def test_tenant_question_only_matches_its_shard(self):
+        matcher = ShardedMatcher(db_path=self.db_path, max_loaded=3)
+        self.addCleanup(matcher.close)
+        self.assertIsNone(matcher.find_best_match("What is your return policy?", tenant="acme"))
+        match = matcher.find_best_match("What is your return policy?", tenant="beta")
+        self.assertEqual(match["tenant"], "beta")
+
+    def test_scatter_gather_merges_by_score(self):
+        matcher = ShardedMatcher(db_path=self.db_path, max_loaded=3)
+        self.addCleanup(matcher.close)
+        results = matcher.find_best_matches(["How long does shipping take?"], threshold=0.0, top_k=3)[0]
+        self.assertEqual(results[0]["tenant"], "acme")
+        scores = [result["similarity_score"] for result in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_more_tenants_than_loaded_scores_every_tenant(self):
+        matcher = ShardedMatcher(db_path=self.db_path, max_loaded=2)
+        self.addCleanup(matcher.close)
+        question = "Do you sell waterproof hiking boots?"
+
+        # Cold, and with other shards loaded: gamma is still searched
+        self.assertEqual(matcher.find_best_match(question)["tenant"], "gamma")
+        matcher.find_best_match("shipping", tenant="acme")
+        matcher.find_best_match("returns", tenant="beta")
+        self.assertEqual(matcher.find_best_match(question)["tenant"], "gamma")
+
+        # Unloaded shards were opened temporarily: the LRU kept acme and beta
+        self.assertEqual(matcher.loaded_tenants(), ["acme", "beta"])
+        self.assertEqual(matcher.stats()["evictions"], 0)
+        self.assertGreater(matcher.stats()["temporary_loads"], 0)
+
+    def test_lru_evicts_least_recently_used(self):
+        matcher = ShardedMatcher(db_path=self.db_path, max_loaded=2)
+        self.addCleanup(matcher.close)
+        for tenant in ("acme", "beta", "acme", "gamma"):
+            matcher.shard(tenant)
+        self.assertEqual(matcher.loaded_tenants(), ["acme", "gamma"])
+        self.assertEqual(matcher.stats()["evictions"], 1)
+
+
+class ConnectionPoolTest(unittest.TestCase):
+
+    def test_connection_returned_after_close_is_closed(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        pool = ConnectionPool(os.path.join(tmp_dir, "test.db"), size=1)
+        borrowed = threading.Event()
+        release = threading.Event()
+        held = []
+
+        def borrow():
+            with pool.connection() as conn:
+                held.append(conn)
+                borrowed.set()
+                release.wait()
+
+        thread = threading.Thread(target=borrow)
+        thread.start()
+        borrowed.wait()
+        pool.close()
+        release.set()
+        thread.join()
+
+        # The in-flight connection was closed on return, not parked in the pool
+        with self.assertRaises(Exception):
+            held[0].execute("SELECT 1")
+        self.assertEqual(pool._created, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
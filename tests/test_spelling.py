@@ -0,0 +1,74 @@
+"""
+Tests for typo correction (spelling.py)
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faq_matcher import FAQMatcher
+from init_db import SEED_FAQS
+from spelling import SpellingCorrector, deletes, edit_distance
+
+FAQS = [(i, question, answer, category) for i, (question, answer, category) in enumerate(SEED_FAQS, 1)]
+
+
+class EditDistanceTest(unittest.TestCase):
+
+    def test_counts_transpositions_as_one_edit(self):
+        self.assertEqual(edit_distance("retrun", "return", 2), 1)
+        self.assertEqual(edit_distance("shiping", "shipping", 2), 1)
+        self.assertEqual(edit_distance("sizez", "size", 2), 1)
+        self.assertEqual(edit_distance("kitten", "sitting", 5), 3)
+        # Beyond max_distance the exact value doesn't matter
+        self.assertEqual(edit_distance("kitten", "sitting", 1), 2)
+
+    def test_deletes(self):
+        self.assertEqual(deletes("abc", 1), {"abc", "bc", "ac", "ab"})
+        self.assertIn("a", deletes("abc", 2))
+
+
+class SpellingCorrectorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.corrector = SpellingCorrector()
+        self.terms = ["shipping", "return", "size", "sizes", "place", "payment"]
+        self.corrector.update(self.terms, [5, 4, 3, 1, 1, 2])
+        self.vocabulary = {term: column for column, term in enumerate(self.terms)}
+
+    def correct(self, question):
+        return self.corrector.correct(question, self.vocabulary)
+
+    def test_corrects_unknown_terms(self):
+        self.assertEqual(self.correct("shiping retrun"), "shipping return")
+        self.assertEqual(self.correct("paymnet"), "payment")
+
+    def test_ties_go_to_the_most_frequent_term(self):
+        # "sizex" is one edit from both "size" and "sizes"
+        self.assertEqual(self.correct("sizex"), "size")
+
+    def test_leaves_short_numeric_and_distant_terms(self):
+        self.assertEqual(self.correct("siz 5kg please zebra"), "siz 5kg please zebra")
+
+    def test_new_terms_are_indexed_on_update(self):
+        self.assertEqual(self.correct("umbrela"), "umbrela")
+        self.corrector.update(self.terms + ["umbrella"], [5, 4, 3, 1, 1, 2, 1])
+        self.assertEqual(self.correct("umbrela"), "umbrella")
+
+
+class MatcherTypoToleranceTest(unittest.TestCase):
+
+    def test_typos_match_like_the_correct_question(self):
+        matcher = FAQMatcher(FAQS, cache_size=0)
+        strict = FAQMatcher(FAQS, cache_size=0, typo_tolerance=False)
+        expected = matcher.find_best_match("How long does shipping take?")["id"]
+        self.assertEqual(matcher.find_best_match("how long does shiping tkae")["id"], expected)
+        self.assertNotEqual((strict.find_best_match("shiping tkae") or {}).get("id"), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()